@@ -11,7 +11,6 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
-from mongoengine import connect
 import os
 from dotenv import load_dotenv
 
@@ -56,8 +55,12 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'system.profiling.PerfiladorMiddleware',
 ]
 
+# Perfilado bajo demanda (?_perfil=muestreo|cprofile o cabecera X-Sigo-Perfil, solo administradores)
+SIGO_PERFILADOR = os.getenv("SIGO_PERFILADOR", "False") == "True"
+
 # Configuración de las URLs del proyecto
 ROOT_URLCONF = 'sigo.urls'
 
@@ -89,16 +92,80 @@ DATABASES = {
     }
 }
 
-# Conexión a MongoDB usando MongoEngine
+# Conexión a MongoDB usando MongoEngine.
+# La conexión se registra en system.apps y el cliente se crea en la primera consulta
+# de cada proceso (ver system/mongo.py); las opciones vacías usan el valor de pymongo.
 MONGODB_SETTINGS = {
     'db': os.getenv("MONGO_DB_NAME"),
     'host': os.getenv("MONGO_DB_URI"),
+    'max_pool_size': os.getenv("MONGO_MAX_POOL_SIZE"),
+    'min_pool_size': os.getenv("MONGO_MIN_POOL_SIZE"),
+    'max_idle_time_ms': os.getenv("MONGO_MAX_IDLE_TIME_MS"),
+    'server_selection_timeout_ms': os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS"),
+    'socket_timeout_ms': os.getenv("MONGO_SOCKET_TIMEOUT_MS"),
+    'connect_timeout_ms': os.getenv("MONGO_CONNECT_TIMEOUT_MS"),
+    'compressors': os.getenv("MONGO_COMPRESSORS"),  # p. ej. "zstd,snappy,zlib"
+    'read_preference': os.getenv("MONGO_READ_PREFERENCE"),  # p. ej. "primaryPreferred"
+    'max_staleness_seconds': os.getenv("MONGO_MAX_STALENESS_SECONDS"),
+}
+
+# Alias "lecturas" para exportaciones, tableros e historiales (réplicas secundarias).
+# MongoDB exige maxStalenessSeconds >= 90; los valores no definidos se toman de MONGODB_SETTINGS.
+MONGODB_LECTURAS = {
+    'habilitada': os.getenv("MONGO_LECTURAS", "True") == "True",
+    'read_preference': os.getenv("MONGO_LECTURAS_READ_PREFERENCE", "secondaryPreferred"),
+    'max_staleness_seconds': int(os.getenv("MONGO_LECTURAS_MAX_STALENESS_SECONDS", 120)),
+    'max_pool_size': os.getenv("MONGO_LECTURAS_MAX_POOL_SIZE", 20),
 }
 
-connect(
-    db=os.getenv("MONGO_DB_NAME"),
-    host=os.getenv("MONGO_DB_URI")
-)
+# Sesiones en MongoDB (índice TTL sobre expire_date) para no competir por el bloqueo de SQLite.
+# Con una caché compartida (SIGO_CACHE_URL) se puede usar "system.sessions.cached_mongo".
+SESSION_ENGINE = os.getenv("SESSION_ENGINE", "system.sessions.mongo")
+
+# Caché compartida entre workers si se define SIGO_CACHE_URL (redis://..., requiere el paquete redis)
+if os.getenv("SIGO_CACHE_URL"):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv("SIGO_CACHE_URL"),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'sigo',
+        }
+    }
+
+# Máximo de segundos que se cachea el periodo de inventario activo (system/periodos.py)
+SIGO_PERIODO_CACHE_MAX_SEG = int(os.getenv("SIGO_PERIODO_CACHE_MAX_SEG", 300))
+
+# Máximo de segundos que se cachea la jerarquía campus → UR → edificio → área (system/jerarquia.py)
+SIGO_JERARQUIA_CACHE_SEG = int(os.getenv("SIGO_JERARQUIA_CACHE_SEG", 300))
+
+# Segundos que se guarda el resultado de una simulación de sustituciones (system/simulador.py)
+SIGO_SIMULADOR_CACHE_SEG = int(os.getenv("SIGO_SIMULADOR_CACHE_SEG", 900))
+
+# Máximo de segundos que se cachea la conciliación facturas vs. inventario de un periodo (system/conciliacion.py)
+SIGO_CONCILIACION_CACHE_SEG = int(os.getenv("SIGO_CONCILIACION_CACHE_SEG", 1800))
+
+# Días después del fin de un periodo antes de mover sus inventarios al archivo (system/archivo.py)
+SIGO_ARCHIVO_DIAS_GRACIA = int(os.getenv("SIGO_ARCHIVO_DIAS_GRACIA", 30))
+
+# Módulos que registran tareas para el programador (manage.py sigo_scheduler)
+SIGO_TAREAS_MODULOS = ["system.tareas"]
+
+# Captchas servidos desde un pool pre-generado (system/captcha_pool.py, comando captcha_pool).
+# Solo aplica a formularios con CaptchaPoolField; con SIGO_CAPTCHA_POOL=False no se rellena el
+# pool ni se toman claves de él. Con CAPTCHA_GET_FROM_POOL la validación no purga la tabla en
+# cada envío; lo hace el comando.
+SIGO_CAPTCHA_POOL = os.getenv("SIGO_CAPTCHA_POOL", "False") == "True"
+CAPTCHA_GET_FROM_POOL = SIGO_CAPTCHA_POOL
+CAPTCHA_GET_FROM_POOL_TIMEOUT = 60  # Minutos que un reto permanece en el pool
+CAPTCHA_TIMEOUT = 5  # Minutos para responder un reto entregado
+SIGO_CAPTCHA_POOL_MINIMO = int(os.getenv("SIGO_CAPTCHA_POOL_MINIMO", 500))
+SIGO_CAPTCHA_POOL_DIR = os.getenv("SIGO_CAPTCHA_POOL_DIR", os.path.join(BASE_DIR, 'captcha_pool'))
 
 # Configuracipón del correo electrónico para notificaciones
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -109,6 +176,13 @@ EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
+# bcrypt: costo de los hashes nuevos y pool acotado para las verificaciones del login
+SIGO_BCRYPT_ROUNDS = int(os.getenv("SIGO_BCRYPT_ROUNDS", 12))
+SIGO_BCRYPT_HILOS = int(os.getenv("SIGO_BCRYPT_HILOS", 4))
+SIGO_BCRYPT_COLA = int(os.getenv("SIGO_BCRYPT_COLA", 32))
+SIGO_BCRYPT_ESPERA_SEG = float(os.getenv("SIGO_BCRYPT_ESPERA_SEG", 5))
+SIGO_BCRYPT_REHASH = os.getenv("SIGO_BCRYPT_REHASH", "True") == "True"
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
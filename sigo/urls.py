@@ -15,15 +15,20 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf.urls.static import static
 from django.conf import settings
 from django.conf.urls import handler404, handler500
 
+from system.captcha_pool import imagen_captcha, refrescar_captcha
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('system.urls')),
     path('', include('system.urls_ga')),
+    # Imagen y refresco del captcha desde el pool pre-generado (deben ir antes de captcha.urls)
+    re_path(r'^captcha/image/(?P<key>\w+)/$', imagen_captcha, name='captcha-image', kwargs={'scale': 1}),
+    re_path(r'^captcha/refresh/$', refrescar_captcha, name='captcha-refresh'),
     path('captcha/', include('captcha.urls')),
 ]
 
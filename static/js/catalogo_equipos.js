@@ -0,0 +1,60 @@
+// Autocompletado de equipos desde el catálogo (system/catalogo.py):
+// al elegir un equipo se llenan marca, modelo, tipo y los valores típicos de captura.
+document.addEventListener('DOMContentLoaded', function () {
+  const buscador = document.getElementById('catalogo-buscar');
+  if (!buscador) {
+    return;
+  }
+  const opciones = document.getElementById('catalogo-opciones');
+  const formulario = buscador.closest('form');
+  let equipos = {};
+  let espera = null;
+
+  function asignar(nombre, valor) {
+    const campo = formulario.querySelector(`[name="${nombre}"]`);
+    if (!campo || valor === null || valor === undefined || valor === '') {
+      return;
+    }
+    campo.value = valor;
+    // Dispara los cálculos de potencia y consumo del formulario
+    campo.dispatchEvent(new Event('input', { bubbles: true }));
+  }
+
+  function aplicar(equipo) {
+    asignar('marca', equipo.marca);
+    asignar('modelo', equipo.modelo);
+    asignar(buscador.dataset.campoTipo, equipo.tipo_equipo);
+    asignar('capacidad', equipo.capacidad);
+    asignar('voltaje', equipo.voltaje);
+    asignar('amperaje', equipo.amperaje);
+  }
+
+  buscador.addEventListener('input', function () {
+    const texto = this.value.trim();
+    if (equipos[texto]) {
+      aplicar(equipos[texto]);
+      return;
+    }
+    clearTimeout(espera);
+    if (texto.length < 2) {
+      return;
+    }
+    espera = setTimeout(function () {
+      const params = new URLSearchParams({ tipo: buscador.dataset.tipo, q: texto });
+      fetch(`${buscador.dataset.url}?${params.toString()}`)
+        .then(r => r.json())
+        .then(data => {
+          equipos = {};
+          opciones.innerHTML = '';
+          (data.resultados || []).forEach(e => {
+            const etiqueta = `${e.marca} ${e.modelo}`.trim();
+            equipos[etiqueta] = e;
+            const opcion = document.createElement('option');
+            opcion.value = etiqueta;
+            opcion.textContent = `${e.tipo_equipo || ''} · ${e.registros} registros`;
+            opciones.appendChild(opcion);
+          });
+        });
+    }, 250);
+  });
+});
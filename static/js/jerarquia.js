@@ -0,0 +1,21 @@
+// Jerarquía de la UR embebida en la página por la vista (system/jerarquia.py):
+// las áreas de cada edificio se filtran aquí, sin peticiones extra al servidor.
+let arbolJerarquiaCache = null;
+
+function arbolJerarquia() {
+  if (arbolJerarquiaCache === null) {
+    const nodo = document.getElementById('jerarquia-ur');
+    arbolJerarquiaCache = nodo ? JSON.parse(nodo.textContent) : false;
+  }
+  return arbolJerarquiaCache;
+}
+
+// Devuelve una promesa para conservar la misma forma que la antigua petición fetch
+function areasDeEdificio(edificioId) {
+  const arbol = arbolJerarquia();
+  if (!arbol) {
+    return Promise.resolve([]);
+  }
+  const edificio = arbol.edificios.find(e => e.id === String(edificioId));
+  return Promise.resolve(edificio ? edificio.areas : []);
+}
@@ -1,7 +1,15 @@
 document.addEventListener('DOMContentLoaded', function () {
+    const tbody = document.getElementById('table-body');
+    const paginationContainer = document.getElementById('pagination');
+
+    // Tablas del servidor (system/tablas.py): el tbody trae data-tabla-url y solo la página actual
+    if (tbody && tbody.dataset.tablaUrl) {
+        iniciarTablaServidor(tbody, paginationContainer);
+        return;
+    }
+
     const rowsPerPage = 8;
     const rows = Array.from(document.querySelectorAll('#table-body tr'));
-    const paginationContainer = document.getElementById('pagination');
 
     function displayRows(startIndex) {
         rows.forEach((row, index) => {
@@ -70,4 +78,99 @@ document.addEventListener('DOMContentLoaded', function () {
     displayRows(0);
     setupPagination();
     setActivePage(0);
-});
\ No newline at end of file
+});
+
+// Paginación, orden y búsqueda pidiendo cada página al servidor
+function iniciarTablaServidor(tbody, paginationContainer) {
+    const estado = {
+        q: new URLSearchParams(window.location.search).get('q') || '',
+        orden: new URLSearchParams(window.location.search).get('orden') || '',
+        pagina: parseInt(tbody.dataset.pagina || '1', 10),
+        paginas: parseInt(tbody.dataset.paginas || '1', 10),
+    };
+    let peticion = null;
+
+    function crearBoton(texto, pagina, deshabilitado, activo) {
+        const li = document.createElement('li');
+        li.className = 'page-item' + (deshabilitado ? ' disabled' : '') + (activo ? ' active' : '');
+        li.innerHTML = `<a class="page-link" href="#">${texto}</a>`;
+        li.addEventListener('click', function (e) {
+            e.preventDefault();
+            if (!deshabilitado && !activo) { cargar({ pagina: pagina }); }
+        });
+        return li;
+    }
+
+    function dibujarPaginacion() {
+        if (!paginationContainer) { return; }
+        paginationContainer.innerHTML = '';
+        paginationContainer.appendChild(crearBoton('&laquo;', estado.pagina - 1, estado.pagina <= 1, false));
+        // Ventana de páginas alrededor de la actual
+        const inicio = Math.max(1, estado.pagina - 3);
+        const fin = Math.min(estado.paginas, estado.pagina + 3);
+        for (let i = inicio; i <= fin; i++) {
+            paginationContainer.appendChild(crearBoton(String(i), i, false, i === estado.pagina));
+        }
+        paginationContainer.appendChild(crearBoton('&raquo;', estado.pagina + 1, estado.pagina >= estado.paginas, false));
+    }
+
+    function marcarOrden() {
+        document.querySelectorAll('th[data-orden]').forEach(th => {
+            const clave = th.dataset.orden;
+            th.style.cursor = 'pointer';
+            th.classList.remove('orden-asc', 'orden-desc');
+            if (estado.orden === clave) { th.classList.add('orden-asc'); }
+            if (estado.orden === '-' + clave) { th.classList.add('orden-desc'); }
+        });
+    }
+
+    function cargar(cambios) {
+        Object.assign(estado, cambios);
+        const params = new URLSearchParams(window.location.search);
+        params.set('pagina', estado.pagina);
+        if (estado.q) { params.set('q', estado.q); } else { params.delete('q'); }
+        if (estado.orden) { params.set('orden', estado.orden); } else { params.delete('orden'); }
+
+        if (peticion) { peticion.abort(); }
+        peticion = new AbortController();
+        fetch(`${tbody.dataset.tablaUrl}?${params.toString()}`, {
+            headers: { 'X-Requested-With': 'XMLHttpRequest' },
+            signal: peticion.signal,
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) {
+                Swal.fire('Error', data.error, 'error');
+                return;
+            }
+            tbody.innerHTML = data.html;
+            estado.pagina = data.pagina;
+            estado.paginas = data.paginas;
+            tbody.dataset.total = data.total;
+            dibujarPaginacion();
+            marcarOrden();
+            // La URL conserva búsqueda, orden y página al recargar
+            window.history.replaceState(null, '', `${window.location.pathname}?${params.toString()}`);
+        })
+        .catch(error => {
+            if (error.name !== 'AbortError') {
+                Swal.fire('Error', 'No se pudo cargar la página.', 'error');
+            }
+        });
+    }
+
+    document.querySelectorAll('th[data-orden]').forEach(th => {
+        th.addEventListener('click', function () {
+            const clave = th.dataset.orden;
+            cargar({ orden: estado.orden === clave ? '-' + clave : clave, pagina: 1 });
+        });
+    });
+
+    // Usado por search.js
+    window.tablaServidor = {
+        buscar: function (texto) { cargar({ q: texto, pagina: 1 }); },
+    };
+
+    dibujarPaginacion();
+    marcarOrden();
+}
@@ -3,6 +3,26 @@
     const searchInput = document.getElementById("input-search");
     const clearBtn = document.getElementById("clear-search");
     const tableRows = document.querySelectorAll("table tbody tr");
+    // Tablas del servidor (data-tabla-url): la búsqueda la resuelve system/tablas.py
+    const tablaServidor = document.querySelector("#table-body[data-tabla-url]");
+    let espera = null;
+
+    function buscarEnServidor(texto) {
+      clearTimeout(espera);
+      espera = setTimeout(function () {
+        if (window.tablaServidor) {
+          window.tablaServidor.buscar(texto);
+        }
+      }, 300);
+    }
+
+    if (tablaServidor) {
+      const inicial = new URLSearchParams(window.location.search).get("q") || "";
+      if (inicial) {
+        searchInput.value = inicial;
+        clearBtn.classList.remove("d-none");
+      }
+    }
 
     // Filtrado en tiempo real
     searchInput.addEventListener("input", function () {
@@ -15,6 +35,11 @@
         clearBtn.classList.add("d-none");
       }
 
+      if (tablaServidor) {
+        buscarEnServidor(this.value.trim());
+        return;
+      }
+
       // Filtrar filas
       tableRows.forEach((row) => {
         const rowText = row.innerText.toLowerCase();
@@ -27,9 +52,14 @@
       searchInput.value = "";
       clearBtn.classList.add("d-none");
 
+      if (tablaServidor) {
+        buscarEnServidor("");
+        return;
+      }
+
       // Mostrar todas las filas al limpiar
       tableRows.forEach((row) => {
         row.style.display = "";
       });
     });
-  });
\ No newline at end of file
+  });
@@ -1,13 +1,10 @@
 from django.apps import AppConfig
-from mongoengine import connect
-from django.conf import settings
 
 class SystemsigoConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'system'
 
     def ready(self):
-        connect(
-            db=settings.MONGODB_SETTINGS['db'],
-            host=settings.MONGODB_SETTINGS['host']
-        )
\ No newline at end of file
+        # Registra la conexión sin abrirla; el cliente se crea en la primera consulta del proceso
+        from system.mongo import configurar_mongo
+        configurar_mongo()
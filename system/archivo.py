@@ -0,0 +1,150 @@
+# system/archivo.py
+"""
+Archivo por año de los inventarios de periodos finalizados.
+
+- ``archivar_periodo()`` mueve los registros de climatización, luminarias y misceláneos de un
+  periodo a ``<coleccion>_archivo_<año>`` (año de ``fecha_fin``). Primero marca
+  ``PeriodoInventario.archivado``: desde ahí el mixin ``PeriodoEditable`` (system/models.py) y
+  las operaciones masivas rechazan escrituras del periodo y las lecturas van al archivo. Luego,
+  por lotes, reemplaza en el archivo la versión viva de cada registro y borra de la colección
+  viva solo los documentos que siguen iguales a esa copia; lo que cambió entre ambos pasos se
+  vuelve a copiar en la siguiente pasada. Si se interrumpe, repetirlo es seguro.
+- ``inventario_de_periodo()`` y ``coleccion_inventario()`` son la ruta de lectura: devuelven el
+  QuerySet o la colección correcta según el periodo, así listas, exportaciones, diferencias y
+  arrastre no necesitan saber dónde están los datos.
+- Solo se archivan periodos finalizados hace más de ``SIGO_ARCHIVO_DIAS_GRACIA`` días y con su
+  snapshot de cierre ya generado (system/historial.py lee la colección viva).
+- Los registros archivados siguen referenciando UR, edificio y área, pero ``DENY`` no revisa
+  las colecciones de archivo: ``verificar_sin_referencias_archivadas()`` (mixin
+  ``ProtegidoPorArchivo`` en system/models.py) rechaza el borrado si aún hay referencias.
+"""
+import re
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from mongoengine.connection import DEFAULT_CONNECTION_NAME, get_db
+from mongoengine.errors import OperationError
+from pymongo import ASCENDING, DESCENDING, DeleteOne, ReplaceOne
+
+from system.models import InventarioClimatizacion, InventarioLuminarias, InventarioMiscelaneos, PeriodoInventario
+from system.mongo import ALIAS_LECTURAS, en_coleccion, lecturas_habilitadas
+
+MODELOS_ARCHIVABLES = [InventarioClimatizacion, InventarioLuminarias, InventarioMiscelaneos]
+TAMANO_LOTE = 1000
+MAX_PASADAS = 3
+
+
+def nombre_coleccion_archivo(modelo, anio):
+    return f"{modelo._get_collection_name()}_archivo_{anio}"
+
+
+def _nombre_coleccion(modelo, periodo):
+    if periodo is not None and periodo.archivado:
+        return nombre_coleccion_archivo(modelo, periodo.fecha_fin.year)
+    return modelo._get_collection_name()
+
+
+# ==================== RUTA DE LECTURA ====================
+
+def coleccion_inventario(modelo, periodo):
+    """Colección de pymongo donde están los registros del periodo (viva o de archivo)."""
+    return get_db()[_nombre_coleccion(modelo, periodo)]
+
+
+def inventario_de_periodo(modelo, periodo, lectura=False, **filtros):
+    """
+    QuerySet de ``modelo`` filtrado por ``periodo`` sobre la colección que le corresponde.
+    Con ``lectura=True`` se consulta en los secundarios, como ``para_lectura``.
+    """
+    queryset = modelo.objects(periodo=periodo, **filtros)
+    alias = ALIAS_LECTURAS if lectura and lecturas_habilitadas() else DEFAULT_CONNECTION_NAME
+    if not periodo.archivado and alias == DEFAULT_CONNECTION_NAME:
+        return queryset
+    return en_coleccion(queryset, _nombre_coleccion(modelo, periodo), alias)
+
+
+def colecciones_archivo(modelo):
+    """Nombres de las colecciones de archivo existentes de ``modelo`` (una por año)."""
+    patron = re.compile(rf"^{re.escape(modelo._get_collection_name())}_archivo_\d{{4}}$")
+    return sorted(n for n in get_db().list_collection_names() if patron.match(n))
+
+
+# ==================== REFERENCIAS ARCHIVADAS ====================
+
+def verificar_sin_referencias_archivadas(documento, campo):
+    """
+    Lanza ``OperationError`` (igual que ``DENY``) si algún inventario archivado referencia
+    ``documento`` en ``campo``. Los borrados de UR, edificios y áreas son raros, por eso basta
+    un ``find_one`` por colección sin índice dedicado.
+    """
+    if not campo or documento.pk is None:
+        return
+    db = get_db()
+    for modelo in MODELOS_ARCHIVABLES:
+        for nombre in colecciones_archivo(modelo):
+            if db[nombre].find_one({campo: documento.pk}, {"_id": 1}) is not None:
+                raise OperationError(
+                    f"Could not delete document ({nombre}.{campo} refers to it in archived periods)"
+                )
+
+
+# ==================== ARCHIVADO ====================
+
+def _preparar_archivo(coleccion):
+    coleccion.create_index([("periodo", ASCENDING), ("unidad_responsable", ASCENDING), ("activo", ASCENDING)])
+    coleccion.create_index(
+        [("activo", ASCENDING), ("fecha_baja", DESCENDING), ("_id", DESCENDING)],
+        partialFilterExpression={"activo": False},
+    )
+
+
+def _mover_lote(viva, archivo, lote):
+    """Copia el lote al archivo (versión viva) y lo borra de la colección viva si no cambió."""
+    archivo.bulk_write([ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in lote], ordered=False)
+    # El filtro es el documento completo: si se modificó después de leerlo, no se borra
+    return viva.bulk_write([DeleteOne(doc) for doc in lote], ordered=False).deleted_count
+
+
+def archivar_periodo(periodo, tamano_lote=TAMANO_LOTE):
+    """Mueve los inventarios del periodo a las colecciones de archivo. Devuelve {colección: movidos}."""
+    db = get_db()
+    movidos = {}
+
+    # 1. A partir de aquí el periodo no admite escrituras y las lecturas van al archivo
+    PeriodoInventario.objects(id=periodo.id).update_one(set__archivado=True)
+    periodo.archivado = True
+
+    # 2. Copia y borrado por lotes; se repite para los registros que cambiaron entre ambos pasos
+    for modelo in MODELOS_ARCHIVABLES:
+        viva = modelo._get_collection()
+        archivo = db[nombre_coleccion_archivo(modelo, periodo.fecha_fin.year)]
+        _preparar_archivo(archivo)
+        total = 0
+        for _ in range(MAX_PASADAS):
+            lote = []
+            for doc in viva.find({"periodo": periodo.id}, batch_size=tamano_lote):
+                lote.append(doc)
+                if len(lote) >= tamano_lote:
+                    total += _mover_lote(viva, archivo, lote)
+                    lote = []
+            if lote:
+                total += _mover_lote(viva, archivo, lote)
+            if viva.count_documents({"periodo": periodo.id}, limit=1) == 0:
+                break
+        movidos[modelo._get_collection_name()] = total
+    return movidos
+
+
+def periodos_por_archivar(ahora=None):
+    ahora = ahora or datetime.now()
+    dias = int(getattr(settings, "SIGO_ARCHIVO_DIAS_GRACIA", 30))
+    return PeriodoInventario.objects(
+        status="Finalizado",
+        archivado__ne=True,
+        snapshot_generado__ne=None,
+        fecha_fin__lt=ahora - timedelta(days=dias),
+    ).order_by('fecha_fin')
+
+
+def archivar_periodos_finalizados():
+    return {periodo.nombre: archivar_periodo(periodo) for periodo in periodos_por_archivar()}
@@ -0,0 +1,439 @@
+# system/benchmarks.py
+"""
+Generación de datos sintéticos y ejecución de benchmarks de las vistas más usadas de SIGO.
+
+- ``sembrar_datos`` genera volúmenes realistas (campus, URs, edificios, áreas, subestaciones,
+  facturas con PDF, inventarios por periodo y bitácoras ambientales) usando ``insert_many``.
+- ``ejecutar_escenarios`` recorre las vistas con el cliente de pruebas de Django y mide
+  latencia (percentiles), número de comandos de MongoDB y memoria pico.
+- Los resultados se comparan contra una línea base guardada en JSON.
+"""
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from pathlib import Path
+
+import bcrypt
+import gridfs
+from bson import ObjectId
+from mongoengine import connect, disconnect
+from mongoengine.connection import DEFAULT_CONNECTION_NAME, get_db
+from mongoengine.fields import GridFSProxy
+
+from system.catalogo import terminos_busqueda
+from system.models import (
+    NIVELES, TerminosBusqueda, Campus, UnidadResponsable, Usuario, Edificio, Area, Subestacion,
+    PeriodoInventario, InventarioClimatizacion, InventarioLuminarias, InventarioMiscelaneos,
+    Tarifas, FacturaEnergeticaTriple, FacturaPdbt, Medidores,
+    BitacoraMensual, AlmacenamientoTemporal, BitacoraGeneracionRPBI, BitacoraRecoleccionRPBI,
+    CentroAcopioRME, VertederoMunicipal, CentroAcopioRRR,
+)
+from system.mongo import ALIAS_LECTURAS
+from system.profiling import RegistroComandosMongo
+
+BASELINE_POR_DEFECTO = Path(__file__).resolve().parent / "benchmark_baseline.json"
+PASSWORD_BENCHMARK = "benchmark"
+EMAIL_ADMIN_BENCHMARK = "bench.admin@sigo.local"
+
+MODELOS_SEMBRADOS = [
+    InventarioClimatizacion, InventarioLuminarias, InventarioMiscelaneos,
+    FacturaEnergeticaTriple, FacturaPdbt, Medidores, Tarifas,
+    BitacoraMensual, AlmacenamientoTemporal, BitacoraGeneracionRPBI, BitacoraRecoleccionRPBI,
+    CentroAcopioRME, VertederoMunicipal, CentroAcopioRRR,
+    PeriodoInventario, Subestacion, Area, Edificio, Usuario, UnidadResponsable, Campus,
+]
+
+MARCAS_CLIMA = ["CARRIER", "LG", "MIRAGE", "YORK", "TRANE", "MIDEA", "SAMSUNG"]
+TIPOS_CLIMA = ["MINISPLIT", "VENTANA", "PAQUETE", "CENTRAL"]
+CAPACIDADES_BTU = [12000, 18000, 24000, 36000, 60000]
+TIPOS_LAMPARA = ["LED", "FLUORESCENTE T8", "FLUORESCENTE T5", "AHORRADOR", "HALOGENO"]
+MISCELANEOS = ["COMPUTADORA", "IMPRESORA", "REFRIGERADOR", "MICROONDAS", "PROYECTOR", "CAFETERA"]
+MARCAS_MISC = ["HP", "DELL", "LENOVO", "EPSON", "MABE", "WHIRLPOOL", "SONY"]
+MESES = ["ENE", "FEB", "MAR", "ABR", "MAY", "JUN", "JUL", "AGO", "SEP", "OCT", "NOV", "DIC"]
+
+PDF_MINIMO = (
+    b"%PDF-1.4\n1 0 obj<<>>endobj\ntrailer<<>>\n%%EOF\n"
+)
+
+
+def conectar_base_benchmark(db, host):
+    """Reemplaza la conexión por defecto por la base de benchmark indicada."""
+    # Sin el alias de lecturas, para_lectura() consulta también la base de benchmark
+    disconnect(ALIAS_LECTURAS)
+    disconnect(DEFAULT_CONNECTION_NAME)
+    connect(db=db, host=host, alias=DEFAULT_CONNECTION_NAME)
+
+
+def _dec(valor, q="0.01"):
+    return Decimal(valor).quantize(Decimal(q), rounding=ROUND_HALF_UP)
+
+
+def _insertar(modelo, documentos, lote=2000):
+    """Inserta documentos de mongoengine en lotes; devuelve los ids generados."""
+    coleccion = modelo._get_collection()
+    if issubclass(modelo, TerminosBusqueda):
+        # insert_many no pasa por save(): los términos de búsqueda se calculan aquí
+        for d in documentos:
+            d.busqueda = terminos_busqueda(*(getattr(d, c, None) for c in modelo.campos_texto))
+    ids = []
+    for i in range(0, len(documentos), lote):
+        bloque = [d.to_mongo().to_dict() for d in documentos[i:i + lote]]
+        for doc in bloque:
+            doc.setdefault("_id", ObjectId())
+        coleccion.insert_many(bloque, ordered=False)
+        ids.extend(doc["_id"] for doc in bloque)
+    return ids
+
+
+def limpiar_datos():
+    for modelo in MODELOS_SEMBRADOS:
+        modelo.drop_collection()
+    db = get_db()
+    for nombre in ("fs.files", "fs.chunks"):
+        db.drop_collection(nombre)
+
+
+def sembrar_datos(campus=3, urs=20, edificios_por_ur=6, areas_por_edificio=8,
+                  subestaciones_por_ur=3, anios=3, registros_por_periodo=3000,
+                  bitacoras=2000, semilla=42, salida=print):
+    """
+    Genera un conjunto de datos sintético y reproducible (misma semilla, mismos datos).
+    ``registros_por_periodo`` es el total de registros de inventario por periodo y tipo.
+    """
+    rnd = random.Random(semilla)
+    fs = gridfs.GridFS(get_db())
+    ahora = datetime.now()
+    password = bcrypt.hashpw(PASSWORD_BENCHMARK.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+
+    # Índices antes de insertar: los únicos parciales (p. ej. periodo+origen_id) solo se respetan
+    # al insertar en mongomock, que al crear el índice sobre datos existentes ignora el filtro.
+    for modelo in MODELOS_SEMBRADOS:
+        modelo.ensure_indexes()
+
+    # === Catálogos ===
+    campus_objs = [
+        Campus(nomenclatura=f"CAMPUS-{i + 1}", ubicacion=f"Ubicación {i + 1}", metros_cuadrados=_dec(rnd.uniform(5000, 90000)))
+        for i in range(campus)
+    ]
+    campus_ids = _insertar(Campus, campus_objs)
+
+    ur_objs = []
+    for i in range(urs):
+        diagrama = fs.put(PDF_MINIMO, filename=f"diagrama_ur_{i + 1}.pdf", contentType="application/pdf")
+        ur_objs.append(UnidadResponsable(nombre=f"UR {i + 1:03d}", total_personas=rnd.randint(50, 3000),
+                                         campus=campus_ids[i % campus],
+                                         diagrama_unifilar=GridFSProxy(grid_id=diagrama)))
+    ur_ids = _insertar(UnidadResponsable, ur_objs)
+    salida(f"Campus: {campus}, URs: {urs}")
+
+    # matricula tiene índice único no disperso: cada usuario necesita la suya (null solo admite uno)
+    admin = Usuario(nombres="Admin", apellidos="Benchmark", email=EMAIL_ADMIN_BENCHMARK,
+                    matricula="BENCH-admin-0", rol="admin", password=password)
+    usuarios = [admin]
+    for i, ur_id in enumerate(ur_ids):
+        usuarios.append(Usuario(nombres=f"Encargado {i + 1}", apellidos="Benchmark",
+                                email=f"encargado{i + 1}@sigo.local", matricula=f"BENCH-encargado_ur-{i + 1}",
+                                rol="encargado_ur", unidad_responsable=ur_id, password=password))
+        usuarios.append(Usuario(nombres=f"Capturista {i + 1}", apellidos="Benchmark",
+                                email=f"capturista{i + 1}@sigo.local", matricula=f"BENCH-capturista-{i + 1}",
+                                rol="capturista", unidad_responsable=ur_id, password=password))
+    usuario_ids = _insertar(Usuario, usuarios)
+    capturistas = {ur_ids[i]: usuario_ids[2 + i * 2] for i in range(len(ur_ids))}
+
+    edificios = {}
+    areas = {}
+    for ur_id in ur_ids:
+        objs = [Edificio(nombre=f"EDIFICIO {chr(65 + e % 26)}{e // 26 or ''}", unidad_responsable=ur_id,
+                         responsable_alta="Benchmark") for e in range(edificios_por_ur)]
+        edificios[ur_id] = _insertar(Edificio, objs)
+        areas_ur = []
+        for edificio_id in edificios[ur_id]:
+            objs = [Area(nombre=f"ÁREA {a + 1}", unidad_responsable=ur_id, edificio=edificio_id,
+                         responsable="Benchmark") for a in range(areas_por_edificio)]
+            areas_ur.extend((edificio_id, area_id) for area_id in _insertar(Area, objs))
+        areas[ur_id] = areas_ur
+    salida(f"Edificios: {urs * edificios_por_ur}, áreas: {urs * edificios_por_ur * areas_por_edificio}")
+
+    _insertar(Tarifas, [
+        Tarifas(nombre=n, descripcion=f"Tarifa {n}", tarifa=_dec(rnd.uniform(1, 4)))
+        for n in ("GDMTH", "GDMTO", "GDBT", "PDBT")
+    ])
+
+    subestaciones = {}
+    for ur_id in ur_ids:
+        objs = [Subestacion(unidad_responsable=ur_id, no_servicio=rnd.randint(100000, 999999),
+                            no_medidor=f"M{rnd.randint(10000, 99999)}",
+                            tarifa=rnd.choice(["GDMTH", "GDMTO", "GDBT", "PDBT"]),
+                            multiplicador=_dec(rnd.choice([1, 40, 80])))
+                for _ in range(subestaciones_por_ur)]
+        subestaciones[ur_id] = list(zip(_insertar(Subestacion, objs), [o.tarifa for o in objs]))
+
+    _insertar(Medidores, [
+        Medidores(unidad_responsable=ur_id, no_medidor=f"M{rnd.randint(10000, 99999)}",
+                  capacidad_transformador=_dec(rnd.uniform(50, 500)))
+        for ur_id in ur_ids for _ in range(2)
+    ])
+
+    # === Facturas mensuales con PDF ===
+    triples, pdbts = [], []
+    for anio in range(ahora.year - anios + 1, ahora.year + 1):
+        for mes in range(12):
+            fecha = datetime(anio, mes + 1, 5)
+            if fecha > ahora:
+                break
+            for ur_id in ur_ids:
+                for sub_id, tarifa in subestaciones[ur_id]:
+                    pdf = fs.put(PDF_MINIMO, filename=f"factura_{sub_id}_{anio}_{mes + 1}.pdf",
+                                 contentType="application/pdf")
+                    consumo = _dec(rnd.uniform(2000, 90000))
+                    comunes = dict(subestacion=sub_id, dias_periodo=rnd.choice([30, 31]),
+                                   periodo=f"{MESES[mes]}-{anio}", consumo=consumo,
+                                   cargo_energia=_dec(consumo * Decimal("1.8")),
+                                   importe_demanda_maxima=_dec(rnd.uniform(1000, 20000)),
+                                   dap=_dec(rnd.uniform(100, 900)), iva=_dec(rnd.uniform(1000, 20000)),
+                                   total_a_pagar=_dec(consumo * Decimal("2.4")),
+                                   fecha_registro=fecha, fecha_vencimiento=fecha + timedelta(days=20),
+                                   archivo_pdf=GridFSProxy(grid_id=pdf), creado_por=usuario_ids[0])
+                    if tarifa == "PDBT":
+                        pdbts.append(FacturaPdbt(**comunes))
+                    else:
+                        triples.append(FacturaEnergeticaTriple(
+                            tipo_tarifa=tarifa, demanda_maxima=rnd.randint(50, 900),
+                            factor_potencia=_dec(rnd.uniform(0.85, 0.99)), factor_carga=rnd.randint(30, 90),
+                            importe_bt=_dec(rnd.uniform(100, 900)), importe_fp=_dec(rnd.uniform(-500, 500)),
+                            status=rnd.choice(["Pagada", "No pagada"]), **comunes))
+    _insertar(FacturaEnergeticaTriple, triples)
+    _insertar(FacturaPdbt, pdbts)
+    salida(f"Facturas triple: {len(triples)}, PDBT: {len(pdbts)}")
+
+    # === Periodos semestrales e inventarios ===
+    periodos = []
+    for anio in range(ahora.year - anios + 1, ahora.year + 1):
+        for semestre, (inicio, fin) in enumerate(((1, 6), (7, 12)), start=1):
+            fecha_inicio = datetime(anio, inicio, 1)
+            fecha_fin = datetime(anio, fin, 28)
+            if fecha_fin < ahora:
+                status = "Finalizado"
+            elif fecha_inicio > ahora:
+                status = "Pendiente"
+            else:
+                status = "Activo"
+            periodos.append(PeriodoInventario(nombre=f"PERIODO_{anio}_{semestre}", fecha_inicio=fecha_inicio,
+                                              fecha_fin=fecha_fin, status=status, activo=status == "Activo",
+                                              persona_autoriza="Admin Benchmark", rol="admin"))
+    periodo_ids = _insertar(PeriodoInventario, periodos)
+
+    def baja():
+        # ~3% de los registros están dados de baja
+        if rnd.random() > 0.03:
+            return {"activo": True}
+        return {"activo": False, "fecha_baja": ahora - timedelta(days=rnd.randint(1, 365 * anios))}
+
+    total_inventario = 0
+    for periodo_id in periodo_ids:
+        clima, lum, misc = [], [], []
+        for n in range(registros_por_periodo):
+            ur_id = ur_ids[n % len(ur_ids)]
+            edificio_id, area_id = rnd.choice(areas[ur_id])
+            base = dict(unidad_responsable=ur_id, edificio=edificio_id, area=area_id,
+                        nivel=rnd.choice(NIVELES), periodo=periodo_id, creado_por=capturistas[ur_id])
+
+            potencia = _dec(rnd.uniform(800, 5000))
+            potencia_total = _dec(potencia / 1000, "0.00001")
+            horas = _dec(rnd.choice([120, 160, 200, 240]))
+            clima.append(InventarioClimatizacion(
+                tipo_clima=rnd.choice(TIPOS_CLIMA), marca=rnd.choice(MARCAS_CLIMA),
+                modelo=f"MOD-{rnd.randint(100, 999)}", capacidad=rnd.choice(CAPACIDADES_BTU),
+                voltaje=_dec(rnd.choice([127, 220])), amperaje=_dec(rnd.uniform(4, 25)), potencia=potencia,
+                potencia_total=potencia_total, horas_mes=horas, consumo_mensual=_dec(potencia_total * horas),
+                **baja(), **base))
+
+            num, lamps, pot_lamp = rnd.randint(1, 30), rnd.randint(1, 4), _dec(rnd.choice([9, 18, 32, 40]))
+            potencia_lum = _dec(num * lamps * pot_lamp / 1000, "0.00001")
+            horas_lum = rnd.choice([120, 200, 300])
+            lum.append(InventarioLuminarias(
+                tipo_lampara=rnd.choice(TIPOS_LAMPARA), num_luminarias=num, lamp_luminarias=lamps,
+                potencia_lamp=pot_lamp, potencia_total_lum=potencia_lum, consumo_mensual_horas=horas_lum,
+                consumo_mensual=_dec(potencia_lum * horas_lum), **baja(), **base))
+
+            potencia_misc = _dec(rnd.uniform(20, 1500))
+            potencia_total_misc = _dec(potencia_misc / 1000, "0.00001")
+            horas_misc = _dec(rnd.choice([40, 80, 160]))
+            misc.append(InventarioMiscelaneos(
+                miscelaneos=rnd.choice(MISCELANEOS), marca=rnd.choice(MARCAS_MISC),
+                modelo=f"X{rnd.randint(10, 99)}", voltaje=_dec(127), amperaje=_dec(rnd.uniform(0.2, 12)),
+                potencia=potencia_misc, potencia_total=potencia_total_misc, horas_mes=horas_misc,
+                consumo_mensual=_dec(potencia_total_misc * horas_misc), **baja(), **base))
+        _insertar(InventarioClimatizacion, clima)
+        _insertar(InventarioLuminarias, lum)
+        _insertar(InventarioMiscelaneos, misc)
+        total_inventario += len(clima) + len(lum) + len(misc)
+    salida(f"Periodos: {len(periodo_ids)}, registros de inventario: {total_inventario}")
+
+    # === Bitácoras ambientales ===
+    ambientales = [
+        (BitacoraMensual, lambda ur: BitacoraMensual(unidad_responsable=ur, laboratorio="LAB", tipo_residuo="QUÍMICO",
+                                                     cantidad=_dec(rnd.uniform(1, 50)), estado_fisico="LÍQUIDO")),
+        (AlmacenamientoTemporal, lambda ur: AlmacenamientoTemporal(unidad_responsable=ur, centro_acopio="CA-1",
+                                                                   tipo_residuo="QUÍMICO", cantidad=_dec(rnd.uniform(1, 50)))),
+        (BitacoraGeneracionRPBI, lambda ur: BitacoraGeneracionRPBI(unidad_responsable=ur, area_dependencia="CLÍNICA",
+                                                                   sangre=str(rnd.randint(0, 10)))),
+        (BitacoraRecoleccionRPBI, lambda ur: BitacoraRecoleccionRPBI(unidad_responsable=ur, area_dependencia="CLÍNICA",
+                                                                     bolsas_rojas=rnd.randint(0, 20))),
+        (CentroAcopioRME, lambda ur: CentroAcopioRME(unidad_responsable=ur, centro_acopio="CA-1", tipo_residuo="RME",
+                                                     cantidad=_dec(rnd.uniform(1, 50)))),
+        (VertederoMunicipal, lambda ur: VertederoMunicipal(unidad_responsable=ur, dependencia="DEP",
+                                                           capacidad=_dec(rnd.uniform(1, 50)))),
+        (CentroAcopioRRR, lambda ur: CentroAcopioRRR(unidad_responsable=ur, centro_acopio="CA-1",
+                                                     pet=str(rnd.randint(0, 100)))),
+    ]
+    for modelo, fabrica in ambientales:
+        _insertar(modelo, [fabrica(rnd.choice(ur_ids)) for _ in range(bitacoras)])
+    salida(f"Bitácoras ambientales: {bitacoras * len(ambientales)}")
+
+    return {
+        "ur_ids": [str(u) for u in ur_ids],
+        "periodo_ids": [str(p) for p in periodo_ids],
+    }
+
+
+# ==================== ESCENARIOS ====================
+
+def escenarios_por_defecto():
+    """
+    Escenarios a medir. Cada escenario define la URL, los parámetros y el usuario que la ejecuta.
+    Los ids de UR y periodo se resuelven contra los datos sembrados.
+    """
+    ur = UnidadResponsable.objects.only("id").order_by("nombre").first()
+    periodo = PeriodoInventario.objects.only("id").order_by("-fecha_inicio").first()
+    ur_id = str(ur.id) if ur else ""
+    periodo_id = str(periodo.id) if periodo else ""
+    anio = str(datetime.now().year)
+
+    return [
+        {"nombre": "login", "metodo": "post", "url": "login",
+         "datos": {"email": EMAIL_ADMIN_BENCHMARK, "password": PASSWORD_BENCHMARK}, "usuario": None},
+        {"nombre": "admin_inventarios_filtro", "url": "inventarios_filtro_triple",
+         "params": {"unidad": ur_id, "periodo": periodo_id, "tipo": "Climatización"}},
+        {"nombre": "exportar_excel_inventario", "url": "exportar_excel_inventario",
+         "params": {"unidad": ur_id, "periodo": periodo_id, "tipo": "Luminarias"}},
+        {"nombre": "listar_facturas_admin", "url": "listar_facturas_admin", "params": {"anio": anio}},
+        {"nombre": "exportar_facturas_triple_admin", "url": "exportar_facturas_triple_admin",
+         "params": {"ur": ur_id}},
+        {"nombre": "exportar_facturas_pdbt_admin", "url": "exportar_facturas_pdbt_admin",
+         "params": {"ur": ur_id}},
+        {"nombre": "listar_climatizacion_encargado", "url": "listar_climatizacion_encargado",
+         "params": {"periodo": periodo_id}, "usuario": "encargado1@sigo.local"},
+    ]
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0
+    k = (len(ordenados) - 1) * p / 100
+    f = int(k)
+    c = min(f + 1, len(ordenados) - 1)
+    return ordenados[f] + (ordenados[c] - ordenados[f]) * (k - f)
+
+
+def _cliente_para(email):
+    from django.test import Client
+
+    cliente = Client()
+    if email:
+        cliente.post("/", {"email": email, "password": PASSWORD_BENCHMARK})
+    return cliente
+
+
+def ejecutar_escenario(escenario, repeticiones=20, calentamiento=2):
+    from django.urls import reverse
+
+    email = escenario.get("usuario", EMAIL_ADMIN_BENCHMARK)
+    cliente = _cliente_para(email)
+    url = reverse(escenario["url"])
+    metodo = escenario.get("metodo", "get")
+
+    def peticion():
+        if metodo == "post":
+            return cliente.post(url, escenario.get("datos", {}))
+        return cliente.get(url, escenario.get("params", {}))
+
+    for _ in range(calentamiento):
+        peticion()
+
+    tiempos, comandos = [], []
+    status = None
+    for _ in range(repeticiones):
+        with RegistroComandosMongo() as registro:
+            inicio = time.perf_counter()
+            respuesta = peticion()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        comandos.append(registro.total)
+        status = respuesta.status_code
+
+    # La memoria se mide en una ejecución aparte para no distorsionar las latencias
+    tracemalloc.start()
+    peticion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "status": status,
+        "repeticiones": repeticiones,
+        "p50_ms": round(_percentil(tiempos, 50), 2),
+        "p90_ms": round(_percentil(tiempos, 90), 2),
+        "p99_ms": round(_percentil(tiempos, 99), 2),
+        "media_ms": round(statistics.mean(tiempos), 2),
+        "comandos_mongo": max(comandos),
+        "memoria_pico_kb": round(pico / 1024, 1),
+    }
+
+
+def ejecutar_escenarios(escenarios, repeticiones=20, filtro=None):
+    resultados = {}
+    for escenario in escenarios:
+        if filtro and escenario["nombre"] not in filtro:
+            continue
+        resultados[escenario["nombre"]] = ejecutar_escenario(escenario, repeticiones)
+    return resultados
+
+
+# ==================== LÍNEA BASE ====================
+
+def cargar_baseline(ruta=BASELINE_POR_DEFECTO):
+    ruta = Path(ruta)
+    if not ruta.exists():
+        return {}
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f).get("resultados", {})
+
+
+def guardar_baseline(resultados, ruta=BASELINE_POR_DEFECTO):
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump({"generado": datetime.now().isoformat(timespec="seconds"), "resultados": resultados},
+                  f, indent=2, ensure_ascii=False)
+
+
+def comparar_con_baseline(resultados, baseline, tolerancia=0.2):
+    """
+    Devuelve la lista de regresiones: latencia p50/p90 por encima de la tolerancia
+    relativa o más comandos de MongoDB que en la línea base.
+    """
+    regresiones = []
+    for nombre, actual in resultados.items():
+        base = baseline.get(nombre)
+        if not base:
+            continue
+        for metrica in ("p50_ms", "p90_ms"):
+            if actual[metrica] > base[metrica] * (1 + tolerancia):
+                regresiones.append(f"{nombre}: {metrica} {actual[metrica]} > {base[metrica]} (+{int(tolerancia * 100)}%)")
+        if actual["comandos_mongo"] > base["comandos_mongo"]:
+            regresiones.append(f"{nombre}: comandos_mongo {actual['comandos_mongo']} > {base['comandos_mongo']}")
+    return regresiones
@@ -0,0 +1,230 @@
+# system/busqueda.py
+"""
+Búsqueda global de SIGO (inventarios, edificios, áreas, subestaciones, facturas y usuarios).
+
+- Cada colección tiene un índice de texto (``$campo`` en ``meta['indexes']``); cada entidad es
+  una sola consulta ``$text`` ordenada por relevancia y limitada a ``POR_ENTIDAD`` resultados,
+  con proyección de los campos que se muestran y sin desreferenciar.
+- El alcance depende del rol: administradores ven todo; encargado de UR y capturista solo su
+  unidad responsable, y cada uno solo las entidades que tiene en su menú.
+- Cada resultado enlaza al listado correspondiente del rol, filtrado por la UR (y por el texto
+  en los inventarios, que usan las tablas del servidor de ``system/tablas.py``).
+"""
+from urllib.parse import urlencode
+
+from django.http import JsonResponse
+from django.urls import reverse
+from django.views.decorators.cache import never_cache
+
+from system.decorators import login_required_custom
+from system.models import (
+    Area, Edificio, FacturaEnergeticaTriple, FacturaPdbt, InventarioClimatizacion,
+    InventarioLuminarias, InventarioMiscelaneos, Subestacion, Usuario,
+)
+from system.views import get_user
+
+POR_ENTIDAD = 8
+MIN_CARACTERES = 2
+MAX_CARACTERES = 100
+ROLES_ADMIN = ["admin", "admin_energia", "admin_ambiental"]
+
+# Entidades que puede buscar cada rol (las que tiene en su menú)
+ENTIDADES_POR_ROL = {
+    "admin": None,
+    "admin_energia": None,
+    "admin_ambiental": None,
+    "encargado_ur": None,
+    "capturista": {"climatizacion", "luminarias", "miscelaneos"},
+}
+
+# Listados de inventario por rol: admin usa el buscador del servidor (?q=)
+LISTADOS_INVENTARIO = {
+    "climatizacion": {"admin": "listado_inventario_climatizacion",
+                      "encargado_ur": "listar_climatizacion_encargado",
+                      "capturista": "listar_inventario_climatizacion"},
+    "luminarias": {"admin": "listado_inventario_luminarias",
+                   "encargado_ur": "listar_luminarias_encargado",
+                   "capturista": "listar_inventario_luminarias"},
+    "miscelaneos": {"admin": "listado_inventario_miscelaneos",
+                    "encargado_ur": "listar_miscelaneos_encargado",
+                    "capturista": "listar_inventario_miscelaneos"},
+}
+
+
+def _url(nombre, **parametros):
+    parametros = {k: v for k, v in parametros.items() if v}
+    url = reverse(nombre)
+    return f"{url}?{urlencode(parametros)}" if parametros else url
+
+
+def _ref_id(valor):
+    """Id de una referencia sin desreferenciar (DBRef u ObjectId)."""
+    if valor is None:
+        return ""
+    return str(getattr(valor, "id", valor))
+
+
+def _texto(modelo, texto, campos, **filtros):
+    """Consulta $text acotada: relevancia, proyección mínima y sin desreferenciar."""
+    return (modelo.objects(**filtros).search_text(texto).order_by("$text_score")
+            .only(*campos).no_dereference().limit(POR_ENTIDAD))
+
+
+# ==================== ENTIDADES ====================
+
+def _inventarios(texto, alcance):
+    modelos = (
+        ("climatizacion", "Climatización", InventarioClimatizacion, "tipo_clima"),
+        ("luminarias", "Luminarias", InventarioLuminarias, "tipo_lampara"),
+        ("miscelaneos", "Misceláneos", InventarioMiscelaneos, "miscelaneos"),
+    )
+    rol_listado = "admin" if alcance.es_admin else alcance.rol
+    for entidad, etiqueta, modelo, campo_tipo in modelos:
+        if not alcance.permite(entidad):
+            continue
+        campos = ["unidad_responsable", "nivel", campo_tipo]
+        if campo_tipo != "tipo_lampara":
+            campos += ["marca", "modelo"]
+        for registro in _texto(modelo, texto, campos, activo__ne=False, **alcance.filtro_ur()):
+            tipo = getattr(registro, campo_tipo) or ""
+            titulo = " ".join(filter(None, [getattr(registro, "marca", ""), getattr(registro, "modelo", "")]))
+            yield {
+                "entidad": entidad,
+                "tipo": etiqueta,
+                "titulo": titulo or tipo,
+                "detalle": " · ".join(filter(None, [tipo if titulo else "", registro.nivel and f"Nivel {registro.nivel}"])),
+                "url": _url(LISTADOS_INVENTARIO[entidad][rol_listado],
+                            unidad_responsable=_ref_id(registro.unidad_responsable) if alcance.es_admin else "",
+                            q=texto if alcance.es_admin else ""),
+            }
+
+
+def _edificios(texto, alcance):
+    if not alcance.permite("edificios"):
+        return
+    for edificio in _texto(Edificio, texto, ["nombre", "unidad_responsable"], **alcance.filtro_ur()):
+        url = (_url("todos_edificios", unidad_id=_ref_id(edificio.unidad_responsable))
+               if alcance.es_admin else _url("lista_edificios"))
+        yield {"entidad": "edificios", "tipo": "Edificio", "titulo": edificio.nombre, "detalle": "", "url": url}
+
+
+def _areas(texto, alcance):
+    if not alcance.permite("areas"):
+        return
+    for area in _texto(Area, texto, ["nombre", "unidad_responsable", "edificio"], **alcance.filtro_ur()):
+        url = (_url("todas_las_areas", unidad_responsable=_ref_id(area.unidad_responsable),
+                    edificio=_ref_id(area.edificio))
+               if alcance.es_admin else _url("lista_areas"))
+        yield {"entidad": "areas", "tipo": "Área", "titulo": area.nombre, "detalle": "", "url": url}
+
+
+def _subestaciones(texto, alcance):
+    if not alcance.permite("subestaciones"):
+        return
+    campos = ["no_medidor", "no_servicio", "tarifa", "unidad_responsable"]
+    encontradas = list(_texto(Subestacion, texto, campos, **alcance.filtro_ur()))
+    # no_servicio es entero: igualdad exacta sobre su índice
+    if texto.isdigit():
+        vistos = {s.id for s in encontradas}
+        encontradas += [s for s in Subestacion.objects(no_servicio=int(texto), **alcance.filtro_ur())
+                        .only(*campos).no_dereference().limit(POR_ENTIDAD) if s.id not in vistos]
+    for sub in encontradas[:POR_ENTIDAD]:
+        url = (_url("admin_subestaciones", ur=_ref_id(sub.unidad_responsable))
+               if alcance.es_admin else _url("listar_subestaciones_encargado"))
+        yield {
+            "entidad": "subestaciones",
+            "tipo": "Subestación",
+            "titulo": f"Medidor {sub.no_medidor or '-'} · Servicio {sub.no_servicio or '-'}",
+            "detalle": sub.tarifa or "",
+            "url": url,
+        }
+
+
+def _facturas(texto, alcance):
+    if not alcance.permite("facturas"):
+        return
+    filtros = {}
+    if not alcance.es_admin:
+        filtros["subestacion__in"] = list(Subestacion.objects(**alcance.filtro_ur()).scalar("id"))
+    modelos = (
+        (FacturaEnergeticaTriple, "listar_facturas_triple_admin", "listar_facturas_triple"),
+        (FacturaPdbt, "listar_facturas_pdbt_admin", "listar_facturas_pdbt"),
+    )
+    for modelo, url_admin, url_encargado in modelos:
+        for factura in _texto(modelo, texto, ["periodo", "tipo_tarifa", "subestacion", "status"], **filtros):
+            url = (_url(url_admin, subestacion=_ref_id(factura.subestacion))
+                   if alcance.es_admin else _url(url_encargado))
+            yield {
+                "entidad": "facturas",
+                "tipo": f"Factura {factura.tipo_tarifa or ''}".strip(),
+                "titulo": factura.periodo or "",
+                "detalle": factura.status or "",
+                "url": url,
+            }
+
+
+def _usuarios(texto, alcance):
+    if not alcance.permite("usuarios"):
+        return
+    filtros = {} if alcance.es_admin else {**alcance.filtro_ur(), "rol": "capturista"}
+    for usuario in _texto(Usuario, texto, ["nombres", "apellidos", "email", "rol"], **filtros):
+        yield {
+            "entidad": "usuarios",
+            "tipo": "Usuario",
+            "titulo": f"{usuario.nombres} {usuario.apellidos}",
+            "detalle": usuario.email,
+            "url": _url("usuarios") if alcance.es_admin else _url("lista_capturistas"),
+        }
+
+
+# ==================== ALCANCE Y VISTA ====================
+
+class Alcance:
+    """Qué entidades y qué unidad responsable puede ver el usuario en la búsqueda."""
+
+    def __init__(self, usuario):
+        self.rol = usuario.rol
+        self.es_admin = usuario.rol in ROLES_ADMIN
+        self.entidades = ENTIDADES_POR_ROL.get(usuario.rol)
+        self.unidad = None if self.es_admin else usuario.unidad_responsable
+
+    def permite(self, entidad):
+        return self.entidades is None or entidad in self.entidades
+
+    def filtro_ur(self):
+        return {} if self.es_admin else {"unidad_responsable": self.unidad}
+
+
+def buscar(usuario, texto):
+    """Lista de resultados de todas las entidades visibles para el usuario, por entidad."""
+    alcance = Alcance(usuario)
+    resultados = []
+    resultados += _inventarios(texto, alcance)
+    resultados += _edificios(texto, alcance)
+    resultados += _areas(texto, alcance)
+    resultados += _subestaciones(texto, alcance)
+    resultados += _facturas(texto, alcance)
+    resultados += _usuarios(texto, alcance)
+    return resultados
+
+
+@never_cache
+@login_required_custom
+def busqueda_global(request):
+    """JSON con los resultados de la búsqueda global (?q=) según el rol del usuario."""
+    user = get_user(request)
+    if not user or user.rol not in ENTIDADES_POR_ROL:
+        return JsonResponse({"error": "Acceso denegado."}, status=403)
+    # Las cuentas de UR sin unidad asignada no tienen nada que buscar
+    if user.rol not in ROLES_ADMIN and not user.unidad_responsable:
+        return JsonResponse({"resultados": [], "total": 0})
+
+    texto = (request.GET.get("q") or "").strip()[:MAX_CARACTERES]
+    if len(texto) < MIN_CARACTERES:
+        return JsonResponse({"resultados": [], "total": 0})
+
+    try:
+        resultados = buscar(user, texto)
+    except Exception as e:
+        return JsonResponse({"error": f"Error en la búsqueda: {e}"}, status=400)
+    return JsonResponse({"resultados": resultados, "total": len(resultados)})
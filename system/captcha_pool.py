@@ -0,0 +1,210 @@
+# system/captcha_pool.py
+"""
+Pool de captchas pre-generados para django-simple-captcha.
+
+- ``generar_pool()`` (comando ``captcha_pool``) crea los retos con un solo ``bulk_create`` y
+  renderiza las imágenes en disco fuera de la petición.
+- ``tomar_clave()`` entrega una clave del pool reclamándola con un UPDATE condicional en
+  ``CaptchaStore`` (le baja la expiración a ``CAPTCHA_TIMEOUT``): solo un worker, en cualquier
+  nodo, puede reclamar cada reto. Con ``SIGO_CAPTCHA_POOL=False`` crea el reto al momento.
+- ``imagen_captcha`` sirve la imagen desde memoria o disco; solo si no existe se delega
+  en la vista original, que la dibuja con Pillow.
+- ``purgar_expirados()`` elimina en bloque los retos vencidos y sus imágenes.
+"""
+import datetime
+import random
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from captcha.conf import settings as captcha_settings
+from captcha.fields import CaptchaField, CaptchaTextInput
+from captcha.helpers import captcha_audio_url, captcha_image_url
+from captcha.models import CaptchaStore
+from captcha.views import captcha_image
+from django.conf import settings
+from django.http import Http404, HttpResponse, JsonResponse
+from django.test import RequestFactory
+from django.utils import timezone
+
+MAX_IMAGENES_MEMORIA = 512
+REFRESCO_LISTADO_SEG = 30
+
+_lock = threading.Lock()
+_imagenes = OrderedDict()
+_disponibles = []
+_listado_en = 0.0
+
+
+def directorio_pool():
+    directorio = Path(getattr(settings, "SIGO_CAPTCHA_POOL_DIR", Path(settings.BASE_DIR) / "captcha_pool"))
+    directorio.mkdir(parents=True, exist_ok=True)
+    return directorio
+
+
+def _vigencia_minima():
+    """Un reto solo se entrega si le queda al menos CAPTCHA_TIMEOUT para ser respondido."""
+    return time.time() + int(captcha_settings.CAPTCHA_TIMEOUT) * 60
+
+
+# ==================== GENERACIÓN Y PURGA (FUERA DE LA PETICIÓN) ====================
+
+def generar_pool(cantidad=500):
+    """Crea ``cantidad`` retos en un solo INSERT y escribe sus imágenes PNG en disco."""
+    vigencia = int(captcha_settings.CAPTCHA_GET_FROM_POOL_TIMEOUT) + int(captcha_settings.CAPTCHA_TIMEOUT)
+    expiracion = timezone.now() + datetime.timedelta(minutes=vigencia)
+    retos = []
+    for _ in range(cantidad):
+        challenge, response = captcha_settings.get_challenge()()
+        retos.append(CaptchaStore(
+            challenge=challenge,
+            response=response.lower(),
+            hashkey=secrets.token_hex(20),
+            expiration=expiracion,
+        ))
+    CaptchaStore.objects.bulk_create(retos, batch_size=500)
+
+    directorio = directorio_pool()
+    peticion = RequestFactory().get("/")
+    marca = int(expiracion.timestamp())
+    for reto in retos:
+        respuesta = captcha_image(peticion, reto.hashkey)
+        if respuesta.status_code == 200:
+            temporal = directorio / f".{reto.hashkey}.tmp"
+            temporal.write_bytes(respuesta.content)
+            # El nombre final aparece completo (rename atómico) para los demás workers
+            temporal.replace(directorio / f"{marca}_{reto.hashkey}.png")
+    return len(retos)
+
+
+def purgar_expirados():
+    """Elimina en bloque los retos vencidos (un DELETE) y sus imágenes; devuelve cuántas imágenes borró."""
+    CaptchaStore.remove_expired()
+    ahora = time.time()
+    borradas = 0
+    for archivo in directorio_pool().glob("*_*.png"):
+        marca, _, _ = archivo.stem.partition("_")
+        if marca.isdigit() and int(marca) <= ahora:
+            archivo.unlink(missing_ok=True)
+            borradas += 1
+    with _lock:
+        _imagenes.clear()
+        _disponibles.clear()
+    return borradas
+
+
+def tamano_pool():
+    minimo = _vigencia_minima()
+    return sum(1 for marca, _ in _listar() if marca > minimo)
+
+
+# ==================== ENTREGA (RUTA CALIENTE) ====================
+
+def _listar():
+    """Lista (marca_expiración, clave) del directorio; se refresca cada REFRESCO_LISTADO_SEG por proceso."""
+    global _listado_en
+    with _lock:
+        if time.monotonic() - _listado_en < REFRESCO_LISTADO_SEG and _disponibles:
+            return list(_disponibles)
+    entradas = []
+    for archivo in directorio_pool().glob("*_*.png"):
+        marca, _, clave = archivo.stem.partition("_")
+        if marca.isdigit():
+            entradas.append((int(marca), clave))
+    with _lock:
+        _disponibles[:] = entradas
+        _listado_en = time.monotonic()
+    return entradas
+
+
+def _reclamar(marca, clave):
+    """
+    Reclama el reto de forma atómica: solo la primera petición encuentra la expiración original
+    del pool y la reemplaza por la de un reto entregado. Devuelve si esta petición lo obtuvo.
+    """
+    original = datetime.datetime.fromtimestamp(marca, tz=datetime.timezone.utc)
+    # Siempre menor que la original, así una segunda petición ya no encuentra el reto
+    entregado = min(timezone.now() + datetime.timedelta(minutes=int(captcha_settings.CAPTCHA_TIMEOUT)),
+                    original - datetime.timedelta(seconds=1))
+    reclamado = CaptchaStore.objects.filter(hashkey=clave, expiration__gte=original).update(expiration=entregado)
+    with _lock:
+        if (marca, clave) in _disponibles:
+            _disponibles.remove((marca, clave))
+    return reclamado == 1
+
+
+def tomar_clave():
+    """
+    Devuelve una clave del pool que no se haya entregado antes.
+    Si el pool está deshabilitado, vacío o agotado se genera un reto al momento (comportamiento original).
+    """
+    if not getattr(settings, "SIGO_CAPTCHA_POOL", False):
+        return CaptchaStore.generate_key()
+    minimo = _vigencia_minima()
+    candidatos = [(marca, clave) for marca, clave in _listar() if marca > minimo]
+    random.shuffle(candidatos)
+    for marca, clave in candidatos:
+        if _reclamar(marca, clave):
+            return clave
+    return CaptchaStore.generate_key()
+
+
+def _leer_imagen(clave):
+    with _lock:
+        if clave in _imagenes:
+            _imagenes.move_to_end(clave)
+            return _imagenes[clave]
+    archivos = list(directorio_pool().glob(f"*_{clave}.png"))
+    if not archivos:
+        return None
+    try:
+        contenido = archivos[0].read_bytes()
+    except FileNotFoundError:
+        return None
+    with _lock:
+        _imagenes[clave] = contenido
+        if len(_imagenes) > MAX_IMAGENES_MEMORIA:
+            _imagenes.popitem(last=False)
+    return contenido
+
+
+def imagen_captcha(request, key, scale=1):
+    """Sirve la imagen pre-generada; si no está en el pool usa la vista de django-simple-captcha."""
+    if scale == 1:
+        contenido = _leer_imagen(key)
+        if contenido is not None:
+            response = HttpResponse(contenido, content_type="image/png")
+            response["Content-length"] = len(contenido)
+            return response
+    return captcha_image(request, key, scale)
+
+
+def refrescar_captcha(request):
+    """Equivalente a ``captcha-refresh`` tomando la nueva clave del pool."""
+    if not request.headers.get("x-requested-with") == "XMLHttpRequest":
+        raise Http404
+    clave = tomar_clave()
+    return JsonResponse({
+        "key": clave,
+        "image_url": captcha_image_url(clave),
+        "audio_url": captcha_audio_url(clave) if captcha_settings.CAPTCHA_FLITE_PATH else None,
+    })
+
+
+# ==================== CAMPO DE FORMULARIO ====================
+
+class CaptchaPoolInput(CaptchaTextInput):
+    """Widget de captcha que toma la clave del pool en lugar de crear un reto al renderizar."""
+
+    def fetch_captcha_store(self, name, value, attrs=None, generator=None):
+        self._key = tomar_clave()
+        self._value = [self._key, ""]
+        self.id_ = self.build_attrs(attrs).get("id", None)
+
+
+class CaptchaPoolField(CaptchaField):
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("widget", CaptchaPoolInput(id_prefix=kwargs.pop("id_prefix", None)))
+        super().__init__(*args, **kwargs)
@@ -0,0 +1,203 @@
+# system/catalogo.py
+"""
+Catálogo normalizado de equipos de climatización y misceláneos.
+
+- ``normalizar()`` quita acentos, espacios y signos y pasa a mayúsculas: "Carrier ", "CARRIER"
+  y "carrier" son la misma marca; "MSY-12HRN" y "MSY 12HRN" el mismo modelo.
+- Cada inventario guarda ``clave_equipo`` (tipo|MARCA|MODELO) al guardarse, así los análisis
+  agrupan por modelo sin comparar textos al consultar.
+- ``reconstruir_catalogo()`` recorre los inventarios con un cursor proyectado, completa las
+  ``clave_equipo`` faltantes y escribe una entrada por clave con la escritura más frecuente y
+  los valores típicos (moda) de capacidad, voltaje, amperaje y potencia. Lo ejecuta la tarea
+  ``catalogo_equipos`` del programador o el comando ``reconstruir_catalogo``.
+- ``catalogo_equipos_api`` (``/api/catalogo/equipos/``) busca por prefijo de marca+modelo o de
+  modelo sobre índices (tipo, texto_norm) y (tipo, modelo_norm) para autocompletar la captura.
+"""
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.http import JsonResponse
+from django.views.decorators.cache import never_cache
+from mongoengine.queryset.visitor import Q
+from pymongo import UpdateOne
+
+from system.decorators import login_required_custom
+from system.models import CatalogoEquipo, InventarioClimatizacion, InventarioMiscelaneos
+
+TAMANO_LOTE = 1000
+MAX_RESULTADOS = 10
+MIN_CARACTERES = 2
+
+# tipo: (modelo de inventario, campo con el tipo de equipo)
+INVENTARIOS_CATALOGO = {
+    "climatizacion": (InventarioClimatizacion, "tipo_clima"),
+    "miscelaneos": (InventarioMiscelaneos, "miscelaneos"),
+}
+
+_NO_ALFANUMERICO = re.compile(r"[^A-Z0-9]")
+_SEPARADORES = re.compile(r"[\W_]+")
+
+
+def normalizar(texto):
+    """Mayúsculas sin acentos ni caracteres que no sean letras o dígitos."""
+    if not texto:
+        return ""
+    sin_acentos = unicodedata.normalize("NFKD", str(texto))
+    sin_acentos = "".join(c for c in sin_acentos if not unicodedata.combining(c))
+    return _NO_ALFANUMERICO.sub("", sin_acentos.upper())
+
+
+def terminos_busqueda(*valores):
+    """
+    Términos normalizados para la búsqueda por prefijo de las tablas (system/tablas.py):
+    cada valor completo y cada palabra (separada por espacios o signos), así "Mini Split" se
+    encuentra por "mini", "split" o "minisplit" y "MSY-12HRN" por "msy12" o "12hrn".
+    """
+    terminos = set()
+    for valor in valores:
+        if not valor:
+            continue
+        terminos.add(normalizar(valor))
+        terminos.update(normalizar(palabra) for palabra in _SEPARADORES.split(str(valor)))
+    terminos.discard("")
+    return sorted(terminos)
+
+
+def clave_equipo(tipo, marca, modelo):
+    """tipo|MARCA|MODELO o None si el registro no tiene marca ni modelo."""
+    marca_norm, modelo_norm = normalizar(marca), normalizar(modelo)
+    if not tipo or not (marca_norm or modelo_norm):
+        return None
+    return f"{tipo}|{marca_norm}|{modelo_norm}"
+
+
+def _decimal(valor, decimales):
+    """Texto decimal con precisión fija para que '220' y '220.00' cuenten como el mismo valor."""
+    if valor in (None, ""):
+        return None
+    try:
+        return str(Decimal(str(valor)).quantize(Decimal(1).scaleb(-decimales)))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _moda(contador):
+    return contador.most_common(1)[0][0] if contador else None
+
+
+# ==================== RECONSTRUCCIÓN ====================
+
+def _acumular(tipo, tamano_lote):
+    """Recorre el inventario vigente: completa clave_equipo y acumula conteos por clave."""
+    modelo, campo_tipo = INVENTARIOS_CATALOGO[tipo]
+    coleccion = modelo._get_collection()
+    proyeccion = {"marca": 1, "modelo": 1, "capacidad": 1, "voltaje": 1, "amperaje": 1,
+                  "potencia": 1, "clave_equipo": 1, campo_tipo: 1}
+
+    datos = defaultdict(lambda: defaultdict(Counter))
+    pendientes = []
+    for doc in coleccion.find({"activo": {"$ne": False}}, proyeccion).batch_size(tamano_lote):
+        clave = clave_equipo(tipo, doc.get("marca"), doc.get("modelo"))
+        if clave != doc.get("clave_equipo"):
+            pendientes.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"clave_equipo": clave}}))
+            if len(pendientes) >= tamano_lote:
+                coleccion.bulk_write(pendientes, ordered=False)
+                pendientes = []
+        if clave is None:
+            continue
+
+        equipo = datos[clave]
+        equipo["registros"][None] += 1
+        for campo in ("marca", "modelo"):
+            if doc.get(campo):
+                equipo[campo][str(doc[campo]).strip()] += 1
+        if doc.get(campo_tipo):
+            equipo["tipo_equipo"][str(doc[campo_tipo]).strip()] += 1
+        if doc.get("capacidad") is not None:
+            equipo["capacidad"][doc["capacidad"]] += 1
+        for campo, decimales in (("voltaje", 2), ("amperaje", 4), ("potencia", 2)):
+            valor = _decimal(doc.get(campo), decimales)
+            if valor is not None:
+                equipo[campo][valor] += 1
+
+    if pendientes:
+        coleccion.bulk_write(pendientes, ordered=False)
+    return datos
+
+
+def reconstruir_catalogo(tamano_lote=TAMANO_LOTE):
+    """Reescribe el catálogo a partir de los inventarios vigentes. Devuelve {tipo: equipos}."""
+    destino = CatalogoEquipo._get_collection()
+    inicio = datetime.now()
+    resultado = {}
+
+    for tipo in INVENTARIOS_CATALOGO:
+        datos = _acumular(tipo, tamano_lote)
+        operaciones = []
+        for clave, equipo in datos.items():
+            _, marca_norm, modelo_norm = clave.split("|", 2)
+            operaciones.append(UpdateOne({"clave": clave}, {"$set": {
+                "tipo": tipo,
+                "marca": _moda(equipo["marca"]) or "",
+                "modelo": _moda(equipo["modelo"]) or "",
+                "marca_norm": marca_norm,
+                "modelo_norm": modelo_norm,
+                "texto_norm": marca_norm + modelo_norm,
+                "tipo_equipo": _moda(equipo["tipo_equipo"]) or "",
+                "capacidad": _moda(equipo["capacidad"]),
+                "voltaje": _moda(equipo["voltaje"]),
+                "amperaje": _moda(equipo["amperaje"]),
+                "potencia": _moda(equipo["potencia"]),
+                "registros": equipo["registros"][None],
+                "actualizado": inicio,
+            }}, upsert=True))
+            if len(operaciones) >= tamano_lote:
+                destino.bulk_write(operaciones, ordered=False)
+                operaciones = []
+        if operaciones:
+            destino.bulk_write(operaciones, ordered=False)
+
+        # Equipos que ya no aparecen en ningún inventario vigente
+        destino.delete_many({"tipo": tipo, "actualizado": {"$lt": inicio}})
+        resultado[tipo] = len(datos)
+    return resultado
+
+
+# ==================== AUTOCOMPLETADO ====================
+
+def buscar_equipos(tipo, texto, limite=MAX_RESULTADOS):
+    """Equipos del catálogo cuyo marca+modelo o modelo empieza con el texto, más frecuentes primero."""
+    prefijo = normalizar(texto)
+    if tipo not in INVENTARIOS_CATALOGO or len(prefijo) < MIN_CARACTERES:
+        return []
+    patron = f"^{re.escape(prefijo)}"
+    equipos = CatalogoEquipo.objects(
+        Q(texto_norm__regex=patron) | Q(modelo_norm__regex=patron), tipo=tipo
+    ).order_by("-registros").limit(limite)
+    return [{
+        "marca": e.marca,
+        "modelo": e.modelo,
+        "tipo_equipo": e.tipo_equipo,
+        "capacidad": e.capacidad,
+        "voltaje": str(e.voltaje) if e.voltaje is not None else None,
+        "amperaje": str(e.amperaje) if e.amperaje is not None else None,
+        "potencia": str(e.potencia) if e.potencia is not None else None,
+        "registros": e.registros,
+    } for e in equipos]
+
+
+@never_cache
+@login_required_custom
+def catalogo_equipos_api(request):
+    """JSON con los equipos del catálogo que coinciden con ?q= para el ?tipo= indicado."""
+    tipo = request.GET.get("tipo", "")
+    if tipo not in INVENTARIOS_CATALOGO:
+        return JsonResponse({"error": "Tipo no válido."}, status=400)
+    try:
+        resultados = buscar_equipos(tipo, request.GET.get("q", ""))
+    except Exception as e:
+        return JsonResponse({"error": f"Error al consultar el catálogo: {e}"}, status=400)
+    return JsonResponse({"resultados": resultados})
@@ -0,0 +1,268 @@
+# system/conciliacion.py
+"""
+Conciliación de consumo facturado (CFE) contra el consumo estimado por los inventarios.
+
+- Las facturas guardan ``periodo`` como texto libre ("ENE-2025", "31 DIC 24 - 31 ENE 25", "01/2025").
+  Al guardarse, el mixin ``MesFactura`` (system/models.py) calcula ``mes`` (primer día del mes
+  en que termina el periodo facturado) con ``mes_de_periodo()``; las facturas anteriores se
+  completan en la primera conciliación. Las que no se pueden interpretar se reportan aparte.
+- Facturado: una agregación por colección de facturas une la subestación ($lookup) para
+  obtener la UR y suma el consumo por (UR, mes) llevado a mes promedio (consumo / días del
+  periodo × 30.4375), así las facturas bimestrales son comparables con las mensuales.
+- Estimado: otra agregación por inventario suma ``consumo_mensual`` vigente por UR en el
+  PeriodoInventario (colección viva o de archivo, system/archivo.py).
+- La brecha (facturado − estimado) es el consumo que el censo de equipos no explica. El
+  resultado por periodo se guarda en la caché; guardar o borrar una factura lo invalida y
+  ``SIGO_CONCILIACION_CACHE_SEG`` acota el desfase por cambios en los inventarios.
+"""
+import re
+import time
+import unicodedata
+from datetime import datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from pymongo import UpdateOne
+
+from system.archivo import coleccion_inventario
+from system.models import (
+    FacturaEnergeticaTriple, FacturaPdbt, InventarioClimatizacion, InventarioLuminarias,
+    InventarioMiscelaneos, Subestacion, UnidadResponsable,
+)
+
+CLAVE_GENERACION = "conciliacion:generacion"
+PREFIJO_CACHE = "conciliacion:periodo:"
+DIAS_MES = 30.4375
+TAMANO_LOTE = 1000
+
+MODELOS_FACTURA = [FacturaEnergeticaTriple, FacturaPdbt]
+INVENTARIOS_CONCILIACION = {
+    "Climatización": InventarioClimatizacion,
+    "Luminarias": InventarioLuminarias,
+    "Misceláneos": InventarioMiscelaneos,
+}
+
+MESES = {"ENE": 1, "FEB": 2, "MAR": 3, "ABR": 4, "MAY": 5, "JUN": 6,
+         "JUL": 7, "AGO": 8, "SEP": 9, "SET": 9, "OCT": 10, "NOV": 11, "DIC": 12}
+_NUMERICO = re.compile(r"\b(\d{4})[/-](\d{1,2})\b|\b(\d{1,2})[/-](\d{4})\b")
+_TOKENS = re.compile(r"[A-Z]+|\d+")
+
+
+def _decimal_mongo(campo):
+    """Expresión de agregación que convierte un DecimalField (texto) a decimal; 0 si no es válido."""
+    return {"$convert": {"input": f"${campo}", "to": "decimal", "onError": 0, "onNull": 0}}
+
+
+def _decimal(valor):
+    return Decimal(str(valor)) if valor is not None else Decimal(0)
+
+
+# ==================== MES DE LA FACTURA ====================
+
+def mes_de_periodo(texto):
+    """
+    Primer día del mes en que termina el periodo facturado, o None si no se reconoce.
+    Con un rango ("DIC 24 - ENE 25", "ENE-FEB 2025") se toma el último mes mencionado.
+    Si el texto trae algún año de 4 dígitos, los números de 2 dígitos se toman como días
+    ("ENE 15 - FEB 14 2025" es febrero de 2025); solo sin año completo se leen como año.
+    """
+    if not texto:
+        return None
+    texto = unicodedata.normalize("NFKD", str(texto))
+    texto = "".join(c for c in texto if not unicodedata.combining(c)).upper()
+
+    encontrados = []
+    for m in _NUMERICO.finditer(texto):
+        anio, mes = (m.group(1), m.group(2)) if m.group(1) else (m.group(4), m.group(3))
+        encontrados.append((m.start(), int(anio), int(mes)))
+
+    tokens = list(_TOKENS.finditer(texto))
+    anio_completo = any(t.group().isdigit() and len(t.group()) == 4 and 2000 <= int(t.group()) <= 2100
+                        for t in tokens)
+    longitud_anio = 4 if anio_completo else 2
+
+    pendiente = None
+    for m in tokens:
+        token = m.group()
+        if token.isalpha():
+            if token[:3] in MESES:
+                pendiente = MESES[token[:3]]
+        elif pendiente and len(token) == longitud_anio:
+            anio = int(token) + (2000 if longitud_anio == 2 else 0)
+            encontrados.append((m.start(), anio, pendiente))
+            pendiente = None
+
+    validos = [(pos, anio, mes) for pos, anio, mes in encontrados if 1 <= mes <= 12 and 2000 <= anio <= 2100]
+    if not validos:
+        return None
+    _, anio, mes = max(validos)
+    return datetime(anio, mes, 1)
+
+
+def _completar_meses(tamano_lote=TAMANO_LOTE):
+    """Calcula ``mes`` de las facturas registradas antes de que existiera el campo."""
+    for modelo in MODELOS_FACTURA:
+        coleccion = modelo._get_collection()
+        operaciones = []
+        for doc in coleccion.find({"mes": {"$exists": False}}, {"periodo": 1}).batch_size(tamano_lote):
+            operaciones.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"mes": mes_de_periodo(doc.get("periodo"))}}))
+            if len(operaciones) >= tamano_lote:
+                coleccion.bulk_write(operaciones, ordered=False)
+                operaciones = []
+        if operaciones:
+            coleccion.bulk_write(operaciones, ordered=False)
+
+
+# ==================== CACHÉ ====================
+
+def _generacion():
+    generacion = cache.get(CLAVE_GENERACION)
+    if generacion is None:
+        cache.add(CLAVE_GENERACION, 1, timeout=None)
+        generacion = cache.get(CLAVE_GENERACION, 1)
+    return generacion
+
+
+def invalidar_conciliacion():
+    """Descarta las conciliaciones cacheadas (se llama al guardar o borrar una factura)."""
+    try:
+        cache.incr(CLAVE_GENERACION)
+    except ValueError:
+        cache.set(CLAVE_GENERACION, 1, timeout=None)
+
+
+# ==================== AGREGACIONES ====================
+
+def meses_del_periodo(periodo):
+    """Primer día de cada mes que toca el PeriodoInventario."""
+    meses = []
+    anio, mes = periodo.fecha_inicio.year, periodo.fecha_inicio.month
+    while (anio, mes) <= (periodo.fecha_fin.year, periodo.fecha_fin.month):
+        meses.append(datetime(anio, mes, 1))
+        anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+    return meses
+
+
+def facturado_por_ur_mes(meses):
+    """{(ur_id, mes): {"kwh": Decimal, "facturas": n}} con el consumo mensualizado."""
+    resultado = {}
+    for modelo in MODELOS_FACTURA:
+        for r in modelo._get_collection().aggregate([
+            {"$match": {"mes": {"$in": meses}}},
+            {"$lookup": {"from": Subestacion._get_collection_name(), "localField": "subestacion",
+                         "foreignField": "_id", "as": "sub"}},
+            {"$unwind": "$sub"},
+            {"$project": {
+                "ur": "$sub.unidad_responsable",
+                "mes": 1,
+                "kwh": {"$cond": [
+                    {"$gt": ["$dias_periodo", 0]},
+                    {"$multiply": [{"$divide": [_decimal_mongo("consumo"), "$dias_periodo"]}, DIAS_MES]},
+                    _decimal_mongo("consumo"),
+                ]},
+            }},
+            {"$group": {"_id": {"ur": "$ur", "mes": "$mes"}, "kwh": {"$sum": "$kwh"}, "facturas": {"$sum": 1}}},
+        ]):
+            clave = (str(r["_id"]["ur"]), r["_id"]["mes"])
+            acumulado = resultado.setdefault(clave, {"kwh": Decimal(0), "facturas": 0})
+            acumulado["kwh"] += _decimal(r["kwh"])
+            acumulado["facturas"] += r["facturas"]
+    return resultado
+
+
+def estimado_por_ur(periodo):
+    """{ur_id: {"kwh": Decimal, "por_tipo": {tipo: Decimal}, "registros": n}} del inventario vigente."""
+    resultado = {}
+    for tipo, modelo in INVENTARIOS_CONCILIACION.items():
+        for r in coleccion_inventario(modelo, periodo).aggregate([
+            {"$match": {"periodo": periodo.id, "activo": {"$ne": False}}},
+            {"$group": {"_id": "$unidad_responsable", "kwh": {"$sum": _decimal_mongo("consumo_mensual")},
+                        "registros": {"$sum": 1}}},
+        ]):
+            acumulado = resultado.setdefault(str(r["_id"]), {"kwh": Decimal(0), "por_tipo": {}, "registros": 0})
+            kwh = _decimal(r["kwh"])
+            acumulado["kwh"] += kwh
+            acumulado["por_tipo"][tipo] = kwh
+            acumulado["registros"] += r["registros"]
+    return resultado
+
+
+def _porcentaje(parte, total):
+    return (parte * 100 / total).quantize(Decimal("0.1")) if total else None
+
+
+# ==================== CONCILIACIÓN ====================
+
+def conciliar(periodo):
+    """
+    Compara por UR y mes el consumo facturado con el estimado del inventario del periodo.
+    Las UR se ordenan por la brecha promedio absoluta (las que más difieren primero).
+    """
+    _completar_meses()
+    meses = meses_del_periodo(periodo)
+    facturado = facturado_por_ur_mes(meses)
+    estimado = estimado_por_ur(periodo)
+
+    ids = set(estimado) | {ur for ur, _ in facturado}
+    nombres = {str(u["_id"]): u.get("nombre", "") for u in UnidadResponsable.objects(
+        id__in=[i for i in ids if i and i != "None"]).only("nombre").as_pymongo()}
+
+    unidades = []
+    for ur in ids:
+        inventario = estimado.get(ur, {"kwh": Decimal(0), "por_tipo": {}, "registros": 0})
+        kwh_estimado = inventario["kwh"].quantize(Decimal("0.01"))
+        filas = []
+        for mes in meses:
+            factura = facturado.get((ur, mes))
+            if factura is None:
+                filas.append({"mes": mes, "facturado": None, "brecha": None, "brecha_pct": None, "facturas": 0})
+                continue
+            kwh_facturado = factura["kwh"].quantize(Decimal("0.01"))
+            brecha = kwh_facturado - kwh_estimado
+            filas.append({"mes": mes, "facturado": kwh_facturado, "brecha": brecha,
+                          "brecha_pct": _porcentaje(brecha, kwh_facturado), "facturas": factura["facturas"]})
+
+        con_factura = [f for f in filas if f["facturado"] is not None]
+        promedio = (sum((f["facturado"] for f in con_factura), Decimal(0)) / len(con_factura)).quantize(
+            Decimal("0.01")) if con_factura else None
+        brecha = promedio - kwh_estimado if promedio is not None else None
+        unidades.append({
+            "ur": ur,
+            "nombre": nombres.get(ur, "Sin UR"),
+            "estimado": kwh_estimado,
+            "estimado_por_tipo": [{"tipo": t, "kwh": inventario["por_tipo"].get(t, Decimal(0))}
+                                  for t in INVENTARIOS_CONCILIACION],
+            "registros": inventario["registros"],
+            "meses": filas,
+            "facturado_promedio": promedio,
+            "brecha": brecha,
+            "brecha_pct": _porcentaje(brecha, promedio) if brecha is not None else None,
+        })
+    unidades.sort(key=lambda u: abs(u["brecha"]) if u["brecha"] is not None else Decimal(-1), reverse=True)
+
+    facturado_total = sum((u["facturado_promedio"] for u in unidades if u["facturado_promedio"] is not None), Decimal(0))
+    estimado_total = sum((u["estimado"] for u in unidades), Decimal(0))
+    return {
+        "periodo": {"id": str(periodo.id), "nombre": periodo.nombre},
+        "meses": meses,
+        "unidades": unidades,
+        "totales": {
+            "facturado_promedio": facturado_total,
+            "estimado": estimado_total,
+            "brecha": facturado_total - estimado_total,
+            "brecha_pct": _porcentaje(facturado_total - estimado_total, facturado_total),
+        },
+        "facturas_sin_mes": sum(m._get_collection().count_documents({"mes": None}) for m in MODELOS_FACTURA),
+        "generado": int(time.time()),
+    }
+
+
+def conciliacion_periodo(periodo, actualizar=False):
+    """``conciliar`` cacheado por periodo hasta el siguiente cambio de facturas."""
+    clave = f"{PREFIJO_CACHE}{periodo.id}:{_generacion()}"
+    resultado = None if actualizar else cache.get(clave)
+    if resultado is None:
+        resultado = conciliar(periodo)
+        cache.set(clave, resultado, timeout=int(getattr(settings, "SIGO_CONCILIACION_CACHE_SEG", 1800)))
+    return resultado
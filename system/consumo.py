@@ -0,0 +1,147 @@
+# system/consumo.py
+"""
+Cálculo único de potencia total y consumo mensual de los inventarios.
+
+- Climatización y misceláneos: ``potencia_total = potencia / 1000`` (W → kW).
+  Luminarias: ``potencia_total_lum = num_luminarias * lamp_luminarias * potencia_lamp / 1000``.
+  En todos: ``consumo_mensual = potencia_total * horas`` (kWh).
+- Se redondea con ROUND_HALF_UP a la precisión de los campos (5 decimales la potencia, 2 el
+  consumo), igual que el ``DecimalField`` al guardar, para que el valor calculado y el guardado
+  coincidan y el recálculo masivo solo reescriba lo que de verdad cambió.
+- El mixin ``ConsumoInventario`` (system/models.py) aplica ``aplicar_consumo()`` en cada
+  ``save()``, así capturista y administrador usan la misma fórmula aunque el formulario mande
+  otra cosa.
+- ``recalcular_periodo()`` rehace potencia y consumo de un periodo completo con un cursor
+  proyectado y ``bulk_write`` por lotes; opcionalmente fija nuevas horas. Lo usa el comando
+  ``recalcular_consumo``.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from pymongo import UpdateOne
+
+from system.models import InventarioClimatizacion, InventarioLuminarias, InventarioMiscelaneos
+
+TAMANO_LOTE = 1000
+PRECISION_POTENCIA = Decimal("0.00001")
+PRECISION_CONSUMO = Decimal("0.01")
+PRECISION_HORAS = Decimal("0.01")
+MIL = Decimal(1000)
+
+
+def _potencia_equipo(potencia):
+    return potencia / MIL
+
+
+def _potencia_luminarias(num_luminarias, lamp_luminarias, potencia_lamp):
+    return num_luminarias * lamp_luminarias * potencia_lamp / MIL
+
+
+# tipo: (campos de entrada, fórmula de potencia total, campo de potencia total, campo de horas)
+FORMULAS = {
+    "climatizacion": (["potencia"], _potencia_equipo, "potencia_total", "horas_mes"),
+    "luminarias": (["num_luminarias", "lamp_luminarias", "potencia_lamp"], _potencia_luminarias,
+                   "potencia_total_lum", "consumo_mensual_horas"),
+    "miscelaneos": (["potencia"], _potencia_equipo, "potencia_total", "horas_mes"),
+}
+MODELOS = {
+    "climatizacion": InventarioClimatizacion,
+    "luminarias": InventarioLuminarias,
+    "miscelaneos": InventarioMiscelaneos,
+}
+
+
+def _decimal(valor):
+    if valor in (None, ""):
+        return None
+    try:
+        return Decimal(str(valor))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _leer(datos, campo):
+    """Valor de un documento o de un dict crudo de Mongo."""
+    return datos.get(campo) if isinstance(datos, dict) else getattr(datos, campo, None)
+
+
+def normalizar_horas(tipo, horas):
+    """Horas con el tipo del campo: entero en luminarias, 2 decimales en los demás."""
+    horas = _decimal(horas)
+    if horas is None:
+        return None
+    if FORMULAS[tipo][3] == "consumo_mensual_horas":
+        return int(horas.to_integral_value(rounding=ROUND_HALF_UP))
+    return horas.quantize(PRECISION_HORAS, rounding=ROUND_HALF_UP)
+
+
+def calcular(tipo, datos, horas=None):
+    """
+    (potencia_total, consumo_mensual) en Decimal para ``datos`` (documento o dict).
+    ``horas`` sustituye a las del registro. None si falta algún dato de entrada.
+    """
+    entradas, formula, _, campo_horas = FORMULAS[tipo]
+    valores = [_decimal(_leer(datos, campo)) for campo in entradas]
+    horas = _decimal(horas if horas is not None else _leer(datos, campo_horas))
+    if horas is None or any(v is None for v in valores):
+        return None
+    potencia_total = formula(*valores).quantize(PRECISION_POTENCIA, rounding=ROUND_HALF_UP)
+    consumo = (potencia_total * horas).quantize(PRECISION_CONSUMO, rounding=ROUND_HALF_UP)
+    return potencia_total, consumo
+
+
+def aplicar_consumo(tipo, registro):
+    """Asigna potencia total y consumo mensual al documento antes de guardarlo."""
+    resultado = calcular(tipo, registro)
+    if resultado is None:
+        return
+    campo_potencia = FORMULAS[tipo][2]
+    setattr(registro, campo_potencia, resultado[0])
+    registro.consumo_mensual = resultado[1]
+
+
+# ==================== RECÁLCULO MASIVO ====================
+
+def _escribir(coleccion, operaciones, simular):
+    if simular or not operaciones:
+        return len(operaciones)
+    return coleccion.bulk_write(operaciones, ordered=False).modified_count
+
+
+def recalcular_periodo(periodo, tipos=None, horas=None, simular=False, tamano_lote=TAMANO_LOTE):
+    """
+    Recalcula potencia total y consumo de todos los registros del periodo (vigentes y bajas).
+    Trabaja sobre la colección viva: los periodos archivados no se modifican.
+    - ``horas``: si se indica, también se fijan esas horas en cada registro.
+    - ``simular``: solo cuenta los registros que cambiarían.
+    Devuelve {tipo: (revisados, modificados)}.
+    """
+    resultado = {}
+    for tipo in tipos or FORMULAS:
+        modelo = MODELOS[tipo]
+        entradas, _, campo_potencia, campo_horas = FORMULAS[tipo]
+        coleccion = modelo._get_collection()
+        horas_tipo = normalizar_horas(tipo, horas) if horas is not None else None
+        proyeccion = dict.fromkeys(entradas + [campo_potencia, campo_horas, "consumo_mensual"], 1)
+
+        revisados = modificados = 0
+        operaciones = []
+        for doc in coleccion.find({"periodo": periodo.id}, proyeccion).batch_size(tamano_lote):
+            revisados += 1
+            calculado = calcular(tipo, doc, horas_tipo)
+            if calculado is None:
+                continue
+            cambios = {}
+            if str(calculado[0]) != str(doc.get(campo_potencia)):
+                cambios[campo_potencia] = str(calculado[0])
+            if str(calculado[1]) != str(doc.get("consumo_mensual")):
+                cambios["consumo_mensual"] = str(calculado[1])
+            if horas_tipo is not None and _decimal(doc.get(campo_horas)) != horas_tipo:
+                cambios[campo_horas] = horas_tipo if isinstance(horas_tipo, int) else str(horas_tipo)
+            if cambios:
+                operaciones.append(UpdateOne({"_id": doc["_id"]}, {"$set": cambios}))
+            if len(operaciones) >= tamano_lote:
+                modificados += _escribir(coleccion, operaciones, simular)
+                operaciones = []
+        modificados += _escribir(coleccion, operaciones, simular)
+        resultado[tipo] = (revisados, modificados)
+    return resultado
@@ -0,0 +1,194 @@
+# system/duplicados.py
+"""
+Detección de capturas duplicadas en los inventarios.
+
+- Cada registro guarda una ``huella``: SHA-1 de UR, periodo, edificio, área, nivel y el equipo
+  (tipo/marca/modelo normalizados con ``system.catalogo.normalizar``). Dos capturas del mismo
+  equipo en el mismo lugar tienen la misma huella aunque difieran en mayúsculas o acentos.
+- Al guardar, una consulta sobre el índice (periodo, huella) dice si ya existe otro registro
+  vigente igual; si es así el grupo entra a la cola ``DuplicadoInventario`` y el registro queda
+  con ``posible_duplicado`` para que la vista avise al capturista.
+- ``detectar_duplicados()`` recorre un periodo completo: completa huellas faltantes y agrupa
+  colisiones con una sola agregación ($group por huella) por tipo, sin comparar registros entre sí.
+  Lo ejecuta la tarea ``detectar_duplicados`` del programador o el comando del mismo nombre.
+- La cola se revisa en ``/inventario/duplicados/``: descartar (no son duplicados) o dar de baja
+  los registros sobrantes.
+"""
+import hashlib
+import logging
+from datetime import datetime
+
+from django.contrib import messages
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from system.catalogo import normalizar
+from system.models import (
+    DuplicadoInventario, InventarioClimatizacion, InventarioLuminarias, InventarioMiscelaneos,
+)
+
+logger = logging.getLogger(__name__)
+
+TAMANO_LOTE = 1000
+
+# tipo: (modelo, campos del equipo que entran en la huella además de la ubicación)
+INVENTARIOS_DUPLICADOS = {
+    "climatizacion": (InventarioClimatizacion, ["tipo_clima", "marca", "modelo"]),
+    "luminarias": (InventarioLuminarias, ["tipo_lampara"]),
+    "miscelaneos": (InventarioMiscelaneos, ["miscelaneos", "marca", "modelo"]),
+}
+CAMPOS_UBICACION = ["unidad_responsable", "periodo", "edificio", "area"]
+
+
+def _id(valor):
+    """Id en texto de un documento, referencia (DBRef) u ObjectId."""
+    if valor is None:
+        return ""
+    return str(getattr(valor, "id", valor))
+
+
+def huella_de(tipo, datos):
+    """
+    Huella de un registro: ``datos`` puede ser el documento o un dict crudo de Mongo.
+    None si falta el periodo (no hay contra qué comparar).
+    """
+    if not isinstance(datos, dict):
+        datos = datos._data
+    if not datos.get("periodo"):
+        return None
+    partes = [_id(datos.get(campo)) for campo in CAMPOS_UBICACION]
+    partes.append(normalizar(datos.get("nivel")))
+    partes += [normalizar(datos.get(campo)) for campo in INVENTARIOS_DUPLICADOS[tipo][1]]
+    return hashlib.sha1("|".join(partes).encode("utf-8")).hexdigest()
+
+
+def _encolar(tipo, huella, periodo, unidad, ids):
+    """
+    Agrega los registros al grupo de la cola y lo deja pendiente de revisión. Un grupo
+    descartado ("no son duplicados") no se reabre si sus registros no cambiaron, así volver
+    a guardar uno de ellos no lo regresa a la cola. Devuelve si el grupo quedó pendiente.
+    """
+    cola = DuplicadoInventario._get_collection()
+    previo = cola.find_one({"tipo": tipo, "huella": huella}, {"estado": 1, "registros": 1})
+    if previo and previo.get("estado") == "descartado" and set(ids) <= set(previo.get("registros", [])):
+        return False
+    filtro = {"tipo": tipo, "huella": huella}
+    cambios = {
+        "$addToSet": {"registros": {"$each": list(ids)}},
+        "$set": {"estado": "pendiente", "detectado": datetime.now(),
+                 "periodo": periodo, "unidad_responsable": unidad},
+        "$unset": {"revisado_por": "", "fecha_revision": ""},
+    }
+    try:
+        cola.update_one(filtro, cambios, upsert=True)
+    except DuplicateKeyError:
+        # Otro guardado simultáneo creó el grupo entre la búsqueda y el upsert: ahora ya existe
+        cola.update_one(filtro, cambios)
+    return True
+
+
+def registrar_en_revision(tipo, registro):
+    """
+    Tras guardar: si hay otro registro vigente con la misma huella, encola el grupo.
+    Devuelve si el registro quedó en revisión (para avisar al capturista). El registro ya está
+    guardado, así que un error aquí solo se registra: ``detectar_duplicados`` lo encola después.
+    """
+    if not registro.huella or registro.activo is False:
+        return False
+    try:
+        return _registrar_en_revision(tipo, registro)
+    except Exception:
+        logger.exception("No se pudo encolar la revisión de duplicados del registro %s", registro.id)
+        return False
+
+
+def _registrar_en_revision(tipo, registro):
+    modelo = INVENTARIOS_DUPLICADOS[tipo][0]
+    periodo = registro._data.get("periodo")
+    otros = list(modelo.objects(
+        periodo=getattr(periodo, "id", periodo), huella=registro.huella, activo__ne=False, id__ne=registro.id
+    ).scalar("id").limit(50))
+    if not otros:
+        return False
+    unidad = registro._data.get("unidad_responsable")
+    return _encolar(tipo, registro.huella, getattr(periodo, "id", periodo), getattr(unidad, "id", unidad),
+                    otros + [registro.id])
+
+
+def avisar_posible_duplicado(request, registro):
+    """Mensaje para el capturista cuando el registro guardado quedó en revisión."""
+    if getattr(registro, "posible_duplicado", False):
+        messages.warning(
+            request,
+            "Ya existe un registro igual en el mismo edificio, área y nivel para este periodo; "
+            "quedó marcado como posible duplicado para revisión."
+        )
+
+
+# ==================== DETECCIÓN POR PERIODO ====================
+
+def _completar_huellas(tipo, periodo, tamano_lote):
+    """Calcula la huella de los registros del periodo que aún no la tienen (capturas anteriores)."""
+    modelo, campos = INVENTARIOS_DUPLICADOS[tipo]
+    coleccion = modelo._get_collection()
+    proyeccion = {campo: 1 for campo in CAMPOS_UBICACION + ["nivel"] + campos}
+    operaciones = []
+    total = 0
+    for doc in coleccion.find({"periodo": periodo.id, "huella": None}, proyeccion).batch_size(tamano_lote):
+        operaciones.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"huella": huella_de(tipo, doc)}}))
+        if len(operaciones) >= tamano_lote:
+            total += coleccion.bulk_write(operaciones, ordered=False).modified_count
+            operaciones = []
+    if operaciones:
+        total += coleccion.bulk_write(operaciones, ordered=False).modified_count
+    return total
+
+
+def detectar_duplicados(periodo, tamano_lote=TAMANO_LOTE):
+    """
+    Sincroniza la cola con las colisiones actuales del periodo. Los grupos nuevos o que
+    cambiaron quedan pendientes; los que ya no colisionan (bajas) pasan a resueltos.
+    Devuelve {tipo: grupos con duplicados}.
+    """
+    cola = DuplicadoInventario._get_collection()
+    resultado = {}
+    for tipo, (modelo, _) in INVENTARIOS_DUPLICADOS.items():
+        _completar_huellas(tipo, periodo, tamano_lote)
+        grupos = modelo._get_collection().aggregate([
+            {"$match": {"periodo": periodo.id, "activo": {"$ne": False}, "huella": {"$ne": None}}},
+            {"$group": {"_id": "$huella", "registros": {"$push": "$_id"},
+                        "unidad_responsable": {"$first": "$unidad_responsable"}, "total": {"$sum": 1}}},
+            {"$match": {"total": {"$gt": 1}}},
+        ], allowDiskUse=True)
+
+        existentes = {d["huella"]: d for d in cola.find(
+            {"tipo": tipo, "periodo": periodo.id}, {"huella": 1, "registros": 1, "estado": 1})}
+        vigentes = set()
+        ahora = datetime.now()
+        for grupo in grupos:
+            vigentes.add(grupo["_id"])
+            previo = existentes.get(grupo["_id"])
+            # Un grupo ya revisado solo se reabre si cambiaron sus registros
+            if previo and set(previo.get("registros", [])) == set(grupo["registros"]) \
+                    and previo.get("estado") != "resuelto":
+                continue
+            cola.update_one({"tipo": tipo, "huella": grupo["_id"]}, {
+                "$set": {"registros": grupo["registros"], "estado": "pendiente", "detectado": ahora,
+                         "periodo": periodo.id, "unidad_responsable": grupo["unidad_responsable"]},
+                "$unset": {"revisado_por": "", "fecha_revision": ""},
+            }, upsert=True)
+
+        # Grupos que ya no tienen colisión (se dieron de baja los sobrantes)
+        sin_colision = [h for h, d in existentes.items() if h not in vigentes and d.get("estado") == "pendiente"]
+        if sin_colision:
+            cola.update_many({"tipo": tipo, "huella": {"$in": sin_colision}},
+                             {"$set": {"estado": "resuelto", "fecha_revision": ahora}})
+        resultado[tipo] = len(vigentes)
+    return resultado
+
+
+def detectar_duplicados_periodo_activo():
+    from system.periodos import obtener_periodo_activo
+
+    periodo = obtener_periodo_activo()
+    return detectar_duplicados(periodo) if periodo else {}
@@ -0,0 +1,50 @@
+from django.contrib import messages
+from django.shortcuts import render, redirect
+from django.views.decorators.cache import never_cache
+
+from system.conciliacion import conciliacion_periodo
+from system.decorators import login_required_custom
+from system.models import PeriodoInventario
+from system.periodos import obtener_periodo_activo
+from system.views import get_user
+
+ROLES_CONCILIACION = ["admin", "admin_energia"]
+
+
+@never_cache
+@login_required_custom
+def conciliacion_energia_admin(request):
+    """
+    Consumo facturado vs. consumo estimado por el inventario, por UR y mes.
+    - Filtro GET: periodo (activo por defecto); ?actualizar=1 recalcula sin usar la caché.
+    """
+    user = get_user(request)
+    if not user or user.rol not in ROLES_CONCILIACION:
+        messages.error(request, "Acceso denegado.")
+        return redirect("login")
+
+    periodos = PeriodoInventario.objects.order_by("-fecha_inicio")
+    periodo = None
+    periodo_id = request.GET.get("periodo")
+    if periodo_id:
+        try:
+            periodo = PeriodoInventario.objects(id=periodo_id).first()
+        except Exception:
+            periodo = None
+    else:
+        periodo = obtener_periodo_activo() or periodos.first()
+
+    conciliacion = None
+    if periodo:
+        try:
+            conciliacion = conciliacion_periodo(periodo, actualizar=request.GET.get("actualizar") == "1")
+        except Exception as e:
+            messages.error(request, f"Error al conciliar facturas e inventario: {e}")
+    else:
+        messages.error(request, "No hay periodos de inventario registrados.")
+
+    return render(request, "systemsigo/Energia/conciliacion.html", {
+        "periodos": periodos,
+        "periodo_seleccionado": periodo,
+        "conciliacion": conciliacion,
+    })
@@ -0,0 +1,155 @@
+from datetime import datetime
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from django.contrib import messages
+from django.shortcuts import render, redirect
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_POST
+
+from system.decorators import login_required_custom
+from system.duplicados import INVENTARIOS_DUPLICADOS
+from system.inventario_masivo import INVENTARIOS, OperacionMasivaInvalida, baja_masiva
+from system.models import DuplicadoInventario, PeriodoInventario
+from system.paginacion import pagina_keyset
+from system.periodos import obtener_periodo_activo
+from system.views import get_user
+
+ROLES_ADMIN = ["admin", "admin_energia", "admin_ambiental"]
+ESTADOS = ["pendiente", "descartado", "resuelto"]
+
+
+def _es_admin(request):
+    user = get_user(request)
+    if not user or user.rol not in ROLES_ADMIN:
+        messages.error(request, "Acceso denegado.")
+        return None
+    return user
+
+
+def _cargar_registros(grupos):
+    """Agrega a cada grupo sus registros de inventario (una consulta por tipo)."""
+    ids_por_tipo = {}
+    for grupo in grupos:
+        ids_por_tipo.setdefault(grupo.tipo, []).extend(grupo.registros)
+    documentos = {}
+    for tipo, ids in ids_por_tipo.items():
+        modelo = INVENTARIOS_DUPLICADOS[tipo][0]
+        documentos.update({r.id: r for r in modelo.objects(id__in=ids).select_related()})
+    for grupo in grupos:
+        grupo.detalle = [documentos[i] for i in grupo.registros if i in documentos]
+        grupo.etiqueta_tipo = INVENTARIOS[grupo.tipo][0]
+
+
+@never_cache
+@login_required_custom
+def duplicados_inventario_admin(request):
+    """
+    Cola de revisión de posibles capturas duplicadas.
+    - Filtros GET: estado (pendiente por defecto), periodo (activo por defecto), tipo.
+    - Paginación por cursor sobre (detectado, _id).
+    """
+    if not _es_admin(request):
+        return redirect("login")
+
+    estado = request.GET.get("estado") if request.GET.get("estado") in ESTADOS else "pendiente"
+    filtros = {"estado": estado}
+
+    periodo = None
+    periodo_id = request.GET.get("periodo")
+    if periodo_id:
+        try:
+            periodo = PeriodoInventario.objects(id=periodo_id).first()
+        except Exception:
+            periodo = None
+    else:
+        periodo = obtener_periodo_activo()
+    if periodo:
+        filtros["periodo"] = periodo
+
+    tipo = request.GET.get("tipo")
+    if tipo in INVENTARIOS_DUPLICADOS:
+        filtros["tipo"] = tipo
+
+    try:
+        grupos, siguiente = pagina_keyset(DuplicadoInventario.objects(**filtros), "detectado",
+                                          request.GET.get("despues"), tamano=20)
+        _cargar_registros(grupos)
+    except Exception as e:
+        messages.error(request, f"Error al obtener la cola de duplicados: {e}")
+        grupos, siguiente = [], None
+
+    parametros = request.GET.copy()
+    parametros.pop("despues", None)
+
+    return render(request, "systemsigo/Inventarios/duplicados.html", {
+        "grupos": grupos,
+        "estados": ESTADOS,
+        "tipos": INVENTARIOS,
+        "periodos": PeriodoInventario.objects.order_by("-fecha_inicio"),
+        "filtro_estado": estado,
+        "filtro_tipo": tipo or "",
+        "periodo_seleccionado": periodo,
+        "cursor_siguiente": siguiente,
+        "es_primera_pagina": not request.GET.get("despues"),
+        "parametros_bajas": parametros.urlencode(),
+    })
+
+
+@never_cache
+@login_required_custom
+@require_POST
+def descartar_duplicado_admin(request, id):
+    """Marca el grupo como revisado: los registros son equipos distintos."""
+    user = _es_admin(request)
+    if not user:
+        return redirect("login")
+
+    grupo = DuplicadoInventario.objects(id=id).first()
+    if not grupo:
+        messages.error(request, "Grupo de duplicados no encontrado.")
+        return redirect("duplicados_inventario_admin")
+
+    grupo.update(set__estado="descartado", set__revisado_por=user, set__fecha_revision=datetime.now())
+    messages.success(request, "Grupo marcado como no duplicado.")
+    return redirect("duplicados_inventario_admin")
+
+
+@never_cache
+@login_required_custom
+@require_POST
+def resolver_duplicado_admin(request, id):
+    """Da de baja los registros seleccionados del grupo (con bitácora masiva) y lo marca resuelto."""
+    user = _es_admin(request)
+    if not user:
+        return redirect("login")
+
+    grupo = DuplicadoInventario.objects(id=id).first()
+    if not grupo:
+        messages.error(request, "Grupo de duplicados no encontrado.")
+        return redirect("duplicados_inventario_admin")
+
+    try:
+        ids = [ObjectId(i) for i in request.POST.getlist("ids")]
+    except (InvalidId, TypeError):
+        ids = []
+    # Solo registros vigentes del grupo (puede incluir bajas previas) y al menos uno debe quedar vigente
+    modelo = INVENTARIOS_DUPLICADOS[grupo.tipo][0]
+    vigentes = set(modelo.objects(id__in=grupo.registros, activo__ne=False).scalar("id"))
+    ids = [i for i in ids if i in vigentes]
+    if not ids:
+        messages.error(request, "Seleccione los registros sobrantes.")
+        return redirect("duplicados_inventario_admin")
+    if len(ids) >= len(vigentes):
+        messages.error(request, "Debe conservar al menos un registro del grupo.")
+        return redirect("duplicados_inventario_admin")
+
+    try:
+        total = baja_masiva(grupo.tipo, {"ids": ids}, user)
+    except OperacionMasivaInvalida as e:
+        messages.error(request, str(e))
+        return redirect("duplicados_inventario_admin")
+
+    grupo.update(set__estado="resuelto", set__revisado_por=user, set__fecha_revision=datetime.now())
+    messages.success(request, f"{total} registro(s) duplicado(s) dado(s) de baja.")
+    return redirect("duplicados_inventario_admin")
@@ -10,8 +10,12 @@ from django.views.decorators.cache import never_cache
 from django.contrib import messages
 
 from system.models import FacturaEnergeticaTriple, FacturaPdbt, Subestacion, UnidadResponsable
+from system.jerarquia import arbol_ur
+from system.mongo import para_lectura
+from system.tablas import consultar_tabla, obtener_tabla
 from system.views import get_user
 from system.decorators import login_required_custom
+from system.gestion_energetica.views_admin.utils import filtrar_por_anio, anios_registrados
 
 import openpyxl
 from openpyxl import Workbook
@@ -66,20 +70,11 @@ def listar_facturas_admin(request):
         facturas_pdbt = facturas_pdbt.filter(tipo_tarifa=tipo_tarifa)
 
     # Filtrar por año de registro
-    if anio:
-        facturas_triple = [
-            f for f in facturas_triple if f.fecha_registro.year == int(anio)
-        ]
-        facturas_pdbt = [
-            f for f in facturas_pdbt if f.fecha_registro.year == int(anio)
-        ]
+    facturas_triple = filtrar_por_anio(facturas_triple, anio).select_related(max_depth=2)
+    facturas_pdbt = filtrar_por_anio(facturas_pdbt, anio).select_related(max_depth=2)
 
     # Obtener lista de años disponibles en ambas colecciones
-    anios_disponibles = sorted(
-        set(f.fecha_registro.year for f in FacturaEnergeticaTriple.objects()) |
-        set(f.fecha_registro.year for f in FacturaPdbt.objects()),
-        reverse=True
-    )
+    anios_disponibles = anios_registrados(FacturaEnergeticaTriple, FacturaPdbt)
 
     # Contexto para la plantilla
     context = {
@@ -116,14 +111,10 @@ def api_subestaciones_por_ur(request, ur_id):
     except (InvalidId, TypeError, ValueError) as e:
         return JsonResponse({"error": "ID inválido: " + str(e)}, status=400)
 
-    # --- Obtención de subestaciones asociadas ---
+    # --- Subestaciones desde la jerarquía cacheada de la UR ---
     try:
-        subestaciones = Subestacion.objects(unidad_responsable=ur_obj_id)
-
-        data = [{
-            "id": str(s.id),
-            "nombre": f"Medidor: {s.no_medidor} | Servicio: {s.no_servicio} | Tarifa: {s.tarifa}"
-        } for s in subestaciones]
+        arbol = arbol_ur(ur_obj_id)
+        data = [{"id": s["id"], "nombre": s["nombre"]} for s in arbol["subestaciones"]] if arbol else []
 
         return JsonResponse(data, safe=False)
 
@@ -139,48 +130,24 @@ def listar_facturas_triple_admin(request):
     - Solo los usuarios con rol 'admin' pueden acceder a esta vista.
     - Permite filtrar las facturas por unidad responsable, subestación, tipo de tarifa y año.
     - Muestra una lista de facturas que cumplen con los criterios de filtrado.
+    - Solo se dibuja la primera página; búsqueda, orden y paginación se piden a system/tablas.py.
     """
 
-    user = get_user(request)
-    if not user or user.rol not in ["admin", "admin_energia", "admin_ambiental"]:
+    tabla = consultar_tabla(obtener_tabla("facturas_triple_admin"), get_user(request), request.GET)
+    if tabla is None:
         return redirect('inicio')
 
-    # Parámetros de filtrado desde la URL
     ur_id = request.GET.get('ur')
-    sub_id = request.GET.get('subestacion')
-    tipo_tarifa = request.GET.get('tipo_tarifa')
-    anio = request.GET.get('anio')
-
-    # Catálogos para filtros
-    unidades = UnidadResponsable.objects()
-    subestaciones = Subestacion.objects(unidad_responsable=ur_id) if ur_id else Subestacion.objects()
-
-    # Obtener todas las facturas sin filtrar inicialmente
-    facturas = FacturaEnergeticaTriple.objects()
-
-    # Aplicar filtros
-    if ur_id:
-        subs_ur = Subestacion.objects(unidad_responsable=ur_id)
-        facturas = facturas.filter(subestacion__in=subs_ur)
-
-    if sub_id:
-        facturas = facturas.filter(subestacion=sub_id)
-
-    if tipo_tarifa:
-        facturas = facturas.filter(tipo_tarifa=tipo_tarifa)
-
-    if anio:
-        facturas = [f for f in facturas if f.fecha_registro.year == int(anio)]
-
     context = {
-        'facturas': facturas,
-        'unidades': unidades,
-        'subestaciones': subestaciones,
+        'registros': tabla['registros'],
+        'tabla': tabla,
+        'unidades': UnidadResponsable.objects(),
+        'subestaciones': Subestacion.objects(unidad_responsable=ur_id) if ObjectId.is_valid(ur_id) else Subestacion.objects(),
         'filtros': {
             'ur_id': ur_id,
-            'sub_id': sub_id,
-            'tipo_tarifa': tipo_tarifa,
-            'anio': anio,
+            'sub_id': request.GET.get('subestacion'),
+            'tipo_tarifa': request.GET.get('tipo_tarifa'),
+            'anio': request.GET.get('anio'),
         }
     }
 
@@ -413,48 +380,24 @@ def listar_facturas_pdbt_admin(request):
     - Solo los usuarios con rol 'admin' pueden acceder a esta vista.
     - Permite filtrar las facturas por unidad responsable, subestación, tipo de tarifa y año.
     - Muestra una lista de facturas que cumplen con los criterios de filtrado.
+    - Solo se dibuja la primera página; búsqueda, orden y paginación se piden a system/tablas.py.
     """
 
-    user = get_user(request)
-    if not user or user.rol not in ["admin", "admin_energia", "admin_ambiental"]:
+    tabla = consultar_tabla(obtener_tabla("facturas_pdbt_admin"), get_user(request), request.GET)
+    if tabla is None:
         return redirect('inicio')
 
-    # Parámetros de filtrado desde la URL
     ur_id = request.GET.get('ur')
-    sub_id = request.GET.get('subestacion')
-    tipo_tarifa = request.GET.get('tipo_tarifa')
-    anio = request.GET.get('anio')
-
-    # Catálogos para filtros
-    unidades = UnidadResponsable.objects()
-    subestaciones = Subestacion.objects(unidad_responsable=ur_id) if ur_id else Subestacion.objects()
-
-    # Obtener todas las facturas sin filtrar inicialmente
-    facturas = FacturaPdbt.objects()
-
-    # Aplicar filtros
-    if ur_id:
-        subs_ur = Subestacion.objects(unidad_responsable=ur_id)
-        facturas = facturas.filter(subestacion__in=subs_ur)
-
-    if sub_id:
-        facturas = facturas.filter(subestacion=sub_id)
-
-    if tipo_tarifa:
-        facturas = facturas.filter(tipo_tarifa=tipo_tarifa)
-
-    if anio:
-        facturas = [f for f in facturas if f.fecha_registro.year == int(anio)]
-
     context = {
-        'facturas': facturas,
-        'unidades': unidades,
-        'subestaciones': subestaciones,
+        'registros': tabla['registros'],
+        'tabla': tabla,
+        'unidades': UnidadResponsable.objects(),
+        'subestaciones': Subestacion.objects(unidad_responsable=ur_id) if ObjectId.is_valid(ur_id) else Subestacion.objects(),
         'filtros': {
             'ur_id': ur_id,
-            'sub_id': sub_id,
-            'tipo_tarifa': tipo_tarifa,
-            'anio': anio,
+            'sub_id': request.GET.get('subestacion'),
+            'tipo_tarifa': request.GET.get('tipo_tarifa'),
+            'anio': request.GET.get('anio'),
         }
     }
 
@@ -644,7 +587,7 @@ def exportar_facturas_pdbt_excel_admin(request):
     tipo_tarifa = request.GET.get('tipo_tarifa')
     anio = request.GET.get('anio')
 
-    facturas = FacturaPdbt.objects()
+    facturas = para_lectura(FacturaPdbt.objects())
 
     if ur_id:
         subs = Subestacion.objects(unidad_responsable=ur_id)
@@ -656,8 +599,7 @@ def exportar_facturas_pdbt_excel_admin(request):
     if tipo_tarifa:
         facturas = facturas.filter(tipo_tarifa=tipo_tarifa)
 
-    if anio:
-        facturas = [f for f in facturas if f.fecha_registro.year == int(anio)]
+    facturas = filtrar_por_anio(facturas, anio).select_related(max_depth=2)
 
     # Crear archivo Excel
     wb = openpyxl.Workbook()
@@ -763,7 +705,7 @@ def exportar_facturas_triple_excel_admin(request):
     tipo_tarifa = request.GET.get('tipo_tarifa')
     anio = request.GET.get('anio')
 
-    facturas = FacturaEnergeticaTriple.objects()
+    facturas = para_lectura(FacturaEnergeticaTriple.objects())
 
     if ur_id:
         subs = Subestacion.objects(unidad_responsable=ur_id)
@@ -775,8 +717,7 @@ def exportar_facturas_triple_excel_admin(request):
     if tipo_tarifa:
         facturas = facturas.filter(tipo_tarifa=tipo_tarifa)
 
-    if anio:
-        facturas = [f for f in facturas if f.fecha_registro.year == int(anio)]
+    facturas = filtrar_por_anio(facturas, anio).select_related(max_depth=2)
 
     # Crear archivo Excel
     wb = Workbook()
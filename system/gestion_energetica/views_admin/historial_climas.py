@@ -2,11 +2,12 @@ from datetime import datetime
 
 from django.shortcuts import get_object_or_404
 from django.contrib import messages
-from django.shortcuts import render, redirect
+from django.shortcuts import redirect
 from django.views.decorators.cache import never_cache
 
-from system.models import InventarioClimatizacion
+from system.models import InventarioClimatizacion, PeriodoArchivado
 from system.views import get_user
+from system.gestion_energetica.views_admin.registros_baja import registros_baja_admin
 from system.decorators import login_required_custom
 
 from mongoengine.errors import DoesNotExist
@@ -14,16 +15,8 @@ from mongoengine.errors import DoesNotExist
 @never_cache
 @login_required_custom
 def historial_climatizacion_admin(request):
-    user = get_user(request)
-    if not user or user.rol not in ["admin", "admin_energia", "admin_ambiental"]:
-        messages.error(request, "Acceso denegado.")
-        return redirect("login")
-
-    registros_baja = InventarioClimatizacion.objects(activo=False).order_by('-fecha_baja')
-
-    return render(request, 'systemsigo/Inventarios/Climatizacion/registros_eliminados.html', {
-        'registros': registros_baja
-    })  
+    # Paginada y filtrable en la vista compartida de bajas
+    return registros_baja_admin(request, "climatizacion")
 
 @never_cache
 @login_required_custom
@@ -42,7 +35,11 @@ def dar_baja_inventario_climatizacion(request, his_id):
     his.activo = False
     his.fecha_baja = datetime.now()
     his.dado_baja_por = user
-    his.save()
+    try:
+        his.save()
+    except PeriodoArchivado as e:
+        messages.error(request, str(e))
+        return redirect('listado_inventario_climatizacion')
 
     messages.success(request, "Registro dado de baja correctamente.")
     return redirect('listado_inventario_climatizacion')
@@ -53,11 +50,7 @@ def registro_climatizacion_bajas_admin(request):
     """
     Vista para listar los inventarios dados de baja (activo=False)
     """
-    registros_baja = InventarioClimatizacion.objects(activo=False).order_by('-fecha_baja')
-    
-    return render(request, 'systemsigo/Inventarios/Climatizacion/registros_eliminados.html', {
-        'registros': registros_baja
-    })
+    return registros_baja_admin(request, "climatizacion")
 
 
 @never_cache
@@ -80,7 +73,11 @@ def restaurar_registro_climatizacion(request, registro_id):
     registro.activo = True
     registro.fecha_reactivacion = datetime.now()
     registro.reactivado_por = user
-    registro.save()
+    try:
+        registro.save()
+    except PeriodoArchivado as e:
+        messages.error(request, str(e))
+        return redirect('historial_climatizacion_admin')
 
     messages.success(request, "Registro restaurado correctamente.")
     return redirect('historial_climatizacion_admin')
\ No newline at end of file
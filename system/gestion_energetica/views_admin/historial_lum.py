@@ -1,17 +1,15 @@
 from django.http import JsonResponse
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import redirect, get_object_or_404
 from django.contrib import messages
 from django.utils.timezone import now
 
-from system.models import InventarioLuminarias, Usuario
+from system.models import InventarioLuminarias, PeriodoArchivado, Usuario
 from system.views import get_user
+from system.gestion_energetica.views_admin.registros_baja import registros_baja_admin
 
 # Historial de luminarias dadas de baja
 def historial_luminarias_admin(request):
-    luminarias_inactivas = InventarioLuminarias.objects(activo=False)
-    return render(request, "systemsigo/Inventarios/Luminarias/registros_eliminados.html", {
-        "luminarias_inactivas": luminarias_inactivas
-    })
+    return registros_baja_admin(request, "luminarias")
 
 
 # Dar de baja una luminaria
@@ -29,6 +27,8 @@ def dar_baja_luminaria(request, id):
         messages.success(request, "Registro dado de baja correctamente.")
     except InventarioLuminarias.DoesNotExist:
         messages.error(request, "La luminaria no existe.")
+    except PeriodoArchivado as e:
+        messages.error(request, str(e))
     return redirect("listado_inventario_luminarias")
 
 
@@ -56,5 +56,7 @@ def restaurar_registro_luminaria(request, id):
             return JsonResponse({"success": True})
         except InventarioLuminarias.DoesNotExist:
             return JsonResponse({"success": False, "error": "La luminaria no existe."})
+        except PeriodoArchivado as e:
+            return JsonResponse({"success": False, "error": str(e)})
     return JsonResponse({"success": False, "error": "Método no permitido"})
    
\ No newline at end of file
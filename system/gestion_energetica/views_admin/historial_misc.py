@@ -2,12 +2,13 @@ from datetime import datetime
 
 from django.http import JsonResponse
 from django.contrib import messages
-from django.shortcuts import render, redirect
+from django.shortcuts import redirect
 from django.views.decorators.cache import never_cache
 from django.utils.timezone import now
 
-from system.models import InventarioMiscelaneos, Usuario
+from system.models import InventarioMiscelaneos, PeriodoArchivado, Usuario
 from system.views import get_user
+from system.gestion_energetica.views_admin.registros_baja import registros_baja_admin
 from system.decorators import login_required_custom
 
 from mongoengine.errors import DoesNotExist
@@ -15,10 +16,7 @@ from mongoengine.errors import DoesNotExist
 @never_cache
 @login_required_custom
 def historial_miscelaneos_admin(request):
-    registros_inactivos = InventarioMiscelaneos.objects.filter(activo=False)
-    return render(request, 'systemsigo/Inventarios/Miscelaneos/registros_eliminados.html', {
-        "miscelaneos_inactivos": registros_inactivos
-    })
+    return registros_baja_admin(request, "miscelaneos")
 
 @never_cache
 @login_required_custom
@@ -36,6 +34,8 @@ def dar_baja_miscelaneo_admin(request, id):
             return JsonResponse({"success": True})
         except InventarioMiscelaneos.DoesNotExist:
             return JsonResponse({"success": False, "error": "El registro no existe."})
+        except PeriodoArchivado as e:
+            return JsonResponse({"success": False, "error": str(e)})
     return JsonResponse({"success": False, "error": "Método no permitido."})
 
 @never_cache
@@ -54,4 +54,6 @@ def restaurar_miscelaneo_admin(request, id):
             return JsonResponse({"success": True})
         except InventarioMiscelaneos.DoesNotExist:
             return JsonResponse({"success": False, "error": "El registro no existe."})
+        except PeriodoArchivado as e:
+            return JsonResponse({"success": False, "error": str(e)})
     return JsonResponse({"success": False, "error": "Método no permitido."})
\ No newline at end of file
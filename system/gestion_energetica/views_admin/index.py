@@ -3,6 +3,7 @@ from django.shortcuts import render
 
 from system.decorators import login_required_custom
 from system.models import Area, Edificio, FacturaEnergeticaTriple, FacturaPdbt, InventarioClimatizacion, InventarioLuminarias, InventarioMiscelaneos, PeriodoInventario, Subestacion, UnidadResponsable
+from system.mongo import para_lectura
 
 # Vistas para el inicio del administrador del sistema
 @never_cache
@@ -16,15 +17,15 @@ def Inicio(request):
     - Muestra conteos de unidades responsables, edificios, subestaciones, facturas, áreas y equipos de inventario.
     """
     context = {
-        "total_unidades": UnidadResponsable.objects.count(),
-        "total_edificios": Edificio.objects.count(),
-        "total_subestaciones": Subestacion.objects.count(),
-        "total_facturas": FacturaEnergeticaTriple.objects.count() + FacturaPdbt.objects.count(),
-        "total_areas": Area.objects.count(),
-        "total_climatizacion": InventarioClimatizacion.objects.count(),
-        "total_luminarias": InventarioLuminarias.objects.count(),
-        "total_miscelaneos": InventarioMiscelaneos.objects.count(),
-        "periodos": PeriodoInventario.objects.order_by('-fecha_inicio')[:5],  # últimos 5 periodos
+        "total_unidades": para_lectura(UnidadResponsable.objects).count(),
+        "total_edificios": para_lectura(Edificio.objects).count(),
+        "total_subestaciones": para_lectura(Subestacion.objects).count(),
+        "total_facturas": para_lectura(FacturaEnergeticaTriple.objects).count() + para_lectura(FacturaPdbt.objects).count(),
+        "total_areas": para_lectura(Area.objects).count(),
+        "total_climatizacion": para_lectura(InventarioClimatizacion.objects).count(),
+        "total_luminarias": para_lectura(InventarioLuminarias.objects).count(),
+        "total_miscelaneos": para_lectura(InventarioMiscelaneos.objects).count(),
+        "periodos": para_lectura(PeriodoInventario.objects.order_by('-fecha_inicio'))[:5],  # últimos 5 periodos
         # Puedes agregar más como consumos promedio o más detallado
     }
     return render(request, 'systemsigo/index.html', context)
\ No newline at end of file
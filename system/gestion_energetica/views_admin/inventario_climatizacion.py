@@ -1,5 +1,5 @@
 from datetime import datetime
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import Decimal
 
 from django.http import JsonResponse
 from django.views.decorators.cache import never_cache
@@ -11,6 +11,7 @@ from mongoengine.errors import DoesNotExist
 
 from system.models import NIVELES,InventarioClimatizacion, Edificio, Area, PeriodoInventario, UnidadResponsable
 from system.views import get_user
+from system.tablas import consultar_tabla, obtener_tabla
 from system.decorators import login_required_custom
 from system.gestion_energetica.views_admin.utils import is_admin, get_periodo_activo, parse_decimal
 
@@ -24,12 +25,17 @@ def listado_inventario_climatizacion(request):
     - never_cache: evita el almacenamiento en caché de esta vista.
     - Si el usuario no es admin, redirige al login con un mensaje de error.
     - Excluye a los false activos (dado de baja).
+    - Solo se dibuja la primera página; búsqueda, orden y paginación se piden a system/tablas.py.
     """
 
-    climatizacion = InventarioClimatizacion.objects(activo__ne=False).order_by('fecha_registro')
+    tabla = consultar_tabla(obtener_tabla("inventario_climatizacion_admin"), get_user(request), request.GET)
+    if tabla is None:
+        messages.error(request, "Acceso denegado.")
+        return redirect("login")
 
     return render(request, "systemsigo/Inventarios/Climatizacion/lista_climatizacion.html", {
-        "climatizacion": climatizacion
+        "registros": tabla["registros"],
+        "tabla": tabla,
     })
 
 @never_cache
@@ -67,13 +73,8 @@ def registrar_inventario_climatizacion_admin(request):
             voltaje = int(request.POST.get('voltaje') or 0)
             amperaje = Decimal(request.POST.get('amperaje') or 0)
             potencia = Decimal(request.POST.get('potencia') or 0)
-            potencia_total = Decimal(request.POST.get('potencia_total') or 0)
             horas_mes = Decimal(request.POST.get('horas_mes') or 0)
 
-            consumo_mensual = (potencia_total * horas_mes).quantize(
-                Decimal('0.01'), rounding=ROUND_HALF_UP
-            )
-
             InventarioClimatizacion(
                 unidad_responsable=ur,
                 edificio=edificio,
@@ -86,9 +87,7 @@ def registrar_inventario_climatizacion_admin(request):
                 voltaje=voltaje,
                 amperaje=amperaje,
                 potencia=potencia,
-                potencia_total=potencia_total,
                 horas_mes=horas_mes,
-                consumo_mensual=consumo_mensual,
                 creado_por=user,
                 periodo=periodo
             ).save()
@@ -149,9 +148,7 @@ def editar_inventario_climatizacion_admin(request, climatizacion_id):
             climatizacion.voltaje = Decimal(request.POST.get('voltaje') or 0)
             climatizacion.amperaje = Decimal(request.POST.get('amperaje') or 0)
             climatizacion.potencia = Decimal(request.POST.get('potencia') or 0)
-            climatizacion.potencia_total = Decimal(request.POST.get('potencia_total') or 0)
             climatizacion.horas_mes = Decimal(request.POST.get('horas_mes') or 0)
-            climatizacion.consumo_mensual = (climatizacion.potencia_total * climatizacion.horas_mes).quantize(Decimal('0.01'))
             climatizacion.actualizado_por = user
             climatizacion.ultima_actualizacion = datetime.now()
             climatizacion.periodo = periodo
@@ -5,10 +5,11 @@ from django.http import JsonResponse
 
 from system.models import NIVELES, InventarioLuminarias, PeriodoInventario, UnidadResponsable, Edificio, Area
 from system.views import get_user
+from system.tablas import consultar_tabla, obtener_tabla
 from system.decorators import login_required_custom
 from system.gestion_energetica.views_admin.utils import is_admin
 
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import Decimal
 
 from mongoengine.errors import DoesNotExist
 
@@ -23,11 +24,18 @@ def listado_inventario_luminarias_admin(request):
     - Restringida a usuarios autenticados con el decorador login_required_custom.
     - never_cache: evita el almacenamiento en caché de esta vista.
     - Si el usuario no es admin, redirige al login con un mensaje de error.
+    - Excluye los registros dados de baja (están en el historial de bajas).
+    - Solo se dibuja la primera página; búsqueda, orden y paginación se piden a system/tablas.py.
     """
 
-    luminarias = InventarioLuminarias.objects.all()
+    tabla = consultar_tabla(obtener_tabla("inventario_luminarias_admin"), get_user(request), request.GET)
+    if tabla is None:
+        messages.error(request, "Acceso denegado.")
+        return redirect("login")
+
     return render(request, "systemsigo/Inventarios/Luminarias/lista_luminarias.html", {
-        "luminarias": luminarias
+        "registros": tabla["registros"],
+        "tabla": tabla,
     })
 
 
@@ -63,12 +71,7 @@ def registrar_inventario_luminarias_admin(request):
             num_luminarias = int(request.POST.get('num_luminarias') or 0)
             lamp_luminarias = int(request.POST.get('lamp_luminarias') or 0)
             potencia_lamp = Decimal(request.POST.get('potencia_lamp') or 0)
-            potencia_total_lum = Decimal(request.POST.get('potencia_total_lum') or 0)
             consumo_mensual_horas = int(request.POST.get('consumo_mensual_horas') or 0)
-            consumo_mensual = Decimal(request.POST.get('consumo_mensual') or 0)
-
-            potencia_total = (num_luminarias * lamp_luminarias * potencia_lamp / 1000).quantize(Decimal('0.001'), rounding=ROUND_HALF_UP)
-            consumo_mensual = (potencia_total * consumo_mensual_horas).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
 
             InventarioLuminarias(
                 unidad_responsable=ur,
@@ -79,9 +82,7 @@ def registrar_inventario_luminarias_admin(request):
                 num_luminarias=num_luminarias,
                 lamp_luminarias=lamp_luminarias,
                 potencia_lamp=potencia_lamp,
-                potencia_total_lum=potencia_total,
                 consumo_mensual_horas=consumo_mensual_horas,
-                consumo_mensual=consumo_mensual,
                 creado_por=user,
                 periodo=periodo
             ).save()
@@ -138,9 +139,7 @@ def editar_inventario_luminarias_admin(request, luminarias_id):
             luminarias.num_luminarias = int(request.POST.get('num_luminarias') or 0)
             luminarias.lamp_luminarias = int(request.POST.get('lamp_luminarias') or 0)
             luminarias.potencia_lamp = Decimal(request.POST.get('potencia_lamp') or 0)
-            luminarias.potencia_total_lum = Decimal(request.POST.get('potencia_total_lum') or 0)
             luminarias.consumo_mensual_horas = int(request.POST.get('consumo_mensual_horas') or 0)
-            luminarias.consumo_mensual = (luminarias.potencia_total_lum * luminarias.consumo_mensual_horas).quantize(Decimal('0.01'))
             luminarias.actualizado_por = user
             luminarias.ultima_actualizacion = datetime.now()
             luminarias.periodo = periodo
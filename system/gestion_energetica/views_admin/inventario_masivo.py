@@ -0,0 +1,73 @@
+from django.contrib import messages
+from django.shortcuts import redirect
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_POST
+
+from system.views import get_user
+from system.decorators import login_required_custom
+from system.inventario_masivo import (
+    INVENTARIOS, OperacionMasivaInvalida, baja_masiva, criterio_desde_post, restauracion_masiva,
+)
+
+
+@never_cache
+@login_required_custom
+@require_POST
+def baja_masiva_inventario(request, tipo):
+    """
+    Da de baja en bloque los registros de inventario seleccionados o que cumplen los filtros.
+    - tipo: climatizacion, luminarias o miscelaneos.
+    - Un solo update_many y una entrada de bitácora por lote.
+    """
+    user = get_user(request)
+    if not user or user.rol not in ["admin", "admin_energia", "admin_ambiental"]:
+        messages.error(request, "Acceso denegado.")
+        return redirect("login")
+
+    if tipo not in INVENTARIOS:
+        messages.error(request, "Tipo de inventario no válido.")
+        return redirect("historiales_registros_inventarios_admin")
+    vista_listado = INVENTARIOS[tipo][2]
+
+    try:
+        total = baja_masiva(tipo, criterio_desde_post(request.POST), user)
+    except OperacionMasivaInvalida as e:
+        messages.error(request, str(e))
+        return redirect(vista_listado)
+
+    if total:
+        messages.success(request, f"{total} registro(s) dado(s) de baja correctamente.")
+    else:
+        messages.info(request, "No hay registros activos que cumplan el criterio.")
+    return redirect(vista_listado)
+
+
+@never_cache
+@login_required_custom
+@require_POST
+def restaurar_masivo_inventario(request, tipo):
+    """
+    Reactiva en bloque los registros dados de baja seleccionados o que cumplen los filtros.
+    - tipo: climatizacion, luminarias o miscelaneos.
+    """
+    user = get_user(request)
+    if not user or user.rol not in ["admin", "admin_energia", "admin_ambiental"]:
+        messages.error(request, "Acceso denegado.")
+        return redirect("login")
+
+    if tipo not in INVENTARIOS:
+        messages.error(request, "Tipo de inventario no válido.")
+        return redirect("historiales_registros_inventarios_admin")
+    vista_bajas = INVENTARIOS[tipo][3]
+
+    try:
+        total = restauracion_masiva(tipo, criterio_desde_post(request.POST), user)
+    except OperacionMasivaInvalida as e:
+        messages.error(request, str(e))
+        return redirect(vista_bajas)
+
+    if total:
+        messages.success(request, f"{total} registro(s) restaurado(s) correctamente.")
+    else:
+        messages.info(request, "No hay registros dados de baja que cumplan el criterio.")
+    return redirect(vista_bajas)
@@ -6,10 +6,11 @@ from django.shortcuts import render, redirect
 
 from system.models import InventarioMiscelaneos, PeriodoInventario, UnidadResponsable, Edificio, Area, NIVELES
 from system.views import get_user
+from system.tablas import consultar_tabla, obtener_tabla
 from system.decorators import login_required_custom
 from system.gestion_energetica.views_admin.utils import is_admin
 
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import Decimal
 
 from mongoengine.errors import DoesNotExist
 
@@ -23,11 +24,17 @@ def listado_inventario_miscelaneos(request):
     - Restringida a usuarios autenticados con el decorador login_required_custom.
     - never_cache: evita el almacenamiento en caché de esta vista.
     - Si el usuario no es admin, redirige al login con un mensaje de error.
+    - Solo se dibuja la primera página; búsqueda, orden y paginación se piden a system/tablas.py.
     """
 
-    miscelaneos = InventarioMiscelaneos.objects(activo__ne=False).order_by('fecha_registro')
+    tabla = consultar_tabla(obtener_tabla("inventario_miscelaneos_admin"), get_user(request), request.GET)
+    if tabla is None:
+        messages.error(request, "Acceso denegado.")
+        return redirect("login")
+
     return render(request, "systemsigo/Inventarios/Miscelaneos/lista_miscelaneos.html", {
-        "miscelaneos": miscelaneos
+        "registros": tabla["registros"],
+        "tabla": tabla,
     })
 
 @never_cache
@@ -64,13 +71,8 @@ def registrar_inventario_miscelaneos_admin(request):
             voltaje = Decimal(request.POST.get('voltaje') or 0)
             amperaje = Decimal(request.POST.get('amperaje') or 0)
             potencia = Decimal(request.POST.get('potencia') or 0)
-            potencia_total = Decimal(request.POST.get('potencia_total') or 0)
             horas_mes = Decimal(request.POST.get('horas_mes') or 0)
 
-            consumo_mensual = (potencia_total * horas_mes).quantize(
-                Decimal('0.01'), rounding=ROUND_HALF_UP
-            )
-
             InventarioMiscelaneos(
                 unidad_responsable=ur,
                 edificio=edificio,
@@ -82,9 +84,7 @@ def registrar_inventario_miscelaneos_admin(request):
                 voltaje=voltaje,
                 amperaje=amperaje,
                 potencia=potencia,
-                potencia_total=potencia_total,
                 horas_mes=horas_mes,
-                consumo_mensual=consumo_mensual,
                 creado_por=user,
                 periodo=periodo
             ).save()
@@ -143,9 +143,7 @@ def editar_inventario_miscelaneos_admin(request, miscelaneos_id):
             miscelaneos.voltaje = Decimal(request.POST.get('voltaje') or 0)
             miscelaneos.amperaje = Decimal(request.POST.get('amperaje') or 0)
             miscelaneos.potencia = Decimal(request.POST.get('potencia') or 0)
-            miscelaneos.potencia_total = Decimal(request.POST.get('potencia_total') or 0)
             miscelaneos.horas_mes = Decimal(request.POST.get('horas_mes') or 0)
-            miscelaneos.consumo_mensual = (miscelaneos.potencia_total * miscelaneos.horas_mes).quantize(Decimal('0.01'))
             miscelaneos.actualizado_por = user
             miscelaneos.ultima_actualizacion = datetime.now()
             miscelaneos.periodo = periodo
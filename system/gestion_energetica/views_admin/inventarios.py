@@ -8,6 +8,7 @@ from django.views.decorators.cache import never_cache
 from mongoengine.errors import DoesNotExist
 
 from system.models import InventarioClimatizacion, InventarioLuminarias, InventarioMiscelaneos, PeriodoInventario, UnidadResponsable
+from system.archivo import inventario_de_periodo
 from system.views import get_user
 from system.decorators import login_required_custom
 
@@ -64,10 +65,7 @@ def admin_inventarios_filtro(request):
 
             modelo = modelo_map.get(tipo)
             if modelo:
-                registros = modelo.objects(
-                    unidad_responsable=unidad_obj,
-                    periodo=periodo_obj
-                )
+                registros = inventario_de_periodo(modelo, periodo_obj, unidad_responsable=unidad_obj).select_related()
 
                 # Calcular totales según tipo
                 if tipo == "Climatización":
@@ -150,7 +148,7 @@ def exportar_excel_inventario(request):
             "Voltaje", "Amperaje", "Potencia (W)", "Potencia total (Kw)", "Horas al mes", "Consumo mensual",
             "Fecha de registro", "Creado por", "Actualizado por", "Última modificación"
         ]
-        registros = InventarioClimatizacion.objects.filter(unidad_responsable=unidad, periodo=periodo)
+        registros = inventario_de_periodo(InventarioClimatizacion, periodo, lectura=True, unidad_responsable=unidad).select_related()
         data = []
         for i in registros:
             total_potencia += i.potencia_total or 0
@@ -171,7 +169,7 @@ def exportar_excel_inventario(request):
             "Potencia por lámpara", "Potencia Total", "Horas al mes", "Consumo mensual", "Fecha de registro",
             "Creado por", "Actualizado por", "Última modificación"
         ]
-        registros = InventarioLuminarias.objects.filter(unidad_responsable=unidad, periodo=periodo)
+        registros = inventario_de_periodo(InventarioLuminarias, periodo, lectura=True, unidad_responsable=unidad).select_related()
         data = []
         for i in registros:
             total_potencia += i.potencia_total_lum or 0
@@ -191,7 +189,7 @@ def exportar_excel_inventario(request):
             "Edificio", "Nivel", "Área", "Misceláneo", "Marca", "Modelo", "Voltaje", "Amperaje",
             "Potencia", "Horas al mes", "Consumo mensual", "Fecha de registro", "Creado por", "Actualizado por", "Última modificación"
         ]
-        registros = InventarioMiscelaneos.objects.filter(unidad_responsable=unidad, periodo=periodo)
+        registros = inventario_de_periodo(InventarioMiscelaneos, periodo, lectura=True, unidad_responsable=unidad).select_related()
         data = []
         for i in registros:
             total_potencia += i.potencia or 0
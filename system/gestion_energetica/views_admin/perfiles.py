@@ -0,0 +1,66 @@
+from django.contrib import messages
+from django.shortcuts import render, redirect
+from django.views.decorators.cache import never_cache
+
+from system.models import PerfilSolicitud
+from system.profiling import ROLES_PERFILADOR, construir_flamegraph
+from system.views import get_user
+from system.decorators import login_required_custom
+
+# Vistas para consultar los perfiles de solicitudes capturados bajo demanda
+@never_cache
+@login_required_custom
+def listar_perfiles_solicitud(request):
+    """
+    Vista para listar los perfiles de solicitudes capturados.
+    - Restringida a usuarios administradores.
+    - Muestra los últimos 100 perfiles sin cargar pilas ni comandos.
+    """
+
+    user = get_user(request)
+    if not user or user.rol not in ROLES_PERFILADOR:
+        messages.error(request, "Acceso denegado.")
+        return redirect("login")
+
+    perfiles = PerfilSolicitud.objects.exclude('pilas', 'funciones', 'comandos')[:100]
+
+    return render(request, "systemsigo/Perfiles/listar.html", {
+        "perfiles": perfiles
+    })
+
+@never_cache
+@login_required_custom
+def ver_perfil_solicitud(request, perfil_id):
+    """
+    Vista para mostrar el detalle de un perfil de solicitud.
+    - Restringida a usuarios administradores.
+    - Muestra el flame graph (modo muestreo) o las funciones más costosas (modo cProfile).
+    - Muestra la línea de tiempo de comandos de MongoDB de la misma solicitud.
+    """
+
+    user = get_user(request)
+    if not user or user.rol not in ROLES_PERFILADOR:
+        messages.error(request, "Acceso denegado.")
+        return redirect("login")
+
+    perfil = PerfilSolicitud.objects(id=perfil_id).first()
+    if not perfil:
+        messages.error(request, "Perfil no encontrado.")
+        return redirect("listar_perfiles_solicitud")
+
+    duracion = perfil.duracion_ms or 1
+    comandos = [
+        dict(c, inicio_pct=round(c["inicio_ms"] * 100 / duracion, 3),
+             ancho_pct=max(round(c["duracion_ms"] * 100 / duracion, 3), 0.2))
+        for c in perfil.comandos
+    ]
+
+    flamegraph = construir_flamegraph(perfil.pilas)
+    altura = (max([f["profundidad"] for f in flamegraph], default=0) + 1) * 18
+
+    return render(request, "systemsigo/Perfiles/detalle.html", {
+        "perfil": perfil,
+        "flamegraph": flamegraph,
+        "altura_flamegraph": altura,
+        "comandos": comandos,
+    })
@@ -99,17 +99,6 @@ def crear_periodo_inventario(request):
 
     return render(request, "systemsigo/Periodos/crear_periodo.html")
 
-def obtener_periodo_activo():
-    """Obtiene el periodo de inventario activo actual."""
-    # Asumiendo que el periodo activo es aquel cuya fecha de inicio es menor o igual a ahora
-    # y la fecha de fin es mayor o igual a ahora, y que está marcado como activo.
-    ahora = datetime.now()
-    return PeriodoInventario.objects(
-        fecha_inicio__lte=ahora,
-        fecha_fin__gte=ahora,
-        activo=True
-    ).order_by('-fecha_inicio').first()
-
 @never_cache
 @login_required_custom
 def listar_periodos(request):
@@ -117,40 +106,17 @@ def listar_periodos(request):
     Vista para listar todos los periodos de inventario energético.
     - Restringida a usuarios con rol 'admin'.
     - Muestra los periodos ordenados por fecha de inicio descendente.
-    - Actualiza automáticamente el estado de los periodos según la fecha actual.
+    - El estado se calcula según la fecha actual al mostrarlo (no escribe en la base).
     """
     user = get_user(request)
     if not user or user.rol not in ["admin", "admin_energia", "admin_ambiental"]:
         messages.error(request, "Acceso denegado.")
         return redirect("inicio")
 
-    from datetime import datetime
-    ahora = datetime.now()
-
-    # Recuperar todos los periodos
+    # Solo lectura: el estado se muestra con status_actual y las transiciones
+    # las aplica sincronizar_estados_periodos() desde el programador de tareas
     periodos = PeriodoInventario.objects().order_by("-fecha_inicio")
 
-    # === Actualizar estados automáticamente ===
-    for periodo in periodos:
-        try:
-            # Determinar el nuevo estado según las fechas
-            if periodo.fecha_inicio <= ahora <= periodo.fecha_fin:
-                nuevo_status = "Activo"
-            elif ahora < periodo.fecha_inicio:
-                nuevo_status = "Pendiente"
-            else:
-                nuevo_status = "Finalizado"
-
-            # Solo actualizar si el estado cambió y es válido
-            if periodo.status != nuevo_status and nuevo_status in ["Activo", "Pendiente", "Finalizado"]:
-                periodo.status = nuevo_status
-                periodo.activo = (nuevo_status == "Activo")
-                periodo.save()
-
-        except Exception as e:
-            # Captura silenciosa de errores para evitar interrupciones
-            print(f"[⚠] No se pudo actualizar el periodo '{periodo.nombre}': {e}")
-
     # Renderizar plantilla
     return render(request, "systemsigo/Periodos/listar.html", {
         "periodos": periodos
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+from bson.errors import InvalidId
+from django.contrib import messages
+from django.shortcuts import render, redirect
+from django.views.decorators.cache import never_cache
+from mongoengine.errors import ValidationError
+
+from system.archivo import inventario_de_periodo
+from system.decorators import login_required_custom
+from system.inventario_masivo import INVENTARIOS, catalogos_filtro
+from system.models import PeriodoInventario
+from system.mongo import para_lectura
+from system.paginacion import pagina_keyset
+from system.views import get_user
+
+# slug: (plantilla, nombre de la lista en el contexto)
+PLANTILLAS_BAJAS = {
+    "climatizacion": ("systemsigo/Inventarios/Climatizacion/registros_eliminados.html", "registros"),
+    "luminarias": ("systemsigo/Inventarios/Luminarias/registros_eliminados.html", "luminarias_inactivas"),
+    "miscelaneos": ("systemsigo/Inventarios/Miscelaneos/registros_eliminados.html", "miscelaneos_inactivos"),
+}
+
+
+def _fecha(valor):
+    try:
+        return datetime.strptime(valor, "%Y-%m-%d") if valor else None
+    except ValueError:
+        return None
+
+
+@never_cache
+@login_required_custom
+def registros_baja_admin(request, tipo):
+    """
+    Vista compartida de registros dados de baja (activo=False) para los tres tipos de inventario.
+    - tipo: climatizacion, luminarias o miscelaneos.
+    - Filtros GET: ur, periodo, desde, hasta (fecha de baja, AAAA-MM-DD).
+    - Paginación por cursor sobre el índice parcial (activo, fecha_baja, _id): cada página
+      cuesta lo mismo sin importar cuántas bajas se hayan acumulado.
+    - Con periodo se consulta también su colección de archivo si ya fue archivado; sin periodo
+      solo se ven las bajas de la colección viva y la página lista los periodos archivados.
+    """
+    user = get_user(request)
+    if not user or user.rol not in ["admin", "admin_energia", "admin_ambiental"]:
+        messages.error(request, "Acceso denegado.")
+        return redirect("login")
+
+    if tipo not in INVENTARIOS:
+        messages.error(request, "Tipo de inventario no válido.")
+        return redirect("historiales_registros_inventarios_admin")
+    modelo = INVENTARIOS[tipo][1]
+    plantilla, nombre_lista = PLANTILLAS_BAJAS[tipo]
+
+    filtros = {}
+    ur_id = request.GET.get("ur")
+    if ur_id:
+        filtros["unidad_responsable"] = ur_id
+    desde = _fecha(request.GET.get("desde"))
+    if desde:
+        filtros["fecha_baja__gte"] = desde
+    hasta = _fecha(request.GET.get("hasta"))
+    if hasta:
+        filtros["fecha_baja__lt"] = hasta + timedelta(days=1)
+
+    periodo = None
+    periodo_id = request.GET.get("periodo")
+    if periodo_id:
+        try:
+            periodo = PeriodoInventario.objects(id=periodo_id).first()
+        except (ValidationError, InvalidId):
+            periodo = None
+
+    try:
+        if periodo:
+            registros = inventario_de_periodo(modelo, periodo, lectura=True, activo=False, **filtros)
+        else:
+            registros = para_lectura(modelo.objects(activo=False, **filtros))
+        registros, siguiente = pagina_keyset(registros, "fecha_baja", request.GET.get("despues"))
+    except (ValueError, ValidationError, InvalidId) as e:
+        messages.error(request, f"Error al obtener registros: {e}")
+        registros, siguiente = [], None
+
+    # Parámetros de filtro para conservarlos al avanzar de página
+    parametros = request.GET.copy()
+    parametros.pop("despues", None)
+
+    return render(request, plantilla, {
+        nombre_lista: registros,
+        "tipo_bajas": tipo,
+        "tipos_bajas": INVENTARIOS,
+        "cursor_siguiente": siguiente,
+        "es_primera_pagina": not request.GET.get("despues"),
+        "parametros_bajas": parametros.urlencode(),
+        "filtro_ur": ur_id or "",
+        "filtro_periodo": periodo_id or "",
+        "filtro_desde": request.GET.get("desde", ""),
+        "filtro_hasta": request.GET.get("hasta", ""),
+        # Sin periodo las bajas de periodos archivados no aparecen: se avisa cuáles elegir
+        "periodos_archivados": [] if periodo else PeriodoInventario.objects(archivado=True).only(
+            "nombre").order_by("-fecha_inicio"),
+        **catalogos_filtro()
+    })
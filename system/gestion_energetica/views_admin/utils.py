@@ -6,12 +6,36 @@ from django.http import JsonResponse
 from django.shortcuts import redirect
 from django.contrib import messages
 
+from system.periodos import obtener_periodo_activo
+
 def is_admin(user):
     # Ajusta si tu rol exacto es 'admin', 'administrador' o similar
     return bool(user and getattr(user, "rol", "").lower() in ["admin", "administrador"])
 
-def get_periodo_activo(PeriodoInventario):
-    return PeriodoInventario.objects(status="Activo").first()
+def get_periodo_activo(PeriodoInventario=None):
+    # Se conserva la firma anterior; el periodo se resuelve en system.periodos
+    return obtener_periodo_activo()
 
 def parse_decimal(value, q='0.01'):
     return Decimal(value).quantize(Decimal(q), rounding=ROUND_HALF_UP)
+
+def filtrar_por_anio(queryset, anio, campo='fecha_registro'):
+    """Filtra por año con un rango de fechas en la consulta (usa índice, no recorre en Python)."""
+    if not anio:
+        return queryset
+    anio = int(anio)
+    return queryset.filter(**{
+        f'{campo}__gte': datetime(anio, 1, 1),
+        f'{campo}__lt': datetime(anio + 1, 1, 1),
+    })
+
+def anios_registrados(*modelos, campo='fecha_registro'):
+    """Años distintos presentes en las colecciones indicadas, agrupados en MongoDB."""
+    anios = set()
+    for modelo in modelos:
+        for r in modelo.objects.aggregate([
+            {'$match': {campo: {'$ne': None}}},
+            {'$group': {'_id': {'$year': f'${campo}'}}},
+        ]):
+            anios.add(r['_id'])
+    return sorted(anios, reverse=True)
@@ -2,7 +2,7 @@ from django.shortcuts import render
 from django.views.decorators.cache import never_cache
 
 from system.decorators import login_required_custom
-from system.gestion_energetica.views_admin.periodos_inventarios import obtener_periodo_activo
+from system.periodos import obtener_periodo_activo
 from system.views import get_user
 
 @never_cache
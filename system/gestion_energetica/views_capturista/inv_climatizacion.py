@@ -1,15 +1,18 @@
 from datetime import datetime
 
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import Decimal
 
 from django.contrib import messages
 from django.http import JsonResponse
 from django.views.decorators.cache import never_cache
 from django.shortcuts import render, redirect
 
-from system.models import NIVELES, Area, Edificio, InventarioClimatizacion, PeriodoInventario
+from system.models import NIVELES, Area, Edificio, InventarioClimatizacion, PeriodoArchivado
 from system.decorators import login_required_custom
 from system.views import get_user
+from system.periodos import obtener_periodo_activo
+from system.jerarquia import arbol_ur, areas_de_edificio
+from system.duplicados import avisar_posible_duplicado
 
 
 # Vistas de funciones de inventario energetico de aires acondicionados
@@ -35,7 +38,7 @@ def registrar_inventario_climatizacion(request):
     areas = Area.objects(unidad_responsable=user.unidad_responsable)
 
     # Obtener periodo activo
-    periodo_activo = PeriodoInventario.objects(status="Activo").first()
+    periodo_activo = obtener_periodo_activo()
     if not periodo_activo:
         messages.error(request, "No hay un periodo de inventario activo.")
         return redirect('listar_inventario_climatizacion')
@@ -53,12 +56,9 @@ def registrar_inventario_climatizacion(request):
             voltaje = int(request.POST.get('voltaje'))
             amperaje = Decimal(request.POST.get('amperaje'))
             potencia = Decimal(request.POST.get('potencia'))
-            potencia_total = Decimal(request.POST.get('potencia_total'))
             horas_mes = Decimal(request.POST.get('horas_mes'))
 
-            consumo_mensual = (potencia_total * horas_mes).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-
-            InventarioClimatizacion(
+            registro = InventarioClimatizacion(
                 unidad_responsable=user.unidad_responsable,
                 edificio=edificio,
                 nivel=nivel,
@@ -70,14 +70,13 @@ def registrar_inventario_climatizacion(request):
                 voltaje=voltaje,
                 amperaje=amperaje,
                 potencia=potencia,
-                potencia_total=potencia_total,
                 horas_mes=horas_mes,
-                consumo_mensual=consumo_mensual,
                 creado_por=user,
                 periodo=periodo_activo  # Se guarda aquí
             ).save()
 
             messages.success(request, "Registro de inventario guardado correctamente.")
+            avisar_posible_duplicado(request, registro)
             return redirect('listar_inventario_climatizacion')
 
         except Exception as e:
@@ -86,7 +85,8 @@ def registrar_inventario_climatizacion(request):
     return render(request, 'Capturistas/Inventarios/Climatizacion/add_form.html', {
         'edificios': edificios,
         'areas': areas,
-        'niveles': NIVELES
+        'niveles': NIVELES,
+        'jerarquia': arbol_ur(user.unidad_responsable),
     })
 
 @never_cache
@@ -106,14 +106,7 @@ def listar_inventario_climatizacion(request):
         messages.error(request, "Acceso denegado.")
         return redirect('inicio')
 
-    now = datetime.now()
-
-    periodo_activo = PeriodoInventario.objects(
-        fecha_inicio__lte=now,
-        fecha_fin__gte=now,
-        status="Activo",
-        activo=True
-    ).first()
+    periodo_activo = obtener_periodo_activo()
 
     if not periodo_activo:
         return render(request, 'Capturistas/Inventarios/Climatizacion/inventario_lista.html', {
@@ -164,21 +157,25 @@ def editar_inventario_climatizacion(request, id):
         inventario.voltaje = int(request.POST.get('voltaje'))
         inventario.amperaje = Decimal(request.POST.get('amperaje'))
         inventario.potencia = Decimal(request.POST.get('potencia'))
-        inventario.potencia_total = Decimal(request.POST.get('potencia_total'))
         inventario.horas_mes = Decimal(request.POST.get('horas_mes'))
-        inventario.consumo_mensual = inventario.potencia_total * inventario.horas_mes
         inventario.actualizado_por = user
         inventario.ultima_actualizacion = datetime.now()
-        inventario.save()
+        try:
+            inventario.save()
+        except PeriodoArchivado as e:
+            messages.error(request, str(e))
+            return redirect('listar_inventario_climatizacion')
 
         messages.success(request, "Registro actualizado correctamente.")
+        avisar_posible_duplicado(request, inventario)
         return redirect('listar_inventario_climatizacion')
 
     return render(request, 'Capturistas/Inventarios/Climatizacion/edit_form.html', {
         'inventario': inventario,
         'edificios': edificios,
         'niveles': niveles,
-        'areas_filtradas': areas_filtradas
+        'areas_filtradas': areas_filtradas,
+        'jerarquia': arbol_ur(user.unidad_responsable),
     })
 
 @never_cache
@@ -220,12 +217,11 @@ def obtener_areas_por_edificio(request):
     """
 
     edificio_id = request.GET.get('edificio_id')
-    if not edificio_id:
+    user = get_user(request)
+    if not edificio_id or not user:
         return JsonResponse([], safe=False)
 
     try:
-        areas = Area.objects(edificio=edificio_id)
-        data = [{'id': str(area.id), 'nombre': area.nombre} for area in areas]
-        return JsonResponse(data, safe=False)
+        return JsonResponse(areas_de_edificio(user.unidad_responsable, edificio_id), safe=False)
     except Exception:
         return JsonResponse([], safe=False)
\ No newline at end of file
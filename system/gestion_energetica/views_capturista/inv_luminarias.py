@@ -7,9 +7,12 @@ from django.http import JsonResponse
 from django.views.decorators.cache import never_cache
 from django.shortcuts import render, redirect
 
-from system.models import NIVELES, Area, Edificio, InventarioLuminarias, PeriodoInventario
+from system.models import NIVELES, Area, Edificio, InventarioLuminarias
 from system.decorators import login_required_custom
 from system.views import get_user
+from system.periodos import obtener_periodo_activo
+from system.jerarquia import arbol_ur, areas_de_edificio
+from system.duplicados import avisar_posible_duplicado
 
 # Vistas de funciones de inventario energetico de luminarias
 @never_cache
@@ -33,7 +36,7 @@ def registrar_inventario_luminarias(request):
         return redirect('login')
 
     # Obtener periodo activo
-    periodo_activo = PeriodoInventario.objects(status="Activo").first()
+    periodo_activo = obtener_periodo_activo()
     if not periodo_activo:
         messages.error(request, "No hay un periodo de inventario activo.")
         return redirect('listar_inventario_luminarias')
@@ -59,9 +62,6 @@ def registrar_inventario_luminarias(request):
             potencia_lamp          = Decimal(request.POST['potencia_lamp'])
             horas_mes              = int(request.POST['consumo_mensual_horas'])
 
-            potencia_total = num_luminarias * lamp_luminarias * potencia_lamp / 1000
-            consumo_mensual = potencia_total * horas_mes
-
             inv = InventarioLuminarias(
                 unidad_responsable    = user.unidad_responsable,
                 periodo               = periodo_activo,               # aquí
@@ -72,13 +72,12 @@ def registrar_inventario_luminarias(request):
                 num_luminarias        = num_luminarias,
                 lamp_luminarias       = lamp_luminarias,
                 potencia_lamp         = potencia_lamp,
-                potencia_total_lum    = potencia_total,
                 consumo_mensual_horas = horas_mes,
-                consumo_mensual       = consumo_mensual,
                 creado_por            = user
             )
             inv.save()
             messages.success(request, "Registro guardado exitosamente.")
+            avisar_posible_duplicado(request, inv)
             return redirect('listar_inventario_luminarias')
 
         except Exception as e:
@@ -89,7 +88,8 @@ def registrar_inventario_luminarias(request):
         'niveles'              : niveles,
         'areas_filtradas'      : areas_filtradas,
         'edificio_seleccionado': edificio_id,
-        'nivel_seleccionado'   : nivel_sel
+        'nivel_seleccionado'   : nivel_sel,
+        'jerarquia'            : arbol_ur(user.unidad_responsable),
     })
 
 @never_cache
@@ -110,14 +110,7 @@ def listar_inventario_luminarias(request):
         messages.error(request, "Sesión expirada.")
         return redirect('login')
     
-    now = datetime.now()
-
-    periodo_activo = PeriodoInventario.objects(
-        fecha_inicio__lte=now,
-        fecha_fin__gte=now,
-        status="Activo",
-        activo=True
-    ).first()
+    periodo_activo = obtener_periodo_activo()
 
     if not periodo_activo:
         return render(request, 'Capturistas/Inventarios/Luminarias/inventario_lista.html', {
@@ -177,13 +170,12 @@ def editar_inventario_luminarias(request, id):
             inventario.num_luminarias = int(request.POST.get('num_luminarias'))
             inventario.lamp_luminarias = int(request.POST.get('lamp_luminarias'))
             inventario.potencia_lamp = Decimal(request.POST.get('potencia_lamp'))
-            inventario.potencia_total_lum = inventario.num_luminarias * inventario.lamp_luminarias * inventario.potencia_lamp / 1000
             inventario.consumo_mensual_horas = int(request.POST.get('consumo_mensual_horas'))
-            inventario.consumo_mensual = inventario.potencia_total_lum * inventario.consumo_mensual_horas
             inventario.actualizado_por = user
             inventario.ultima_actualizacion = datetime.now()
             inventario.save()
             messages.success(request, "Registro actualizado correctamente.")
+            avisar_posible_duplicado(request, inventario)
             return redirect('listar_inventario_luminarias')
         except Exception as e:
             messages.error(request, f"Error al actualizar: {e}")
@@ -192,7 +184,8 @@ def editar_inventario_luminarias(request, id):
         'inventario': inventario,
         'edificios': edificios,
         'niveles': niveles,
-        'areas_filtradas': areas_filtradas
+        'areas_filtradas': areas_filtradas,
+        'jerarquia': arbol_ur(user.unidad_responsable),
     })
 
 @never_cache
@@ -232,12 +225,11 @@ def obtener_areas_luminarias(request):
     """
 
     edificio_id = request.GET.get('edificio_id')
-    if not edificio_id:
+    user = get_user(request)
+    if not edificio_id or not user:
         return JsonResponse([], safe=False)
 
     try:
-        areas = Area.objects(edificio=edificio_id)
-        data = [{'id': str(area.id), 'nombre': area.nombre} for area in areas]
-        return JsonResponse(data, safe=False)
+        return JsonResponse(areas_de_edificio(user.unidad_responsable, edificio_id), safe=False)
     except Exception:
         return JsonResponse([], safe=False)
\ No newline at end of file
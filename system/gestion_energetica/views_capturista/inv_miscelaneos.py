@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import Decimal
 
 from mongoengine.errors import DoesNotExist
 
@@ -9,9 +9,12 @@ from django.http import JsonResponse
 from django.views.decorators.cache import never_cache
 from django.shortcuts import render, redirect
 
-from system.models import NIVELES, Area, Edificio, InventarioMiscelaneos, PeriodoInventario
+from system.models import NIVELES, Area, Edificio, InventarioMiscelaneos
 from system.decorators import login_required_custom
 from system.views import get_user
+from system.periodos import obtener_periodo_activo
+from system.jerarquia import arbol_ur, areas_de_edificio
+from system.duplicados import avisar_posible_duplicado
 
 # Vistas de funciones de inventario energetico de misceláneos
 @never_cache
@@ -35,7 +38,7 @@ def registrar_inventario_miscelaneos(request):
         return redirect("inicio")
 
     # 1) Obtener periodo activo
-    periodo_activo = PeriodoInventario.objects(status="Activo").first()
+    periodo_activo = obtener_periodo_activo()
     if not periodo_activo:
         messages.error(request, "No hay un periodo de inventario activo.")
         return redirect("listar_inventario_miscelaneos")
@@ -62,11 +65,9 @@ def registrar_inventario_miscelaneos(request):
             voltaje       = Decimal(request.POST["voltaje"])
             amperaje      = Decimal(request.POST["amperaje"])
             potencia      = voltaje * amperaje
-            potencia_total= potencia / 1000
             horas_mes     = Decimal(request.POST["horas_mes"])
-            consumo_mensual = (potencia_total * horas_mes).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
 
-            InventarioMiscelaneos(
+            registro = InventarioMiscelaneos(
                 unidad_responsable = user.unidad_responsable,
                 periodo            = periodo_activo,           # <-- aquí
                 edificio           = edificio,
@@ -78,13 +79,12 @@ def registrar_inventario_miscelaneos(request):
                 voltaje            = voltaje,
                 amperaje           = amperaje,
                 potencia           = potencia,
-                potencia_total     = potencia_total,
                 horas_mes          = horas_mes,
-                consumo_mensual    = consumo_mensual,
                 creado_por         = user
             ).save()
 
             messages.success(request, "Inventario registrado correctamente.")
+            avisar_posible_duplicado(request, registro)
             return redirect("listar_inventario_miscelaneos")
 
         except Exception as e:
@@ -99,6 +99,7 @@ def registrar_inventario_miscelaneos(request):
             "areas_filtradas"      : areas_filtradas,
             "edificio_seleccionado": eid,
             "nivel_seleccionado"   : nsel,
+            "jerarquia"            : arbol_ur(user.unidad_responsable),
         },
     )
 
@@ -120,14 +121,7 @@ def listar_inventario_miscelaneos(request):
         messages.error(request, "Sesión expirada.")
         return redirect("login")
     
-    now = datetime.now()
-
-    periodo_activo = PeriodoInventario.objects(
-        fecha_inicio__lte=now,
-        fecha_fin__gte=now,
-        status="Activo",
-        activo=True
-    ).first()
+    periodo_activo = obtener_periodo_activo()
 
     if not periodo_activo:
         return render(request, 'Capturistas/Inventarios/Miscelaneos/inventario_lista.html', {
@@ -160,13 +154,12 @@ def obtener_areas_por_edificio_miscelaneos(request):
     """
 
     edificio_id = request.GET.get("edificio_id")
-    if not edificio_id:
+    user = get_user(request)
+    if not edificio_id or not user:
         return JsonResponse([], safe=False)
 
     try:
-        areas = Area.objects(edificio=edificio_id).only("id", "nombre")
-        data = [{"id": str(area.id), "nombre": area.nombre} for area in areas]
-        return JsonResponse(data, safe=False)
+        return JsonResponse(areas_de_edificio(user.unidad_responsable, edificio_id), safe=False)
     except Exception:
         return JsonResponse([], safe=False)
 
@@ -214,14 +207,13 @@ def editar_inventario_miscelaneos(request, id):
             inventario.voltaje = Decimal(request.POST.get('voltaje'))
             inventario.amperaje = Decimal(request.POST.get('amperaje'))
             inventario.potencia = inventario.voltaje * inventario.amperaje
-            inventario.potencia_total = inventario.potencia / 1000
             inventario.horas_mes = Decimal(request.POST.get('horas_mes'))
-            inventario.consumo_mensual = inventario.potencia_total * inventario.horas_mes
             inventario.actualizado_por = user
             inventario.ultima_actualizacion = datetime.now()
             inventario.save()
 
             messages.success(request, "Registro actualizado correctamente.")
+            avisar_posible_duplicado(request, inventario)
             return redirect('listar_inventario_miscelaneos')
         except Exception as e:
             messages.error(request, f"Error al actualizar: {e}")
@@ -231,6 +223,7 @@ def editar_inventario_miscelaneos(request, id):
         'edificios': edificios,
         'niveles': niveles,
         'areas_filtradas': areas_filtradas,
+        'jerarquia': arbol_ur(user.unidad_responsable),
     })
 
 @never_cache
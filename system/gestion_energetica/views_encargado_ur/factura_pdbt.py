@@ -10,6 +10,7 @@ from django.http import FileResponse, Http404, HttpResponse
 from django.views.decorators.cache import never_cache
 
 from system.models import FacturaPdbt, Subestacion
+from system.mongo import para_lectura
 from system.views import get_user
 from system.decorators import login_required_custom
 
@@ -238,10 +239,10 @@ def exportar_facturas_pdbt_excel(request):
         return redirect('login')
 
     if user.rol == 'admin':
-        facturas = FacturaPdbt.objects()
+        facturas = para_lectura(FacturaPdbt.objects())
     else:
         subestaciones = Subestacion.objects(unidad_responsable=user.unidad_responsable)
-        facturas = FacturaPdbt.objects(subestacion__in=subestaciones)
+        facturas = para_lectura(FacturaPdbt.objects(subestacion__in=subestaciones))
 
     wb = openpyxl.Workbook()
     ws = wb.active
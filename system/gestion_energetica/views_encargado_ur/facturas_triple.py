@@ -15,6 +15,7 @@ from django.utils.encoding import smart_str
 from django.core.exceptions import ValidationError
 
 from system.models import FacturaEnergeticaTriple, Subestacion
+from system.mongo import para_lectura
 from system.views import get_user
 from system.decorators import login_required_custom
 
@@ -301,7 +302,7 @@ def exportar_facturas_triple_excel(request):
     else:
         subestaciones = Subestacion.objects(unidad_responsable=user.unidad_responsable)
 
-    facturas = FacturaEnergeticaTriple.objects(subestacion__in=subestaciones)
+    facturas = para_lectura(FacturaEnergeticaTriple.objects(subestacion__in=subestaciones))
 
     wb = Workbook()
     ws = wb.active
@@ -1,10 +1,9 @@
-from datetime import datetime
-
 from django.shortcuts import render
 from django.views.decorators.cache import never_cache
 
 from system.decorators import login_required_custom
-from system.models import PeriodoInventario, Subestacion
+from system.models import Subestacion
+from system.periodos import obtener_periodo_activo
 from system.views import get_user
 
 @never_cache
@@ -13,13 +12,7 @@ def Inicio_encargado(request):
     user = get_user(request)
 
     # Buscar si hay un periodo activo actualmente
-    hoy = datetime.now()
-    periodo_activo = PeriodoInventario.objects(
-        status="Activo",
-        fecha_inicio__lte=hoy,
-        fecha_fin__gte=hoy,
-        activo=True
-    ).first()
+    periodo_activo = obtener_periodo_activo()
 
     subestaciones = Subestacion.objects(unidad_responsable=user.unidad_responsable)
     tarifas_disponibles = set(sub.tarifa for sub in subestaciones)
@@ -5,18 +5,26 @@ from django.contrib import messages
 from system.decorators import login_required_custom
 from system.models import InventarioClimatizacion, InventarioLuminarias, InventarioMiscelaneos, Subestacion, PeriodoInventario
 from system.views import get_user
+from system.archivo import inventario_de_periodo
+from system.periodos import obtener_periodo_activo
 
-# Función auxiliar para filtrar por periodo
-def filtrar_por_periodo(queryset, request):
+# Función auxiliar para filtrar por periodo (por defecto el activo o el más reciente).
+# Siempre se acota a un periodo: los finalizados pueden estar en las colecciones de archivo.
+def filtrar_por_periodo(modelo, request, **filtros):
+    periodo = None
     periodo_id = request.GET.get("periodo")
 
     if periodo_id:
         try:
-            queryset = queryset.filter(periodo=periodo_id)
+            periodo = PeriodoInventario.objects(id=periodo_id).first()
         except:
             pass
 
-    return queryset, periodo_id
+    periodo = periodo or obtener_periodo_activo() or PeriodoInventario.objects.order_by('-fecha_inicio').first()
+    if not periodo:
+        return modelo.objects.none(), None
+
+    return inventario_de_periodo(modelo, periodo, **filtros), str(periodo.id)
 
 # Vista de listados de inventarios energeticos
 @never_cache
@@ -39,9 +47,9 @@ def listar_climatizacion_encargado(request):
     # Obtener todos los periodos (para el filtro)
     periodos = PeriodoInventario.objects.order_by('-fecha_inicio')
 
-    registros = InventarioClimatizacion.objects(unidad_responsable=user.unidad_responsable)
-
-    registros, periodo_id = filtrar_por_periodo(registros, request)
+    registros, periodo_id = filtrar_por_periodo(InventarioClimatizacion, request, unidad_responsable=user.unidad_responsable)
+    # Carga las referencias (edificio, área, usuarios) con una consulta por colección
+    registros = registros.select_related()
 
     total_potencia = sum([i.potencia_total for i in registros])
     total_horas = sum([i.horas_mes for i in registros])
@@ -82,9 +90,9 @@ def listar_luminarias_encargado(request):
 
     periodos = PeriodoInventario.objects.order_by('-fecha_inicio')
 
-    registros = InventarioLuminarias.objects(unidad_responsable=user.unidad_responsable)
-
-    registros, periodo_id = filtrar_por_periodo(registros, request)
+    registros, periodo_id = filtrar_por_periodo(InventarioLuminarias, request, unidad_responsable=user.unidad_responsable)
+    # Carga las referencias (edificio, área, usuarios) con una consulta por colección
+    registros = registros.select_related()
 
     total_potencia = sum([i.potencia_total_lum for i in registros])
     total_horas = sum([i.consumo_mensual_horas for i in registros])
@@ -125,9 +133,9 @@ def listar_miscelaneos_encargado(request):
 
     periodos = PeriodoInventario.objects.order_by('-fecha_inicio')
 
-    registros = InventarioMiscelaneos.objects(unidad_responsable=user.unidad_responsable)
-
-    registros, periodo_id = filtrar_por_periodo(registros, request)
+    registros, periodo_id = filtrar_por_periodo(InventarioMiscelaneos, request, unidad_responsable=user.unidad_responsable)
+    # Carga las referencias (edificio, área, usuarios) con una consulta por colección
+    registros = registros.select_related()
 
     total_potencia = sum([i.potencia_total for i in registros])
     total_horas = sum([i.horas_mes for i in registros])
@@ -0,0 +1,92 @@
+from django.shortcuts import redirect, render
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_POST
+from django.contrib import messages
+
+from system.decorators import login_required_custom
+from system.models import PeriodoInventario
+from system.views import get_user
+from system.periodos import obtener_periodo_activo
+from system.inventario_periodos import arrastrar_inventario, diferencias_inventario, periodo_anterior
+
+
+# Función auxiliar para obtener un periodo desde un parámetro GET
+def obtener_periodo(periodo_id):
+    if not periodo_id:
+        return None
+    try:
+        return PeriodoInventario.objects(id=periodo_id).first()
+    except Exception:
+        return None
+
+
+@never_cache
+@login_required_custom
+@require_POST
+def arrastrar_inventario_encargado(request):
+    """
+    Copia al periodo activo el inventario del periodo anterior de la UR del encargado.
+
+    - Solo se copian los equipos activos y los que no se hayan arrastrado antes.
+    - Los capturistas solo editan o dan de baja lo que cambió en lugar de capturar todo de nuevo.
+    """
+
+    user = get_user(request)
+    if not user or user.rol != "encargado_ur":
+        messages.error(request, "Acceso denegado.")
+        return redirect("inicio")
+
+    periodo_activo = obtener_periodo_activo()
+    if not periodo_activo:
+        messages.error(request, "No hay un periodo de inventario activo.")
+        return redirect("diferencias_inventario_encargado")
+
+    origen = periodo_anterior(periodo_activo)
+    if not origen:
+        messages.error(request, "No existe un periodo anterior del cual copiar el inventario.")
+        return redirect("diferencias_inventario_encargado")
+
+    copiados = arrastrar_inventario(user.unidad_responsable, periodo_activo, user, origen)
+    if sum(copiados.values()):
+        detalle = ", ".join(f"{tipo}: {n}" for tipo, n in copiados.items())
+        messages.success(request, f"Inventario copiado de {origen.nombre} a {periodo_activo.nombre} ({detalle}).")
+    else:
+        messages.info(request, f"El inventario de {origen.nombre} ya estaba copiado al periodo activo.")
+    return redirect("diferencias_inventario_encargado")
+
+
+@never_cache
+@login_required_custom
+def diferencias_inventario_encargado(request):
+    """
+    Reporte de diferencias del inventario de la UR entre dos periodos.
+
+    - Por defecto compara el periodo activo (o el más reciente) con su periodo anterior.
+    - Muestra equipos agregados, eliminados y modificados, y la diferencia de kWh por edificio y área.
+    """
+
+    user = get_user(request)
+    if not user or user.rol != "encargado_ur":
+        messages.error(request, "Acceso denegado.")
+        return redirect("inicio")
+
+    periodos = PeriodoInventario.objects.order_by('-fecha_inicio')
+
+    periodo_b = obtener_periodo(request.GET.get("periodo_b")) or obtener_periodo_activo() or periodos.first()
+    periodo_a = obtener_periodo(request.GET.get("periodo_a"))
+    if periodo_b and not periodo_a:
+        periodo_a = periodo_anterior(periodo_b)
+
+    reporte = None
+    if periodo_a and periodo_b:
+        reporte = diferencias_inventario(user.unidad_responsable, periodo_a, periodo_b)
+
+    context = {
+        "periodos": periodos,
+        "periodo_a": periodo_a,
+        "periodo_b": periodo_b,
+        "reporte": reporte,
+        "periodo_activo": obtener_periodo_activo(),
+    }
+
+    return render(request, "Encargado_UR/Inventarios/diferencias.html", context)
@@ -0,0 +1,83 @@
+# system/hashing.py
+"""
+Hash y verificación de contraseñas con bcrypt en un pool acotado de hilos.
+
+- Como máximo ``SIGO_BCRYPT_HILOS`` cálculos de bcrypt corren a la vez y hasta
+  ``SIGO_BCRYPT_COLA`` esperan turno; si la cola está llena se lanza ``BcryptSaturado``
+  en lugar de dejar a todos los workers ocupados calculando hashes.
+- ``necesita_rehash`` indica si el hash se creó con un costo distinto de ``SIGO_BCRYPT_ROUNDS``.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from django.conf import settings
+
+
+class BcryptSaturado(Exception):
+    """El pool de bcrypt no tiene lugar para otra verificación."""
+
+
+_lock = threading.Lock()
+_pool = None
+_cupos = None
+
+
+def _rondas_configuradas():
+    return int(getattr(settings, "SIGO_BCRYPT_ROUNDS", 12))
+
+
+def _obtener_pool():
+    global _pool, _cupos
+    with _lock:
+        if _pool is None:
+            hilos = int(getattr(settings, "SIGO_BCRYPT_HILOS", 4))
+            cola = int(getattr(settings, "SIGO_BCRYPT_COLA", 32))
+            _pool = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="bcrypt")
+            _cupos = threading.BoundedSemaphore(hilos + cola)
+    return _pool, _cupos
+
+
+def _ejecutar(funcion, *args):
+    pool, cupos = _obtener_pool()
+    espera = float(getattr(settings, "SIGO_BCRYPT_ESPERA_SEG", 5))
+    if not cupos.acquire(timeout=espera):
+        raise BcryptSaturado
+    try:
+        return pool.submit(funcion, *args).result()
+    finally:
+        cupos.release()
+
+
+def hashear_password(plain):
+    salt = bcrypt.gensalt(rounds=_rondas_configuradas())
+    return _ejecutar(bcrypt.hashpw, plain.encode('utf-8'), salt).decode('utf-8')
+
+
+def verificar_password(plain, hashed):
+    return _ejecutar(bcrypt.checkpw, plain.encode('utf-8'), hashed.encode('utf-8'))
+
+
+def rondas_hash(hashed):
+    """Costo con el que se generó un hash bcrypt ($2b$12$...)."""
+    try:
+        return int(hashed.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def necesita_rehash(hashed):
+    return rondas_hash(hashed) != _rondas_configuradas()
+
+
+def _reiniciar_en_hijo():
+    # Los hilos del pool no sobreviven a fork; el hijo crea el suyo al primer uso
+    global _lock, _pool, _cupos
+    _lock = threading.Lock()
+    _pool = None
+    _cupos = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reiniciar_en_hijo)
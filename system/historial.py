@@ -0,0 +1,97 @@
+# system/historial.py
+"""
+Snapshot de cierre de periodo en ``HistorialInventario``.
+
+- Al finalizar un periodo se copian sus inventarios activos (climatización, luminarias y
+  misceláneos) a documentos compactos: solo los campos descriptivos y de consumo.
+- Se lee con un cursor proyectado y se escribe con ``insert_many`` por lotes; el índice único
+  (periodo, tipo, inventario_id) hace que repetir el snapshot no duplique registros.
+- La tarea ``snapshot_periodos`` del programador procesa los periodos terminados pendientes.
+"""
+from datetime import datetime
+
+from pymongo.errors import BulkWriteError
+
+from system.models import (
+    HistorialInventario, InventarioClimatizacion, InventarioLuminarias, InventarioMiscelaneos,
+    PeriodoInventario,
+)
+from system.periodos import inicio_del_dia
+
+TAMANO_LOTE = 1000
+
+# tipo: (modelo, campos copiados a 'datos')
+INVENTARIOS_SNAPSHOT = {
+    "Climatización": (InventarioClimatizacion, [
+        "unidad_responsable", "edificio", "area", "nivel", "tipo_clima", "marca", "modelo", "capacidad",
+        "voltaje", "amperaje", "potencia", "potencia_total", "horas_mes", "consumo_mensual",
+    ]),
+    "Luminarias": (InventarioLuminarias, [
+        "unidad_responsable", "edificio", "area", "nivel", "tipo_lampara", "num_luminarias",
+        "lamp_luminarias", "potencia_lamp", "potencia_total_lum", "consumo_mensual_horas", "consumo_mensual",
+    ]),
+    "Misceláneos": (InventarioMiscelaneos, [
+        "unidad_responsable", "edificio", "area", "nivel", "miscelaneos", "marca", "modelo",
+        "voltaje", "amperaje", "potencia", "potencia_total", "horas_mes", "consumo_mensual",
+    ]),
+}
+
+CODIGO_CLAVE_DUPLICADA = 11000
+
+
+def insertar_ignorando_duplicados(coleccion, lote):
+    """Inserta el lote ignorando los registros que ya estaban en el historial."""
+    try:
+        return len(coleccion.insert_many(lote, ordered=False).inserted_ids)
+    except BulkWriteError as e:
+        errores = e.details.get("writeErrors", [])
+        if any(err.get("code") != CODIGO_CLAVE_DUPLICADA for err in errores):
+            raise
+        return e.details.get("nInserted", 0)
+
+
+def generar_snapshot_periodo(periodo, tamano_lote=TAMANO_LOTE):
+    """Copia los inventarios activos del periodo al historial. Devuelve {tipo: insertados}."""
+    destino = HistorialInventario._get_collection()
+    ahora = datetime.utcnow()
+    insertados = {}
+
+    for tipo, (modelo, campos) in INVENTARIOS_SNAPSHOT.items():
+        cursor = modelo._get_collection().find(
+            {"periodo": periodo.id, "activo": True},
+            projection=dict.fromkeys(campos, 1),
+            batch_size=tamano_lote,
+        )
+        total = 0
+        lote = []
+        for doc in cursor:
+            inventario_id = doc.pop("_id")
+            lote.append({
+                "periodo": periodo.id,
+                "inventario_id": inventario_id,
+                "tipo": tipo,
+                "datos": doc,
+                "fecha_registro": ahora,
+            })
+            if len(lote) >= tamano_lote:
+                total += insertar_ignorando_duplicados(destino, lote)
+                lote = []
+        if lote:
+            total += insertar_ignorando_duplicados(destino, lote)
+        insertados[tipo] = total
+
+    PeriodoInventario.objects(id=periodo.id).update_one(set__snapshot_generado=ahora)
+    return insertados
+
+
+def periodos_pendientes_de_snapshot(ahora=None):
+    """Periodos ya terminados cuyo cierre aún no se copió al historial."""
+    ahora = ahora or datetime.now()
+    return PeriodoInventario.objects(fecha_fin__lt=inicio_del_dia(ahora), snapshot_generado=None).order_by('fecha_fin')
+
+
+def generar_snapshots_pendientes():
+    return {
+        periodo.nombre: generar_snapshot_periodo(periodo)
+        for periodo in periodos_pendientes_de_snapshot()
+    }
@@ -0,0 +1,134 @@
+# system/inventario_masivo.py
+"""
+Bajas y restauraciones masivas de inventarios energéticos.
+
+- Los registros se eligen por selección múltiple (``ids``) o por filtros (UR, edificio, área, periodo).
+- Cada operación es un solo ``update_many`` sobre los ``_id`` afectados, con los mismos campos que
+  la baja/restauración individual (``activo``, ``fecha_baja``/``fecha_reactivacion``, usuario).
+- Se guarda un ``OperacionMasivaInventario`` por lote con el criterio usado y los registros que
+  realmente cambiaron (la actualización vuelve a exigir el estado esperado).
+- Los registros de periodos archivados (system/archivo.py) no se seleccionan: ya no admiten cambios.
+"""
+from datetime import datetime
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from system.models import (
+    Area, Edificio, InventarioClimatizacion, InventarioLuminarias, InventarioMiscelaneos,
+    OperacionMasivaInventario, PeriodoInventario, UnidadResponsable,
+)
+
+# slug de la URL: (tipo, modelo, vista de listado, vista de bajas)
+INVENTARIOS = {
+    "climatizacion": ("Climatización", InventarioClimatizacion,
+                      "listado_inventario_climatizacion", "historial_climatizacion_admin"),
+    "luminarias": ("Luminarias", InventarioLuminarias,
+                   "listado_inventario_luminarias", "historial_luminarias_admin"),
+    "miscelaneos": ("Misceláneos", InventarioMiscelaneos,
+                    "listado_inventario_miscelaneos", "historial_miscelaneos_admin"),
+}
+
+CAMPOS_FILTRO = ["unidad_responsable", "edificio", "area", "periodo"]
+
+MAX_REGISTROS = 5000
+
+
+class OperacionMasivaInvalida(Exception):
+    """El criterio no selecciona registros de forma segura (vacío, ids inválidos o demasiados)."""
+
+
+def _object_ids(valores):
+    try:
+        return [ObjectId(v) for v in valores if v]
+    except (InvalidId, TypeError):
+        raise OperacionMasivaInvalida("La selección contiene identificadores inválidos.")
+
+
+def criterio_desde_post(post):
+    """Obtiene el criterio del formulario: los ids marcados o, si no hay, los filtros."""
+    ids = _object_ids(post.getlist("ids"))
+    if ids:
+        return {"ids": ids}
+    campos = [campo for campo in CAMPOS_FILTRO if post.get(campo)]
+    if not campos:
+        raise OperacionMasivaInvalida("Seleccione registros o al menos un filtro.")
+    return {"filtros": dict(zip(campos, _object_ids(post.get(campo) for campo in campos)))}
+
+
+def _filtro_estado(criterio, **estado):
+    """Filtro de estado del registro más la exclusión de periodos archivados."""
+    archivados = list(PeriodoInventario.objects(archivado=True).scalar('id'))
+    if "filtros" in criterio and criterio["filtros"].get("periodo") in archivados:
+        raise OperacionMasivaInvalida("El periodo está archivado y ya no admite cambios.")
+    estado["periodo__nin"] = archivados
+    return estado
+
+
+def _registros(modelo, criterio, estado):
+    if "ids" in criterio:
+        queryset = modelo.objects(id__in=criterio["ids"], **estado)
+    else:
+        queryset = modelo.objects(**estado, **criterio["filtros"])
+    ids = list(queryset.scalar('id')[:MAX_REGISTROS + 1])
+    if len(ids) > MAX_REGISTROS:
+        raise OperacionMasivaInvalida(
+            f"El criterio selecciona más de {MAX_REGISTROS} registros; acote los filtros."
+        )
+    return ids
+
+
+def _aplicar(slug, criterio, usuario, accion):
+    tipo, modelo, _, _ = INVENTARIOS[slug]
+    # MongoDB guarda milisegundos: la fecha se trunca para encontrar después los registros cambiados
+    ahora = datetime.now()
+    ahora = ahora.replace(microsecond=ahora.microsecond // 1000 * 1000)
+    if accion == "baja":
+        # Como el listado, los registros sin el campo 'activo' cuentan como activos
+        estado = _filtro_estado(criterio, activo__ne=False)
+        cambios = {"set__activo": False, "set__fecha_baja": ahora, "set__dado_baja_por": usuario}
+        marca = {"activo": False, "fecha_baja": ahora, "dado_baja_por": usuario}
+    else:
+        estado = _filtro_estado(criterio, activo=False)
+        cambios = {"set__activo": True, "set__fecha_reactivacion": ahora, "set__reactivado_por": usuario}
+        marca = {"activo": True, "fecha_reactivacion": ahora, "reactivado_por": usuario}
+    ids = _registros(modelo, criterio, estado)
+    if not ids:
+        return 0
+
+    # El filtro de estado se repite: lo que otra petición cambió desde la lectura no se toca
+    total = modelo.objects(id__in=ids, **estado).update(**cambios)
+    cambiados = list(modelo.objects(id__in=ids, **marca).scalar('id')) if total else []
+    OperacionMasivaInventario(
+        tipo=tipo,
+        accion=accion,
+        usuario=usuario,
+        fecha=ahora,
+        criterio=(
+            {"seleccionados": len(criterio["ids"])} if "ids" in criterio
+            else {campo: str(valor) for campo, valor in criterio["filtros"].items()}
+        ),
+        registros=cambiados,
+        total=total,
+    ).save()
+    return total
+
+
+def baja_masiva(slug, criterio, usuario):
+    """Da de baja los registros activos del criterio. Devuelve cuántos se modificaron."""
+    return _aplicar(slug, criterio, usuario, "baja")
+
+
+def restauracion_masiva(slug, criterio, usuario):
+    """Reactiva los registros dados de baja del criterio. Devuelve cuántos se modificaron."""
+    return _aplicar(slug, criterio, usuario, "restauracion")
+
+
+def catalogos_filtro():
+    """Opciones para los filtros del formulario de operaciones masivas."""
+    return {
+        "filtro_urs": UnidadResponsable.objects.only('nombre').order_by('nombre'),
+        "filtro_edificios": Edificio.objects.only('nombre').order_by('nombre'),
+        "filtro_areas": Area.objects.only('nombre').order_by('nombre'),
+        "filtro_periodos": PeriodoInventario.objects.only('nombre', 'archivado').order_by('-fecha_inicio'),
+    }
@@ -0,0 +1,182 @@
+# system/inventario_periodos.py
+"""
+Arrastre de inventario entre periodos y reporte de diferencias.
+
+- ``arrastrar_inventario()`` copia en un solo ``insert_many`` por tipo los equipos activos de la UR
+  del periodo anterior al nuevo; cada copia guarda ``origen_id`` y el índice único
+  (periodo, origen_id) evita duplicarla si el arrastre se repite.
+- ``diferencias_inventario()`` compara dos periodos con un cruce por clave (``origen_id`` y, para
+  los equipos capturados de nuevo, sus datos de identificación) en lugar de ciclos anidados:
+  equipos agregados, eliminados, modificados y la diferencia de kWh por edificio y área.
+"""
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from system.archivo import coleccion_inventario
+from system.catalogo import INVENTARIOS_CATALOGO, clave_equipo, terminos_busqueda
+from system.duplicados import huella_de
+from system.historial import INVENTARIOS_SNAPSHOT, insertar_ignorando_duplicados
+from system.models import Area, Edificio, PeriodoInventario
+
+# Campos que identifican a un equipo cuando no tiene origen_id (captura manual en el periodo nuevo)
+CAMPOS_IDENTIDAD = {
+    "Climatización": ["edificio", "area", "nivel", "tipo_clima", "marca", "modelo", "capacidad"],
+    "Luminarias": ["edificio", "area", "nivel", "tipo_lampara"],
+    "Misceláneos": ["edificio", "area", "nivel", "miscelaneos", "marca", "modelo"],
+}
+
+
+def _decimal(valor):
+    try:
+        return Decimal(str(valor)) if valor is not None else Decimal("0")
+    except InvalidOperation:
+        return Decimal("0")
+
+
+def periodo_anterior(periodo):
+    """Periodo inmediatamente anterior (por fecha de inicio) al indicado."""
+    return PeriodoInventario.objects(fecha_inicio__lt=periodo.fecha_inicio).order_by('-fecha_inicio').first()
+
+
+def _leer(modelo, periodo, unidad, campos):
+    return coleccion_inventario(modelo, periodo).find(
+        {"periodo": periodo.id, "unidad_responsable": unidad.id, "activo": True},
+        projection=dict.fromkeys(campos + ["origen_id"], 1),
+    )
+
+
+# ==================== ARRASTRE ====================
+
+def arrastrar_inventario(unidad, destino, usuario, origen=None):
+    """
+    Copia al periodo ``destino`` los equipos activos de ``unidad`` del periodo ``origen``
+    (por defecto el anterior). Devuelve {tipo: registros copiados}.
+    """
+    origen = origen or periodo_anterior(destino)
+    if origen is None:
+        return {}
+
+    ahora = datetime.now()
+    copiados = {}
+    for tipo, (modelo, campos) in INVENTARIOS_SNAPSHOT.items():
+        coleccion = modelo._get_collection()
+        ya_arrastrados = set(coleccion.distinct(
+            "origen_id", {"periodo": destino.id, "unidad_responsable": unidad.id}
+        ))
+        nuevos = []
+        for doc in _leer(modelo, origen, unidad, campos):
+            origen_id = doc.pop("_id")
+            if origen_id in ya_arrastrados:
+                continue
+            doc.pop("origen_id", None)
+            doc.update({
+                "periodo": destino.id,
+                "origen_id": origen_id,
+                "fecha_registro": ahora,
+                "creado_por": usuario.id,
+                "activo": True,
+            })
+            # insert_many no pasa por save(): huella, términos de búsqueda y clave de catálogo se calculan aquí
+            doc["huella"] = huella_de(modelo.tipo_inventario, doc)
+            doc["busqueda"] = terminos_busqueda(*(doc.get(c) for c in modelo.campos_texto))
+            if modelo.tipo_inventario in INVENTARIOS_CATALOGO:
+                doc["clave_equipo"] = clave_equipo(modelo.tipo_inventario, doc.get("marca"), doc.get("modelo"))
+            nuevos.append(doc)
+        copiados[tipo] = insertar_ignorando_duplicados(coleccion, nuevos) if nuevos else 0
+    return copiados
+
+
+# ==================== DIFERENCIAS ====================
+
+def _clave_identidad(doc, tipo):
+    return tuple(str(doc.get(c)) for c in CAMPOS_IDENTIDAD[tipo])
+
+
+def _cruzar(anteriores, actuales, tipo):
+    """
+    Empareja los equipos de ambos periodos. Primero por ``origen_id`` y, para los que quedan
+    sueltos, por sus datos de identificación. Devuelve (pares, agregados, eliminados).
+    """
+    por_id = {doc["_id"]: doc for doc in anteriores}
+    pares, sin_origen = [], []
+    for doc in actuales:
+        previo = por_id.pop(doc.get("origen_id"), None)
+        if previo is not None:
+            pares.append((previo, doc))
+        else:
+            sin_origen.append(doc)
+
+    por_identidad = defaultdict(list)
+    for previo in por_id.values():
+        por_identidad[_clave_identidad(previo, tipo)].append(previo)
+
+    agregados = []
+    for doc in sin_origen:
+        candidatos = por_identidad.get(_clave_identidad(doc, tipo))
+        if candidatos:
+            pares.append((candidatos.pop(), doc))
+        else:
+            agregados.append(doc)
+    eliminados = [previo for grupo in por_identidad.values() for previo in grupo]
+    return pares, agregados, eliminados
+
+
+def diferencias_inventario(unidad, periodo_a, periodo_b):
+    """
+    Compara el inventario activo de ``unidad`` entre ``periodo_a`` (anterior) y ``periodo_b``.
+    Devuelve {"tipos": {tipo: {...}}, "consumo": [...], "delta_total": Decimal}.
+    """
+    tipos = {}
+    consumo = defaultdict(lambda: [Decimal("0"), Decimal("0")])
+
+    for tipo, (modelo, campos) in INVENTARIOS_SNAPSHOT.items():
+        anteriores = list(_leer(modelo, periodo_a, unidad, campos))
+        actuales = list(_leer(modelo, periodo_b, unidad, campos))
+        for doc in anteriores:
+            consumo[(doc.get("edificio"), doc.get("area"))][0] += _decimal(doc.get("consumo_mensual"))
+        for doc in actuales:
+            consumo[(doc.get("edificio"), doc.get("area"))][1] += _decimal(doc.get("consumo_mensual"))
+
+        comparados = [c for c in campos if c != "unidad_responsable"]
+        pares, agregados, eliminados = _cruzar(anteriores, actuales, tipo)
+        modificados = []
+        for previo, doc in pares:
+            cambios = [c for c in comparados if str(previo.get(c)) != str(doc.get(c))]
+            if cambios:
+                modificados.append({"antes": previo, "despues": doc, "campos": cambios})
+        tipos[tipo] = {
+            "agregados": agregados,
+            "eliminados": eliminados,
+            "modificados": modificados,
+            "sin_cambios": len(pares) - len(modificados),
+        }
+
+    # Nombres de edificios y áreas con una consulta por colección
+    edificios = {e.id: e.nombre for e in Edificio.objects(id__in=[e for e, _ in consumo if e]).only('nombre')}
+    areas = {a.id: a.nombre for a in Area.objects(id__in=[a for _, a in consumo if a]).only('nombre')}
+    filas = [
+        {
+            "edificio": edificios.get(edificio, "—"),
+            "area": areas.get(area, "—"),
+            "anterior": anterior,
+            "actual": actual,
+            "delta": actual - anterior,
+        }
+        for (edificio, area), (anterior, actual) in consumo.items()
+    ]
+    filas.sort(key=lambda f: (f["edificio"], f["area"]))
+
+    for detalle in tipos.values():
+        for doc in detalle["agregados"] + detalle["eliminados"]:
+            doc["edificio_nombre"] = edificios.get(doc.get("edificio"), "—")
+            doc["area_nombre"] = areas.get(doc.get("area"), "—")
+        for cambio in detalle["modificados"]:
+            cambio["despues"]["edificio_nombre"] = edificios.get(cambio["despues"].get("edificio"), "—")
+            cambio["despues"]["area_nombre"] = areas.get(cambio["despues"].get("area"), "—")
+
+    return {
+        "tipos": tipos,
+        "consumo": filas,
+        "delta_total": sum((f["delta"] for f in filas), Decimal("0")),
+    }
@@ -0,0 +1,228 @@
+# system/jerarquia.py
+"""
+Jerarquía campus → UR → edificio → área → subestación con caché.
+
+- ``arbol_ur()`` arma el subárbol completo de una UR (edificios con sus áreas y subestaciones)
+  con tres consultas y lo guarda en la caché de Django; ``arbol_campus()`` guarda los campus
+  con sus UR. Cada árbol lleva ``version`` (hash del contenido) y ``generado``.
+- Guardar o eliminar un Edificio, Área o Subestación incrementa la generación de su UR;
+  Campus y UnidadResponsable incrementan la generación global, que invalida todos los árboles.
+  ``SIGO_JERARQUIA_CACHE_SEG`` acota el desfase entre workers cuando la caché es local.
+- ``jerarquia_api`` (``/api/jerarquia/`` y ``/api/jerarquia/<ur_id>/``) responde con ETag y
+  Last-Modified; si el navegador ya tiene la versión vigente recibe un 304 sin cuerpo.
+- Los formularios de captura reciben el árbol de su UR en la página (``json_script``) y
+  ``static/js/jerarquia.js`` filtra las áreas por edificio sin pedir nada al servidor.
+"""
+import hashlib
+import json
+import time
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from system.decorators import login_required_custom
+
+CLAVE_GENERACION = "jerarquia:generacion"
+PREFIJO_GENERACION_UR = "jerarquia:generacion:ur:"
+PREFIJO_ARBOL_UR = "jerarquia:ur:"
+PREFIJO_CAMPUS = "jerarquia:campus:"
+ROLES_ADMIN = ["admin", "admin_energia", "admin_ambiental"]
+
+
+def _id(valor):
+    """Id en texto de un documento, referencia sin desreferenciar (DBRef) u ObjectId."""
+    if valor is None:
+        return None
+    return str(getattr(valor, "id", valor))
+
+
+def _generacion(clave):
+    generacion = cache.get(clave)
+    if generacion is None:
+        cache.add(clave, 1, timeout=None)
+        generacion = cache.get(clave, 1)
+    return generacion
+
+
+def _incrementar(clave):
+    try:
+        cache.incr(clave)
+    except ValueError:
+        cache.set(clave, 1, timeout=None)
+
+
+def invalidar_jerarquia(ur=None):
+    """Descarta el árbol de una UR, o todos si no se indica UR (cambios en campus o UR)."""
+    ur_id = _id(ur)
+    if ur_id:
+        _incrementar(f"{PREFIJO_GENERACION_UR}{ur_id}")
+    else:
+        _incrementar(CLAVE_GENERACION)
+
+
+def _versionar(datos):
+    contenido = json.dumps(datos, sort_keys=True, ensure_ascii=False)
+    return {
+        **datos,
+        "version": hashlib.sha1(contenido.encode("utf-8")).hexdigest()[:16],
+        "generado": int(time.time()),
+    }
+
+
+def _segundos():
+    return int(getattr(settings, "SIGO_JERARQUIA_CACHE_SEG", 300))
+
+
+# ==================== ÁRBOLES ====================
+
+def construir_arbol_ur(ur_id):
+    """Consulta sin caché del subárbol de una UR; None si no existe."""
+    from system.models import Area, Edificio, Subestacion, UnidadResponsable
+
+    ur = UnidadResponsable.objects(id=ur_id).only("id", "nombre", "campus").no_dereference().first()
+    if ur is None:
+        return None
+
+    edificios = {}
+    for e in Edificio.objects(unidad_responsable=ur.id).only("id", "nombre").order_by("nombre").as_pymongo():
+        edificios[str(e["_id"])] = {"id": str(e["_id"]), "nombre": e.get("nombre", ""), "areas": []}
+
+    areas_sin_edificio = []
+    for a in Area.objects(unidad_responsable=ur.id).only("id", "nombre", "edificio").order_by("nombre").as_pymongo():
+        area = {"id": str(a["_id"]), "nombre": a.get("nombre", "")}
+        edificio = edificios.get(_id(a.get("edificio")))
+        (edificio["areas"] if edificio else areas_sin_edificio).append(area)
+
+    subestaciones = [{
+        "id": str(s["_id"]),
+        "no_medidor": s.get("no_medidor"),
+        "no_servicio": s.get("no_servicio"),
+        "tarifa": s.get("tarifa"),
+        "nombre": f"Medidor: {s.get('no_medidor')} | Servicio: {s.get('no_servicio')} | Tarifa: {s.get('tarifa')}",
+    } for s in Subestacion.objects(unidad_responsable=ur.id).only(
+        "id", "no_medidor", "no_servicio", "tarifa").as_pymongo()]
+
+    return _versionar({
+        "ur": {"id": str(ur.id), "nombre": ur.nombre, "campus": _id(ur.campus)},
+        "edificios": list(edificios.values()),
+        "areas_sin_edificio": areas_sin_edificio,
+        "subestaciones": subestaciones,
+    })
+
+
+def arbol_ur(ur):
+    """Subárbol cacheado de una UR (documento, referencia o id); None si la UR no existe."""
+    ur_id = _id(ur)
+    if not ur_id:
+        return None
+    clave = (f"{PREFIJO_ARBOL_UR}{ur_id}:{_generacion(CLAVE_GENERACION)}:"
+             f"{_generacion(f'{PREFIJO_GENERACION_UR}{ur_id}')}")
+    arbol = cache.get(clave)
+    if arbol is None:
+        arbol = construir_arbol_ur(ur_id)
+        if arbol is None:
+            return None
+        cache.set(clave, arbol, timeout=_segundos())
+    return arbol
+
+
+def arbol_campus():
+    """Campus con sus UR (sin edificios), cacheado hasta el siguiente cambio de campus o UR."""
+    from system.models import Campus, UnidadResponsable
+
+    clave = f"{PREFIJO_CAMPUS}{_generacion(CLAVE_GENERACION)}"
+    arbol = cache.get(clave)
+    if arbol is None:
+        campus = {str(c["_id"]): {"id": str(c["_id"]), "nomenclatura": c.get("nomenclatura", ""), "unidades": []}
+                  for c in Campus.objects.only("id", "nomenclatura").order_by("nomenclatura").as_pymongo()}
+        sin_campus = []
+        for u in UnidadResponsable.objects.only("id", "nombre", "campus").order_by("nombre").as_pymongo():
+            unidad = {"id": str(u["_id"]), "nombre": u.get("nombre", "")}
+            destino = campus.get(_id(u.get("campus")))
+            (destino["unidades"] if destino else sin_campus).append(unidad)
+        arbol = _versionar({"campus": list(campus.values()), "unidades_sin_campus": sin_campus})
+        cache.set(clave, arbol, timeout=_segundos())
+    return arbol
+
+
+def edificios_de_ur(ur):
+    arbol = arbol_ur(ur)
+    return [{"id": e["id"], "nombre": e["nombre"]} for e in arbol["edificios"]] if arbol else []
+
+
+def areas_de_ur(ur):
+    arbol = arbol_ur(ur)
+    if not arbol:
+        return []
+    return [a for e in arbol["edificios"] for a in e["areas"]] + arbol["areas_sin_edificio"]
+
+
+def areas_de_edificio(ur, edificio_id):
+    """Áreas de un edificio de la UR (vacío si el edificio no pertenece a la UR)."""
+    arbol = arbol_ur(ur)
+    if not arbol:
+        return []
+    for edificio in arbol["edificios"]:
+        if edificio["id"] == str(edificio_id):
+            return edificio["areas"]
+    return []
+
+
+# ==================== API ====================
+
+def respuesta_versionada(request, datos):
+    """JsonResponse con ETag/Last-Modified; 304 si el cliente ya tiene esa versión."""
+    etag = f'"{datos["version"]}"'
+    respuesta = get_conditional_response(request, etag=etag, last_modified=datos["generado"])
+    if respuesta is None:
+        respuesta = JsonResponse(datos)
+    respuesta["ETag"] = etag
+    respuesta["Last-Modified"] = http_date(datos["generado"])
+    # Se guarda en el navegador pero siempre se revalida (no se usa never_cache: impediría el 304)
+    respuesta["Cache-Control"] = "private, no-cache"
+    return respuesta
+
+
+@login_required_custom
+def jerarquia_api(request, ur_id=None):
+    """
+    Jerarquía en JSON versionado.
+    - Sin ur_id: campus con sus UR (administradores: todas; demás roles: solo la propia).
+    - Con ur_id: subárbol completo de la UR (edificios → áreas y subestaciones).
+    """
+    from system.views import get_user
+
+    user = get_user(request)
+    if not user:
+        return JsonResponse({"error": "Acceso denegado."}, status=403)
+    es_admin = user.rol in ROLES_ADMIN
+    propia = _id(user.unidad_responsable)
+
+    if ur_id is None:
+        if es_admin:
+            return respuesta_versionada(request, arbol_campus())
+        if not propia:
+            return JsonResponse({"error": "El usuario no tiene unidad responsable."}, status=404)
+        arbol = arbol_campus()
+        campus = [{**c, "unidades": [u for u in c["unidades"] if u["id"] == propia]} for c in arbol["campus"]]
+        return respuesta_versionada(request, _versionar({
+            "campus": [c for c in campus if c["unidades"]],
+            "unidades_sin_campus": [u for u in arbol["unidades_sin_campus"] if u["id"] == propia],
+        }))
+
+    try:
+        ObjectId(ur_id)
+    except (InvalidId, TypeError):
+        return JsonResponse({"error": "ID inválido."}, status=400)
+    if not es_admin and ur_id != propia:
+        return JsonResponse({"error": "Acceso denegado."}, status=403)
+
+    arbol = arbol_ur(ur_id)
+    if arbol is None:
+        return JsonResponse({"error": "UR no encontrada."}, status=404)
+    return respuesta_versionada(request, arbol)
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from system.archivo import archivar_periodo, archivar_periodos_finalizados
+from system.models import PeriodoInventario
+
+
+class Command(BaseCommand):
+    help = ("Mueve los inventarios de los periodos finalizados a las colecciones de archivo por año "
+            "(o los del periodo indicado con --periodo).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--periodo", help="Nombre del periodo (p. ej. PERIODO_003).")
+
+    def handle(self, *args, **options):
+        if options["periodo"]:
+            periodo = PeriodoInventario.objects(nombre=options["periodo"]).first()
+            if not periodo:
+                raise CommandError(f"No existe el periodo {options['periodo']}.")
+            if periodo.status_actual != "Finalizado":
+                raise CommandError(f"El periodo {periodo.nombre} no ha finalizado.")
+            if not periodo.snapshot_generado:
+                raise CommandError(f"Genere primero el snapshot del periodo {periodo.nombre} (snapshot_periodo).")
+            resultados = {periodo.nombre: archivar_periodo(periodo)}
+        else:
+            resultados = archivar_periodos_finalizados()
+
+        if not resultados:
+            self.stdout.write("No hay periodos por archivar.")
+        for nombre, movidos in resultados.items():
+            detalle = ", ".join(f"{coleccion}: {n}" for coleccion, n in movidos.items())
+            self.stdout.write(self.style.SUCCESS(f"{nombre} → {detalle}"))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from system.captcha_pool import generar_pool, purgar_expirados, tamano_pool
+
+
+class Command(BaseCommand):
+    help = ("Purga los captchas vencidos y rellena el pool de captchas pre-generados "
+            "hasta el mínimo indicado.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--minimo", type=int, default=500,
+                            help="Número de retos vigentes que debe tener el pool.")
+        parser.add_argument("--solo-purgar", action="store_true")
+
+    def handle(self, *args, **options):
+        borradas = purgar_expirados()
+        self.stdout.write(f"Imágenes vencidas eliminadas: {borradas}")
+        if options["solo_purgar"]:
+            return
+
+        faltantes = options["minimo"] - tamano_pool()
+        if faltantes > 0:
+            creados = generar_pool(faltantes)
+            self.stdout.write(self.style.SUCCESS(f"Captchas generados: {creados}"))
+        else:
+            self.stdout.write("El pool ya tiene los captchas suficientes.")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from system.tablas import TAMANO_LOTE, completar_busqueda
+
+
+class Command(BaseCommand):
+    help = ("Llena los términos de búsqueda normalizados (campo 'busqueda') de inventarios, "
+            "facturas y áreas guardados antes de que existiera el campo.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Documentos por lote de escritura.")
+
+    def handle(self, *args, **options):
+        resultado = completar_busqueda(tamano_lote=options["lote"])
+        for coleccion, actualizados in resultado.items():
+            self.stdout.write(self.style.SUCCESS(f"{coleccion}: {actualizados} documentos actualizados"))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from system.duplicados import TAMANO_LOTE, detectar_duplicados
+from system.models import PeriodoInventario
+from system.periodos import obtener_periodo_activo
+
+
+class Command(BaseCommand):
+    help = ("Agrupa los registros de inventario con la misma huella (posibles capturas duplicadas) "
+            "en la cola de revisión. Por defecto procesa el periodo activo.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--periodo", help="Nombre del periodo (p. ej. PERIODO_003).")
+        parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Documentos por lote al completar huellas.")
+
+    def handle(self, *args, **options):
+        if options["periodo"]:
+            periodo = PeriodoInventario.objects(nombre=options["periodo"]).first()
+            if not periodo:
+                raise CommandError(f"No existe el periodo {options['periodo']}.")
+        else:
+            periodo = obtener_periodo_activo()
+            if not periodo:
+                raise CommandError("No hay un periodo activo; indique --periodo.")
+
+        resultado = detectar_duplicados(periodo, tamano_lote=options["lote"])
+        for tipo, grupos in resultado.items():
+            self.stdout.write(self.style.SUCCESS(f"{periodo.nombre} · {tipo}: {grupos} grupo(s) con duplicados"))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from system.consumo import FORMULAS, TAMANO_LOTE, normalizar_horas, recalcular_periodo
+from system.models import PeriodoInventario
+from system.periodos import obtener_periodo_activo
+
+
+class Command(BaseCommand):
+    help = ("Recalcula potencia total y consumo mensual de los inventarios de un periodo con la fórmula "
+            "de system/consumo.py. Por defecto procesa el periodo activo.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--periodo", help="Nombre del periodo (p. ej. PERIODO_003).")
+        parser.add_argument("--tipo", action="append", choices=list(FORMULAS),
+                            help="Inventario a recalcular; se puede repetir. Por defecto, todos.")
+        parser.add_argument("--horas", help="Fija estas horas al mes en todos los registros recalculados.")
+        parser.add_argument("--simular", action="store_true", help="Solo cuenta los registros que cambiarían.")
+        parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Documentos por lote de escritura.")
+
+    def handle(self, *args, **options):
+        if options["periodo"]:
+            periodo = PeriodoInventario.objects(nombre=options["periodo"]).first()
+            if not periodo:
+                raise CommandError(f"No existe el periodo {options['periodo']}.")
+        else:
+            periodo = obtener_periodo_activo()
+            if not periodo:
+                raise CommandError("No hay un periodo activo; indique --periodo.")
+        if periodo.archivado:
+            raise CommandError(f"El periodo {periodo.nombre} está archivado; no se recalcula.")
+
+        horas = options["horas"]
+        if horas is not None:
+            valor = normalizar_horas("climatizacion", horas)
+            if valor is None or valor < 0:
+                raise CommandError("--horas debe ser un número mayor o igual a cero.")
+
+        resultado = recalcular_periodo(periodo, tipos=options["tipo"], horas=horas,
+                                       simular=options["simular"], tamano_lote=options["lote"])
+        accion = "cambiarían" if options["simular"] else "actualizados"
+        for tipo, (revisados, modificados) in resultado.items():
+            self.stdout.write(self.style.SUCCESS(
+                f"{periodo.nombre} · {tipo}: {revisados} revisados, {modificados} {accion}"))
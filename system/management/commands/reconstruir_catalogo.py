@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from system.catalogo import TAMANO_LOTE, reconstruir_catalogo
+
+
+class Command(BaseCommand):
+    help = ("Reconstruye el catálogo de equipos (marca/modelo normalizados y valores típicos) "
+            "a partir de los inventarios vigentes de climatización y misceláneos.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Documentos por lote de escritura.")
+
+    def handle(self, *args, **options):
+        resultado = reconstruir_catalogo(tamano_lote=options["lote"])
+        for tipo, equipos in resultado.items():
+            self.stdout.write(self.style.SUCCESS(f"{tipo}: {equipos} equipos en el catálogo"))
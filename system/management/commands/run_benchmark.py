@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment
+
+from system.benchmarks import (
+    BASELINE_POR_DEFECTO, cargar_baseline, comparar_con_baseline, conectar_base_benchmark,
+    ejecutar_escenarios, escenarios_por_defecto, guardar_baseline,
+)
+
+
+class Command(BaseCommand):
+    help = ("Ejecuta las vistas más usadas con el cliente de pruebas y reporta percentiles de latencia, "
+            "comandos de MongoDB y memoria pico contra una línea base.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+        parser.add_argument("--db", default="sigo_benchmark")
+        parser.add_argument("--repeticiones", type=int, default=20)
+        parser.add_argument("--escenario", action="append", dest="escenarios",
+                            help="Ejecuta solo el escenario indicado (se puede repetir).")
+        parser.add_argument("--baseline", default=str(BASELINE_POR_DEFECTO))
+        parser.add_argument("--guardar-baseline", action="store_true",
+                            help="Guarda los resultados como nueva línea base.")
+        parser.add_argument("--tolerancia", type=float, default=0.2,
+                            help="Incremento relativo de latencia permitido antes de marcar regresión.")
+
+    def handle(self, *args, **options):
+        if "bench" not in options["db"] and "test" not in options["db"]:
+            raise CommandError("El nombre de la base debe contener 'bench' o 'test'.")
+
+        conectar_base_benchmark(options["db"], options["mongo_uri"])
+        # Permite el host 'testserver' y usa el backend de correo en memoria
+        setup_test_environment()
+        settings.ALLOWED_HOSTS = list(settings.ALLOWED_HOSTS) + ["testserver"]
+
+        resultados = ejecutar_escenarios(
+            escenarios_por_defecto(),
+            repeticiones=options["repeticiones"],
+            filtro=options["escenarios"],
+        )
+
+        encabezado = f"{'Escenario':36} {'status':>6} {'p50':>9} {'p90':>9} {'p99':>9} {'cmds':>6} {'mem KB':>10}"
+        self.stdout.write(encabezado)
+        self.stdout.write("-" * len(encabezado))
+        for nombre, r in resultados.items():
+            self.stdout.write(
+                f"{nombre:36} {r['status']:>6} {r['p50_ms']:>9} {r['p90_ms']:>9} {r['p99_ms']:>9} "
+                f"{r['comandos_mongo']:>6} {r['memoria_pico_kb']:>10}"
+            )
+
+        if options["guardar_baseline"]:
+            guardar_baseline(resultados, options["baseline"])
+            self.stdout.write(self.style.SUCCESS(f"Línea base guardada en {options['baseline']}"))
+            return
+
+        baseline = cargar_baseline(options["baseline"])
+        if not baseline:
+            self.stdout.write(self.style.WARNING("No hay línea base; usa --guardar-baseline para crearla."))
+            return
+
+        regresiones = comparar_con_baseline(resultados, baseline, options["tolerancia"])
+        if regresiones:
+            for r in regresiones:
+                self.stdout.write(self.style.ERROR(r))
+            raise CommandError(f"{len(regresiones)} regresión(es) respecto a la línea base.")
+        self.stdout.write(self.style.SUCCESS("Sin regresiones respecto a la línea base."))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from system.benchmarks import conectar_base_benchmark, limpiar_datos, sembrar_datos
+
+
+class Command(BaseCommand):
+    help = "Genera datos sintéticos con volúmenes realistas en una base MongoDB local para benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+        parser.add_argument("--db", default="sigo_benchmark",
+                            help="Base de datos destino (debe contener 'bench' o 'test').")
+        parser.add_argument("--limpiar", action="store_true", help="Elimina las colecciones antes de sembrar.")
+        parser.add_argument("--campus", type=int, default=3)
+        parser.add_argument("--urs", type=int, default=20)
+        parser.add_argument("--edificios-por-ur", type=int, default=6)
+        parser.add_argument("--areas-por-edificio", type=int, default=8)
+        parser.add_argument("--subestaciones-por-ur", type=int, default=3)
+        parser.add_argument("--anios", type=int, default=3)
+        parser.add_argument("--registros-por-periodo", type=int, default=3000,
+                            help="Registros por periodo y tipo de inventario.")
+        parser.add_argument("--bitacoras", type=int, default=2000, help="Registros por tipo de bitácora ambiental.")
+        parser.add_argument("--semilla", type=int, default=42)
+
+    def handle(self, *args, **options):
+        # Evita sembrar datos sintéticos en la base de producción por error
+        if "bench" not in options["db"] and "test" not in options["db"]:
+            raise CommandError("El nombre de la base debe contener 'bench' o 'test'.")
+
+        conectar_base_benchmark(options["db"], options["mongo_uri"])
+
+        if options["limpiar"]:
+            limpiar_datos()
+            self.stdout.write("Colecciones eliminadas.")
+
+        sembrar_datos(
+            campus=options["campus"],
+            urs=options["urs"],
+            edificios_por_ur=options["edificios_por_ur"],
+            areas_por_edificio=options["areas_por_edificio"],
+            subestaciones_por_ur=options["subestaciones_por_ur"],
+            anios=options["anios"],
+            registros_por_periodo=options["registros_por_periodo"],
+            bitacoras=options["bitacoras"],
+            semilla=options["semilla"],
+            salida=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Datos de benchmark generados en '{options['db']}'."))
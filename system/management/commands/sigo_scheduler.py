@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from system.scheduler import (
+    NODO, cargar_modulos_tareas, ejecutar_ciclo, ejecutar_pendientes, tareas_registradas,
+)
+
+
+class Command(BaseCommand):
+    help = ("Ejecuta el programador de tareas periódicas de SIGO. Cada tarea toma un lease en MongoDB, "
+            "por lo que varias instancias pueden correr a la vez sin duplicar ejecuciones.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--listar", action="store_true", help="Muestra las tareas registradas y termina.")
+        parser.add_argument("--una-vez", action="store_true",
+                            help="Ejecuta las tareas que corresponden al minuto actual y termina.")
+        parser.add_argument("--tarea", action="append", dest="tareas",
+                            help="Ejecuta la tarea indicada de inmediato (se puede repetir).")
+
+    def handle(self, *args, **options):
+        cargar_modulos_tareas()
+        tareas = tareas_registradas()
+
+        if options["listar"]:
+            for nombre, t in sorted(tareas.items()):
+                self.stdout.write(f"{nombre:28} {t.cron:16} {t.descripcion}")
+            return
+
+        if options["tareas"]:
+            desconocidas = set(options["tareas"]) - set(tareas)
+            if desconocidas:
+                raise CommandError(f"Tareas no registradas: {', '.join(sorted(desconocidas))}")
+            self._reportar(ejecutar_pendientes(forzar=options["tareas"]))
+            return
+
+        if options["una_vez"]:
+            self._reportar(ejecutar_pendientes())
+            return
+
+        self.stdout.write(f"Programador iniciado en {NODO} con {len(tareas)} tareas.")
+        ejecutar_ciclo()
+
+    def _reportar(self, ejecuciones):
+        for e in ejecuciones:
+            estilo = self.style.SUCCESS if e.estado == "ok" else self.style.ERROR
+            self.stdout.write(estilo(f"{e.tarea}: {e.estado} en {e.duracion_ms} ms {e.resultado or ''}"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from system.periodos import sincronizar_estados_periodos
+
+
+class Command(BaseCommand):
+    help = ("Actualiza status/activo de los periodos de inventario según sus fechas "
+            "(Pendiente, Activo, Finalizado) con una actualización masiva por transición.")
+
+    def handle(self, *args, **options):
+        modificados = sincronizar_estados_periodos()
+        for status, total in modificados.items():
+            self.stdout.write(f"{status}: {total}")
+        self.stdout.write(self.style.SUCCESS("Estados de periodos sincronizados."))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from system.historial import generar_snapshot_periodo, generar_snapshots_pendientes
+from system.models import PeriodoInventario
+
+
+class Command(BaseCommand):
+    help = ("Copia los inventarios activos de los periodos terminados a HistorialInventario "
+            "(o del periodo indicado con --periodo).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--periodo", help="Nombre del periodo (p. ej. PERIODO_003).")
+
+    def handle(self, *args, **options):
+        if options["periodo"]:
+            periodo = PeriodoInventario.objects(nombre=options["periodo"]).first()
+            if not periodo:
+                raise CommandError(f"No existe el periodo {options['periodo']}.")
+            resultados = {periodo.nombre: generar_snapshot_periodo(periodo)}
+        else:
+            resultados = generar_snapshots_pendientes()
+
+        if not resultados:
+            self.stdout.write("No hay periodos pendientes de snapshot.")
+        for nombre, insertados in resultados.items():
+            detalle = ", ".join(f"{tipo}: {n}" for tipo, n in insertados.items())
+            self.stdout.write(self.style.SUCCESS(f"{nombre} → {detalle}"))
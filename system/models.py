@@ -1,13 +1,13 @@
 from datetime import datetime, timedelta
 import secrets
-import bcrypt
 from mongoengine import (
     Document, StringField, EmailField, BooleanField, DateTimeField,
     ReferenceField, IntField, DecimalField, DictField,
-    FileField, ObjectIdField
+    FileField, ObjectIdField, ListField, FloatField
 )
 from mongoengine import DENY, ValidationError
-from datetime import date
+
+from .hashing import hashear_password, verificar_password
 
 ######################################################################################
 ######################################################################################
@@ -15,11 +15,62 @@ from datetime import date
 
 # ==================== MODELOS DE GESTIÓN ENERGÉTICA ====================
 
-class Campus(Document):
+class InvalidaJerarquia:
+    """
+    Guardar o eliminar descarta la jerarquía cacheada (system/jerarquia.py).
+    Campus y UR invalidan todos los árboles; los demás, solo el de su UR
+    (o todos si el documento cambió de UR).
+    """
+    jerarquia_global = False
+
+    def _invalidar_jerarquia(self, todo=False):
+        from .jerarquia import invalidar_jerarquia
+        if todo or self.jerarquia_global:
+            invalidar_jerarquia()
+        else:
+            invalidar_jerarquia(self._data.get('unidad_responsable'))
+
+    def save(self, *args, **kwargs):
+        movido = bool(self.pk) and not self.jerarquia_global and 'unidad_responsable' in self._get_changed_fields()
+        resultado = super().save(*args, **kwargs)
+        self._invalidar_jerarquia(todo=movido)
+        return resultado
+
+    def delete(self, *args, **kwargs):
+        super().delete(*args, **kwargs)
+        self._invalidar_jerarquia()
+
+class ProtegidoPorArchivo:
+    """
+    ``reverse_delete_rule=DENY`` solo revisa las colecciones vivas; los inventarios archivados
+    (system/archivo.py) también guardan referencias a UR, edificio y área, así que antes de
+    borrar se buscan en las colecciones de archivo y se rechaza igual que DENY.
+    """
+    campo_archivo = None
+
+    def delete(self, *args, **kwargs):
+        from .archivo import verificar_sin_referencias_archivadas
+        verificar_sin_referencias_archivadas(self, self.campo_archivo)
+        super().delete(*args, **kwargs)
+
+class TerminosBusqueda:
+    """
+    Al guardar llena ``busqueda`` con los términos normalizados de ``campos_texto``
+    (system/catalogo.py); las tablas del servidor buscan ahí por prefijo con índice.
+    """
+    campos_texto = []
+
+    def save(self, *args, **kwargs):
+        from .catalogo import terminos_busqueda
+        self.busqueda = terminos_busqueda(*(getattr(self, campo, None) for campo in self.campos_texto))
+        return super().save(*args, **kwargs)
+
+class Campus(InvalidaJerarquia, Document):
     nomenclatura = StringField(required=True)
     ubicacion = StringField()
     metros_cuadrados = DecimalField(precision=2, force_string=True)
     fecha_registro = DateTimeField(default=datetime.now)
+    jerarquia_global = True
 
     meta = {
         'indexes': ['nomenclatura']
@@ -28,11 +79,13 @@ class Campus(Document):
     def __str__(self):
         return self.nomenclatura
 
-class UnidadResponsable(Document):
+class UnidadResponsable(ProtegidoPorArchivo, InvalidaJerarquia, Document):
     nombre = StringField(required=True)
     total_personas = IntField()
     campus = ReferenceField(Campus, reverse_delete_rule=DENY)
     diagrama_unifilar = FileField(required=True)#Implementación en futura actualización
+    jerarquia_global = True
+    campo_archivo = 'unidad_responsable'
 
     meta = {
         'indexes': ['nombre', 'campus']
@@ -57,7 +110,12 @@ class Usuario(Document):
     meta = {
         'collection': 'usuarios',
         'ordering': ['-fecha_alta'],
-        'indexes': ['email', 'unidad_responsable', 'rol']
+        'indexes': [
+            'email', 'unidad_responsable', 'rol',
+            # Búsqueda global (system/busqueda.py)
+            {'fields': ['$nombres', '$apellidos', '$email'], 'default_language': 'spanish',
+             'weights': {'email': 3, 'nombres': 2, 'apellidos': 2}},
+        ]
     }
 
     def deactivate(self):
@@ -67,17 +125,18 @@ class Usuario(Document):
     
     @classmethod
     def hash_password(cls, plain):
-        return bcrypt.hashpw(plain.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        return hashear_password(plain)
 
     def generate_password(self):
         random_password = secrets.token_urlsafe(10)
-        self.password = bcrypt.hashpw(random_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        self.password = hashear_password(random_password)
         self.save()
         # Aquí se puede agregar lógica de envío de correo
         return random_password
 
     def check_password(self, password):
-        return bcrypt.checkpw(password.encode('utf-8'), self.password.encode('utf-8'))
+        # Puede lanzar hashing.BcryptSaturado si el pool de bcrypt está lleno
+        return verificar_password(password, self.password)
 
     def __str__(self):
         return f"{self.nombres} {self.apellidos} ({self.email})"
@@ -98,20 +157,38 @@ class Usuario(Document):
             return datetime.now() < self.bloqueado_hasta
         return False
 
+    MAX_INTENTOS = 3
+    DURACION_BLOQUEO = timedelta(hours=2)
+
     def registrar_fallo_login(self):
-        self.intentos_fallidos += 1
-        if self.intentos_fallidos >= 3:
-            self.bloqueado_hasta = datetime.now() + timedelta(hours=2)
-            self.save()
+        """
+        Suma un intento fallido con $inc atómico (sin reescribir el documento).
+        Solo la petición que alcanza MAX_INTENTOS fija el bloqueo y envía el correo.
+        """
+        ahora = datetime.now()
+        # Un bloqueo ya vencido reinicia el conteo antes de sumar este intento
+        Usuario.objects(id=self.id, bloqueado_hasta__lte=ahora).update_one(
+            set__intentos_fallidos=0, unset__bloqueado_hasta=True
+        )
+        actualizado = Usuario.objects(id=self.id).only('intentos_fallidos').modify(
+            inc__intentos_fallidos=1, new=True
+        )
+        if actualizado is None:
+            return
+        self.intentos_fallidos = actualizado.intentos_fallidos
+        if self.intentos_fallidos == self.MAX_INTENTOS:
+            self.bloqueado_hasta = ahora + self.DURACION_BLOQUEO
+            Usuario.objects(id=self.id).update_one(set__bloqueado_hasta=self.bloqueado_hasta)
             from .views import enviar_correo_bloqueo  # importa la función donde esté
             enviar_correo_bloqueo(self)
-        else:
-            self.save()
 
     def resetear_intentos(self):
+        # Solo escribe si hay algo que limpiar
+        if not self.intentos_fallidos and not self.bloqueado_hasta:
+            return
+        Usuario.objects(id=self.id).update_one(set__intentos_fallidos=0, unset__bloqueado_hasta=True)
         self.intentos_fallidos = 0
         self.bloqueado_hasta = None
-        self.save()
 
 class PasswordResetCode(Document):
     usuario = ReferenceField(Usuario, required=True)
@@ -120,19 +197,45 @@ class PasswordResetCode(Document):
     expiracion = DateTimeField(default=lambda: datetime.utcnow() + timedelta(minutes=15))
     usado = BooleanField(default=False)
 
-    meta = {'collection': 'password_reset_codes'}
+    meta = {
+        'collection': 'password_reset_codes',
+        'indexes': [
+            # MongoDB elimina el código en cuanto vence (expiracion debe guardarse en UTC)
+            {'fields': ['expiracion'], 'expireAfterSeconds': 0},
+            # Búsqueda de verificación: igualdades primero y el rango de expiración al final
+            ('usuario', 'codigo', 'usado', 'expiracion'),
+        ]
+    }
 
-class Edificio(Document):
+    @classmethod
+    def consumir(cls, usuario, codigo):
+        """
+        Busca un código vigente y sin usar y lo marca como usado en una sola operación
+        atómica (findAndModify). Devuelve el documento o None si no es válido.
+        """
+        return cls.objects(
+            usuario=usuario,
+            codigo=codigo,
+            usado=False,
+            expiracion__gte=datetime.utcnow()
+        ).modify(set__usado=True, new=True)
+
+class Edificio(ProtegidoPorArchivo, InvalidaJerarquia, Document):
     nombre = StringField(required=True)
     responsable_alta = StringField()
     unidad_responsable = ReferenceField(UnidadResponsable, reverse_delete_rule=DENY)
     fecha_registro = DateTimeField(default=datetime.now)
+    campo_archivo = 'edificio'
 
     meta = {
-        'indexes': ['nombre', 'unidad_responsable']
+        'indexes': [
+            'nombre', 'unidad_responsable',
+            # Búsqueda global (system/busqueda.py)
+            {'fields': ['$nombre'], 'default_language': 'spanish'},
+        ]
     }
 
-class Area(Document):
+class Area(ProtegidoPorArchivo, TerminosBusqueda, InvalidaJerarquia, Document):
     nombre = StringField(required=True)
     unidad_responsable = ReferenceField(UnidadResponsable, reverse_delete_rule=DENY)
     edificio = ReferenceField(Edificio)
@@ -141,12 +244,21 @@ class Area(Document):
     telefono = StringField()
     cargo = StringField()
     grado_estudio = StringField()
+    busqueda = ListField(StringField())  # Nombre normalizado (system/tablas.py)
+    campo_archivo = 'area'
+    campos_texto = ['nombre']
 
     meta = {
-        'indexes': ['nombre', 'unidad_responsable']
+        'indexes': [
+            'nombre', 'unidad_responsable',
+            # Búsqueda global (system/busqueda.py)
+            {'fields': ['$nombre'], 'default_language': 'spanish'},
+            # Búsqueda por prefijo de las tablas del servidor (system/tablas.py)
+            'busqueda',
+        ]
     }
 
-class Subestacion(Document):
+class Subestacion(InvalidaJerarquia, Document):
     unidad_responsable = ReferenceField(UnidadResponsable, reverse_delete_rule=DENY)
     no_servicio = IntField()
     no_medidor = StringField()
@@ -154,7 +266,11 @@ class Subestacion(Document):
     multiplicador = DecimalField(precision=2, force_string=True)
 
     meta = {
-        'indexes': ['unidad_responsable']
+        'indexes': [
+            'unidad_responsable', 'no_servicio',
+            # Búsqueda global (system/busqueda.py); no_servicio es numérico y se busca por igualdad
+            {'fields': ['$no_medidor'], 'default_language': 'none'},
+        ]
     }
 
 NIVELES = (
@@ -171,6 +287,8 @@ class PeriodoInventario(Document):
     persona_autoriza = StringField()
     rol = StringField()
     activo = BooleanField(default=True)
+    snapshot_generado = DateTimeField(null=True)  # Cierre copiado a HistorialInventario
+    archivado = BooleanField(default=False)  # Inventarios movidos a las colecciones de archivo (system/archivo.py)
 
     meta = {
         'indexes': [
@@ -197,7 +315,18 @@ class PeriodoInventario(Document):
 
         if query:
             raise ValidationError("El periodo de inventario se solapa con otro existente.")
-        
+
+    def save(self, *args, **kwargs):
+        resultado = super().save(*args, **kwargs)
+        from .periodos import invalidar_periodo_activo
+        invalidar_periodo_activo()
+        return resultado
+
+    def delete(self, *args, **kwargs):
+        super().delete(*args, **kwargs)
+        from .periodos import invalidar_periodo_activo
+        invalidar_periodo_activo()
+
     @property
     def status_actual(self):
         """
@@ -205,17 +334,10 @@ class PeriodoInventario(Document):
         - 'Pendiente' si aún no comienza.
         - 'Activo' si está dentro del rango.
         - 'Finalizado' si ya terminó.
+        Se calcula al consultar; el campo status lo actualiza sincronizar_estados_periodos().
         """
-        hoy = date.today()
-        fecha_inicio = self.fecha_inicio.date() if hasattr(self.fecha_inicio, 'date') else self.fecha_inicio
-        fecha_fin = self.fecha_fin.date() if hasattr(self.fecha_fin, 'date') else self.fecha_fin
-
-        if hoy < fecha_inicio:
-            return "Pendiente"
-        elif fecha_inicio <= hoy <= fecha_fin:
-            return "Activo"
-        else:
-            return "Finalizado"
+        from .periodos import calcular_status
+        return calcular_status(self.fecha_inicio, self.fecha_fin)
 
 class HistorialInventario(Document):
     periodo = ReferenceField(PeriodoInventario, reverse_delete_rule=DENY)
@@ -224,7 +346,64 @@ class HistorialInventario(Document):
     datos = DictField()
     fecha_registro = DateTimeField(default=datetime.utcnow)
 
-class InventarioClimatizacion(Document):
+    meta = {
+        'indexes': [
+            # Un registro por inventario y periodo; permite repetir el snapshot sin duplicar
+            {'fields': ['periodo', 'tipo', 'inventario_id'], 'unique': True},
+            ('periodo', 'tipo', 'datos.unidad_responsable'),
+        ]
+    }
+
+class PeriodoArchivado(ValidationError):
+    """El registro pertenece a un periodo archivado (system/archivo.py): ya no se modifica."""
+
+class PeriodoEditable:
+    """
+    Rechaza guardar registros de un periodo archivado: el archivo es la copia vigente y un
+    ``save()`` sobre la colección viva la dejaría desactualizada (o reviviría el registro).
+    Va primero en la herencia para que nada se calcule ni se encole si se rechaza.
+    """
+
+    def save(self, *args, **kwargs):
+        periodo = self._data.get('periodo')
+        periodo_id = getattr(periodo, 'id', periodo)
+        if periodo_id and PeriodoInventario._get_collection().find_one(
+                {'_id': periodo_id, 'archivado': True}, {'_id': 1}) is not None:
+            raise PeriodoArchivado("El periodo de este registro está archivado y ya no admite cambios.")
+        return super().save(*args, **kwargs)
+
+class HuellaInventario:
+    """
+    Al guardar calcula la ``huella`` del registro (system/duplicados.py) y, si otro registro
+    vigente del periodo tiene la misma, lo manda a revisión y deja ``posible_duplicado``.
+    """
+    tipo_inventario = None
+    posible_duplicado = False
+
+    def save(self, *args, **kwargs):
+        from .duplicados import huella_de, registrar_en_revision
+        self.huella = huella_de(self.tipo_inventario, self)
+        resultado = super().save(*args, **kwargs)
+        self.posible_duplicado = registrar_en_revision(self.tipo_inventario, self)
+        return resultado
+
+class ClaveEquipoInventario:
+    """Al guardar calcula ``clave_equipo`` (marca/modelo normalizados, system/catalogo.py)."""
+
+    def save(self, *args, **kwargs):
+        from .catalogo import clave_equipo
+        self.clave_equipo = clave_equipo(self.tipo_inventario, self.marca, self.modelo)
+        return super().save(*args, **kwargs)
+
+class ConsumoInventario:
+    """Al guardar recalcula potencia total y consumo mensual (system/consumo.py)."""
+
+    def save(self, *args, **kwargs):
+        from .consumo import aplicar_consumo
+        aplicar_consumo(self.tipo_inventario, self)
+        return super().save(*args, **kwargs)
+
+class InventarioClimatizacion(PeriodoEditable, HuellaInventario, TerminosBusqueda, ClaveEquipoInventario, ConsumoInventario, Document):
     unidad_responsable = ReferenceField(UnidadResponsable, reverse_delete_rule=DENY)
     edificio = ReferenceField(Edificio, reverse_delete_rule=DENY)
     nivel = StringField(choices=NIVELES)
@@ -249,8 +428,36 @@ class InventarioClimatizacion(Document):
     fecha_reactivacion = DateTimeField(null=True)
     dado_baja_por = ReferenceField(Usuario, required=False, null=True)
     reactivado_por = ReferenceField(Usuario, required=False, null=True)
+    origen_id = ObjectIdField(null=True)  # Registro del periodo anterior del que se arrastró
+    clave_equipo = StringField(null=True)  # tipo|MARCA|MODELO normalizados (CatalogoEquipo.clave)
+    huella = StringField(null=True)  # UR, periodo, ubicación y equipo normalizados (system/duplicados.py)
+    busqueda = ListField(StringField())  # Términos normalizados de campos_texto (system/tablas.py)
+    tipo_inventario = "climatizacion"
+    campos_texto = ['marca', 'modelo', 'tipo_clima']
+
+    meta = {
+        'indexes': [
+            ('periodo', 'activo'),
+            # Detección de duplicados por periodo (system/duplicados.py)
+            ('periodo', 'huella'),
+            # Búsqueda global (system/busqueda.py)
+            {'fields': ['$marca', '$modelo', '$tipo_clima'], 'default_language': 'spanish'},
+            # Agrupación por equipo del catálogo (system/catalogo.py)
+            ('clave_equipo', 'periodo'),
+            # Búsqueda por prefijo de las tablas del servidor (system/tablas.py)
+            'busqueda',
+            # Tablas del servidor (system/tablas.py): filtro por UR/periodo y orden por fecha
+            ('unidad_responsable', 'periodo', '-fecha_registro'),
+            ('-fecha_registro', '-id'),
+            {'fields': ['periodo', 'origen_id'], 'unique': True,
+             'partialFilterExpression': {'origen_id': {'$type': 'objectId'}}},
+            # Solo los registros dados de baja: listado paginado por (fecha_baja, _id)
+            {'fields': ['activo', '-fecha_baja', '-id'],
+             'partialFilterExpression': {'activo': False}},
+        ]
+    }
 
-class InventarioLuminarias(Document):
+class InventarioLuminarias(PeriodoEditable, HuellaInventario, TerminosBusqueda, ConsumoInventario, Document):
     unidad_responsable = ReferenceField(UnidadResponsable, reverse_delete_rule=DENY)
     edificio = ReferenceField(Edificio, reverse_delete_rule=DENY)
     nivel = StringField(choices=NIVELES)
@@ -272,8 +479,33 @@ class InventarioLuminarias(Document):
     fecha_reactivacion = DateTimeField(null=True)
     dado_baja_por = ReferenceField(Usuario, required=False, null=True)
     reactivado_por = ReferenceField(Usuario, required=False, null=True)
+    origen_id = ObjectIdField(null=True)  # Registro del periodo anterior del que se arrastró
+    huella = StringField(null=True)  # UR, periodo, ubicación y equipo normalizados (system/duplicados.py)
+    busqueda = ListField(StringField())  # Términos normalizados de campos_texto (system/tablas.py)
+    tipo_inventario = "luminarias"
+    campos_texto = ['tipo_lampara']
 
-class InventarioMiscelaneos(Document):
+    meta = {
+        'indexes': [
+            ('periodo', 'activo'),
+            # Detección de duplicados por periodo (system/duplicados.py)
+            ('periodo', 'huella'),
+            # Búsqueda global (system/busqueda.py)
+            {'fields': ['$tipo_lampara'], 'default_language': 'spanish'},
+            # Búsqueda por prefijo de las tablas del servidor (system/tablas.py)
+            'busqueda',
+            # Tablas del servidor (system/tablas.py): filtro por UR/periodo y orden por fecha
+            ('unidad_responsable', 'periodo', '-fecha_registro'),
+            ('-fecha_registro', '-id'),
+            {'fields': ['periodo', 'origen_id'], 'unique': True,
+             'partialFilterExpression': {'origen_id': {'$type': 'objectId'}}},
+            # Solo los registros dados de baja: listado paginado por (fecha_baja, _id)
+            {'fields': ['activo', '-fecha_baja', '-id'],
+             'partialFilterExpression': {'activo': False}},
+        ]
+    }
+
+class InventarioMiscelaneos(PeriodoEditable, HuellaInventario, TerminosBusqueda, ClaveEquipoInventario, ConsumoInventario, Document):
     unidad_responsable = ReferenceField(UnidadResponsable, reverse_delete_rule=DENY)
     edificio = ReferenceField(Edificio, reverse_delete_rule=DENY)
     nivel = StringField(choices=NIVELES)
@@ -297,6 +529,96 @@ class InventarioMiscelaneos(Document):
     fecha_reactivacion = DateTimeField(null=True)
     dado_baja_por = ReferenceField(Usuario, required=False, null=True)
     reactivado_por = ReferenceField(Usuario, required=False, null=True)
+    origen_id = ObjectIdField(null=True)  # Registro del periodo anterior del que se arrastró
+    clave_equipo = StringField(null=True)  # tipo|MARCA|MODELO normalizados (CatalogoEquipo.clave)
+    huella = StringField(null=True)  # UR, periodo, ubicación y equipo normalizados (system/duplicados.py)
+    busqueda = ListField(StringField())  # Términos normalizados de campos_texto (system/tablas.py)
+    tipo_inventario = "miscelaneos"
+    campos_texto = ['marca', 'modelo', 'miscelaneos']
+
+    meta = {
+        'indexes': [
+            ('periodo', 'activo'),
+            # Detección de duplicados por periodo (system/duplicados.py)
+            ('periodo', 'huella'),
+            # Búsqueda global (system/busqueda.py)
+            {'fields': ['$marca', '$modelo', '$miscelaneos'], 'default_language': 'spanish'},
+            # Agrupación por equipo del catálogo (system/catalogo.py)
+            ('clave_equipo', 'periodo'),
+            # Búsqueda por prefijo de las tablas del servidor (system/tablas.py)
+            'busqueda',
+            # Tablas del servidor (system/tablas.py): filtro por UR/periodo y orden por fecha
+            ('unidad_responsable', 'periodo', '-fecha_registro'),
+            ('-fecha_registro', '-id'),
+            {'fields': ['periodo', 'origen_id'], 'unique': True,
+             'partialFilterExpression': {'origen_id': {'$type': 'objectId'}}},
+            # Solo los registros dados de baja: listado paginado por (fecha_baja, _id)
+            {'fields': ['activo', '-fecha_baja', '-id'],
+             'partialFilterExpression': {'activo': False}},
+        ]
+    }
+
+class OperacionMasivaInventario(Document):
+    """Bitácora de bajas y restauraciones masivas: un documento por lote aplicado."""
+    tipo = StringField(choices=["Climatización", "Luminarias", "Misceláneos"], required=True)
+    accion = StringField(choices=["baja", "restauracion"], required=True)
+    usuario = ReferenceField(Usuario, required=False, null=True)
+    fecha = DateTimeField(default=datetime.now)
+    criterio = DictField()  # Registros seleccionados o filtros (UR, edificio, área, periodo)
+    registros = ListField(ObjectIdField())
+    total = IntField(default=0)
+
+    meta = {
+        'collection': 'inventario_operaciones_masivas',
+        'indexes': [('tipo', '-fecha')]
+    }
+
+class CatalogoEquipo(Document):
+    """Equipo de referencia deducido de los inventarios: una entrada por marca/modelo normalizados."""
+    tipo = StringField(choices=["climatizacion", "miscelaneos"], required=True)
+    clave = StringField(required=True)  # tipo|MARCA|MODELO, igual a clave_equipo de los inventarios
+    marca = StringField()               # Escritura más frecuente en los inventarios
+    modelo = StringField()
+    marca_norm = StringField()
+    modelo_norm = StringField()
+    texto_norm = StringField()          # marca_norm + modelo_norm, para buscar por prefijo
+    tipo_equipo = StringField()         # tipo_clima o dispositivo misceláneo más frecuente
+    capacidad = IntField(null=True)
+    voltaje = DecimalField(precision=2, force_string=True, null=True)
+    amperaje = DecimalField(precision=4, force_string=True, null=True)
+    potencia = DecimalField(precision=2, force_string=True, null=True)
+    registros = IntField(default=0)
+    actualizado = DateTimeField(default=datetime.now)
+
+    meta = {
+        'collection': 'catalogo_equipos',
+        'indexes': [
+            {'fields': ['clave'], 'unique': True},
+            ('tipo', 'texto_norm'),
+            ('tipo', 'modelo_norm'),
+            ('tipo', 'actualizado'),
+        ]
+    }
+
+class DuplicadoInventario(Document):
+    """Cola de revisión: registros vigentes de un periodo que comparten la misma huella."""
+    tipo = StringField(choices=["climatizacion", "luminarias", "miscelaneos"], required=True)
+    huella = StringField(required=True)
+    periodo = ReferenceField(PeriodoInventario, reverse_delete_rule=DENY)
+    unidad_responsable = ReferenceField(UnidadResponsable, reverse_delete_rule=DENY)
+    registros = ListField(ObjectIdField())
+    estado = StringField(choices=["pendiente", "descartado", "resuelto"], default="pendiente")
+    detectado = DateTimeField(default=datetime.now)
+    revisado_por = ReferenceField(Usuario, required=False, null=True)
+    fecha_revision = DateTimeField(null=True)
+
+    meta = {
+        'collection': 'inventario_duplicados',
+        'indexes': [
+            {'fields': ['tipo', 'huella'], 'unique': True},
+            ('estado', 'periodo', '-detectado'),
+        ]
+    }
 
 class Tarifas(Document):
     nombre = StringField(required=True, max_length=255)
@@ -306,11 +628,30 @@ class Tarifas(Document):
     def __str__(self):
         return f"{self.nombre} - {self.tarifa}"
 
-class FacturaEnergeticaTriple(Document):
+class MesFactura:
+    """
+    Al guardar calcula ``mes`` a partir del texto de ``periodo``; guardar o eliminar
+    descarta las conciliaciones cacheadas (system/conciliacion.py).
+    """
+
+    def save(self, *args, **kwargs):
+        from .conciliacion import invalidar_conciliacion, mes_de_periodo
+        self.mes = mes_de_periodo(self.periodo)
+        resultado = super().save(*args, **kwargs)
+        invalidar_conciliacion()
+        return resultado
+
+    def delete(self, *args, **kwargs):
+        from .conciliacion import invalidar_conciliacion
+        super().delete(*args, **kwargs)
+        invalidar_conciliacion()
+
+class FacturaEnergeticaTriple(MesFactura, TerminosBusqueda, Document):
     tipo_tarifa = StringField(choices=["GDMTH", "GDMTO", "GDBT"])
     subestacion = ReferenceField(Subestacion, reverse_delete_rule=DENY)
     dias_periodo = IntField() 
     periodo = StringField()
+    mes = DateTimeField(null=True)  # Mes en que termina el periodo facturado (system/conciliacion.py)
     consumo = DecimalField(precision=2, force_string=True)
     demanda_maxima = IntField()
     factor_potencia = DecimalField(precision=2, force_string=True)
@@ -329,16 +670,28 @@ class FacturaEnergeticaTriple(Document):
     status = StringField(choices=["Pagada", "No pagada"], default="No pagada")
     actualizado_por = ReferenceField(Usuario, required=False, default=None)
     ultima_actualizacion = DateTimeField()
+    busqueda = ListField(StringField())  # Términos normalizados de campos_texto (system/tablas.py)
+    campos_texto = ['periodo', 'tipo_tarifa']
 
     meta = {
-        'indexes': ['subestacion', 'status', 'tipo_tarifa', 'creado_por']
+        'indexes': [
+            'subestacion', 'status', 'tipo_tarifa', 'creado_por',
+            # Búsqueda global (system/busqueda.py)
+            {'fields': ['$periodo'], 'default_language': 'spanish'},
+            # Conciliación facturado vs. inventario por mes (system/conciliacion.py)
+            ('mes', 'subestacion'),
+            # Tablas del servidor (system/tablas.py)
+            'busqueda',
+            ('-fecha_registro', '-id'),
+        ]
     }
 
-class FacturaPdbt(Document):
+class FacturaPdbt(MesFactura, TerminosBusqueda, Document):
     tipo_tarifa = StringField(choices=["PDBT"], default="PDBT")
     subestacion = ReferenceField(Subestacion, reverse_delete_rule=DENY)
     dias_periodo = IntField() 
     periodo = StringField()
+    mes = DateTimeField(null=True)  # Mes en que termina el periodo facturado (system/conciliacion.py)
     consumo = DecimalField(precision=2, force_string=True)
     cargo_energia = DecimalField(precision=2, force_string=True)
     importe_demanda_maxima = DecimalField(precision=2, force_string=True)
@@ -352,9 +705,20 @@ class FacturaPdbt(Document):
     fecha_vencimiento = DateTimeField()
     actualizado_por = ReferenceField(Usuario, required=False, default=None)
     ultima_actualizacion = DateTimeField()
+    busqueda = ListField(StringField())  # Términos normalizados de campos_texto (system/tablas.py)
+    campos_texto = ['periodo', 'tipo_tarifa']
 
     meta = {
-        'indexes': ['subestacion', 'status', 'tipo_tarifa', 'creado_por']
+        'indexes': [
+            'subestacion', 'status', 'tipo_tarifa', 'creado_por',
+            # Búsqueda global (system/busqueda.py)
+            {'fields': ['$periodo'], 'default_language': 'spanish'},
+            # Conciliación facturado vs. inventario por mes (system/conciliacion.py)
+            ('mes', 'subestacion'),
+            # Tablas del servidor (system/tablas.py)
+            'busqueda',
+            ('-fecha_registro', '-id'),
+        ]
     }
 
 class Medidores(Document):
@@ -520,4 +884,81 @@ class CentroAcopioRRR(Document):
         'indexes': [
             {'fields': ['unidad_responsable'], 'unique': False}
         ]
-    }
\ No newline at end of file
+    }
+
+
+######################################################################################
+######################################################################################
+######################################################################################
+
+# ==================== MODELOS DE DIAGNÓSTICO ====================
+
+class PerfilSolicitud(Document):
+    ruta = StringField(required=True)
+    metodo = StringField()
+    vista = StringField()
+    usuario_id = StringField()
+    email = StringField()
+    modo = StringField(choices=["muestreo", "cprofile"], default="muestreo")
+    status_code = IntField()
+    duracion_ms = FloatField()
+    total_comandos = IntField(default=0)
+    duracion_mongo_ms = FloatField(default=0)
+    comandos = ListField(DictField())
+    pilas = ListField(DictField())
+    funciones = ListField(DictField())
+    fecha_registro = DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'collection': 'perfiles_solicitud',
+        'ordering': ['-fecha_registro'],
+        'indexes': [
+            # Los perfiles se eliminan automáticamente después de 7 días
+            {'fields': ['fecha_registro'], 'expireAfterSeconds': 7 * 24 * 3600}
+        ]
+    }
+
+
+# ==================== MODELOS DE SISTEMA ====================
+
+class SesionDjango(Document):
+    session_key = StringField(primary_key=True, max_length=40)
+    session_data = StringField(required=True)
+    expire_date = DateTimeField(required=True)
+
+    meta = {
+        'collection': 'django_sesiones',
+        'indexes': [
+            # MongoDB elimina la sesión en cuanto vence expire_date
+            {'fields': ['expire_date'], 'expireAfterSeconds': 0}
+        ]
+    }
+
+class BloqueoTarea(Document):
+    # Lease de una tarea programada: solo el nodo propietario la ejecuta hasta 'expira'
+    tarea = StringField(primary_key=True)
+    propietario = StringField()
+    expira = DateTimeField()
+    ultimo_minuto = StringField()  # Minuto programado ya tomado (YYYY-mm-ddTHH:MM)
+
+    meta = {'collection': 'tareas_bloqueos'}
+
+class EjecucionTarea(Document):
+    tarea = StringField(required=True)
+    nodo = StringField()
+    inicio = DateTimeField(required=True)
+    fin = DateTimeField()
+    duracion_ms = FloatField()
+    estado = StringField(choices=["ok", "error"], default="ok")
+    resultado = StringField()
+    error = StringField()
+
+    meta = {
+        'collection': 'tareas_ejecuciones',
+        'ordering': ['-inicio'],
+        'indexes': [
+            ('tarea', '-inicio'),
+            # El historial de ejecuciones se conserva 30 días
+            {'fields': ['inicio'], 'expireAfterSeconds': 30 * 24 * 3600}
+        ]
+    }
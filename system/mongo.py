@@ -0,0 +1,149 @@
+# system/mongo.py
+"""
+Conexión a MongoDB perezosa, por proceso y segura ante ``fork``.
+
+- ``configurar_mongo()`` solo registra la conexión (``register_connection``); el ``MongoClient``
+  se crea en la primera consulta, así los comandos de gestión que no usan MongoDB no pagan
+  la conexión.
+- Si el proceso se bifurca (gunicorn/uWSGI con precarga) el hijo descarta el cliente heredado
+  y crea el suyo en la primera consulta.
+- El pool, los tiempos de espera, la compresión y la preferencia de lectura se leen de
+  ``settings.MONGODB_SETTINGS`` (variables de entorno ``MONGO_*``).
+- El alias ``lecturas`` (``settings.MONGODB_LECTURAS``) usa su propio pool con preferencia
+  ``secondaryPreferred`` y desfase máximo acotado; ``para_lectura()`` dirige a él las consultas
+  de exportaciones, tableros e historiales para no competir con las capturas en el primario.
+"""
+import os
+import threading
+
+from django.conf import settings
+from mongoengine import connection as me_connection
+from mongoengine import register_connection
+from mongoengine.base.common import _document_registry
+from mongoengine.connection import DEFAULT_CONNECTION_NAME, get_db
+from pymongo import monitoring
+from pymongo.read_preferences import (
+    Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred,
+)
+
+PREFERENCIAS_LECTURA = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+ALIAS_LECTURAS = "lecturas"
+# Mínimo que acepta el servidor para maxStalenessSeconds (heartbeat + 80 s de margen)
+MIN_MAX_STALENESS = 90
+
+_lock = threading.Lock()
+_configurado = False
+
+
+def preferencia_lectura(nombre, max_staleness=None):
+    """Convierte el nombre de una preferencia de lectura en el objeto de pymongo."""
+    if nombre not in PREFERENCIAS_LECTURA:
+        raise ValueError(f"Preferencia de lectura no válida: {nombre}")
+    clase = PREFERENCIAS_LECTURA[nombre]
+    if clase is Primary or max_staleness in (None, ""):
+        return clase()
+    # Las variables de entorno llegan como texto
+    try:
+        max_staleness = int(max_staleness)
+    except (TypeError, ValueError):
+        raise ValueError(f"max_staleness_seconds debe ser un entero: {max_staleness!r}") from None
+    if max_staleness < MIN_MAX_STALENESS:
+        raise ValueError(
+            f"max_staleness_seconds debe ser al menos {MIN_MAX_STALENESS} segundos: {max_staleness}"
+        )
+    return clase(max_staleness=max_staleness)
+
+
+def opciones_cliente(config):
+    """Opciones de ``MongoClient`` a partir de un dict de configuración; omite las no definidas."""
+    opciones = {}
+    for clave, opcion in (
+        ("max_pool_size", "maxPoolSize"),
+        ("min_pool_size", "minPoolSize"),
+        ("max_idle_time_ms", "maxIdleTimeMS"),
+        ("server_selection_timeout_ms", "serverSelectionTimeoutMS"),
+        ("socket_timeout_ms", "socketTimeoutMS"),
+        ("connect_timeout_ms", "connectTimeoutMS"),
+    ):
+        if config.get(clave) is not None:
+            opciones[opcion] = int(config[clave])
+    if config.get("compressors"):
+        # zstd y snappy requieren los paquetes zstandard / python-snappy; zlib viene con Python
+        opciones["compressors"] = config["compressors"]
+    if config.get("read_preference"):
+        opciones["read_preference"] = preferencia_lectura(
+            config["read_preference"], config.get("max_staleness_seconds")
+        )
+    return opciones
+
+
+def _descartar_clientes():
+    """En el proceso hijo olvida los clientes heredados sin cerrarlos (los sockets son del padre)."""
+    for alias in list(me_connection._connections):
+        me_connection._connections.pop(alias, None)
+        me_connection._dbs.pop(alias, None)
+    for documento in _document_registry.values():
+        if hasattr(documento, "_disconnect"):
+            documento._disconnect()
+
+
+def configurar_mongo():
+    """Registra la conexión por defecto sin abrirla. Es idempotente."""
+    global _configurado
+    with _lock:
+        if _configurado:
+            return
+        config = settings.MONGODB_SETTINGS
+        # El listener debe registrarse antes de crear cualquier cliente de MongoDB
+        from system.profiling import EscuchaComandosMongo
+        monitoring.register(EscuchaComandosMongo())
+
+        register_connection(
+            alias=DEFAULT_CONNECTION_NAME,
+            db=config["db"],
+            host=config["host"],
+            **opciones_cliente(config),
+        )
+        lecturas = getattr(settings, "MONGODB_LECTURAS", {})
+        if lecturas.get("habilitada"):
+            register_connection(
+                alias=ALIAS_LECTURAS,
+                db=config["db"],
+                host=config["host"],
+                **opciones_cliente({**config, **lecturas}),
+            )
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=_descartar_clientes)
+        _configurado = True
+
+
+def lecturas_habilitadas():
+    return ALIAS_LECTURAS in me_connection._connection_settings
+
+
+def en_coleccion(queryset, nombre_coleccion=None, alias=DEFAULT_CONNECTION_NAME):
+    """
+    Devuelve el QuerySet evaluado contra otra colección y/o alias de conexión.
+    No se usa QuerySet.using()/switch_collection(): modifican la clase y no son seguros entre hilos.
+    """
+    documento = queryset._document
+    coleccion = get_db(alias)[nombre_coleccion or documento._get_collection_name()]
+    return queryset._clone_into(queryset.__class__(documento, coleccion))
+
+
+def para_lectura(queryset):
+    """
+    Devuelve el QuerySet evaluado contra el alias ``lecturas`` (secundarios).
+    Solo para consultas de lectura que toleran el desfase configurado; si el alias
+    no está registrado se devuelve el mismo QuerySet (primario).
+    """
+    if not lecturas_habilitadas():
+        return queryset
+    return en_coleccion(queryset, alias=ALIAS_LECTURAS)
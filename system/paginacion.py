@@ -0,0 +1,61 @@
+# system/paginacion.py
+"""
+Paginación por cursor (keyset) para listados grandes de MongoDB.
+
+- Se ordena por (campo, _id) descendente y la página siguiente pide los documentos
+  "anteriores" al último mostrado, así el costo no crece con el número de página
+  (a diferencia de ``skip``) y el índice sobre (campo, _id) resuelve el rango.
+- El cursor es texto opaco para la URL: ``<valor ISO>|<ObjectId>``, o ``null|<ObjectId>`` cuando
+  el último registro no tiene valor en el campo. En orden descendente MongoDB deja los nulos
+  (o ausentes) al final, así que después de un valor se incluyen también los nulos y después
+  de un nulo solo quedan nulos con ``_id`` menor.
+"""
+from datetime import datetime
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+TAMANO_PAGINA = 50
+NULO = "null"
+
+
+def codificar_cursor(valor, oid):
+    if valor is None:
+        return f"{NULO}|{oid}"
+    return f"{valor.isoformat() if isinstance(valor, datetime) else valor}|{oid}"
+
+
+def decodificar_cursor(cursor):
+    """Devuelve (valor, ObjectId) o None si el cursor no es válido; ``valor`` es None en un cursor nulo."""
+    valor, _, oid = (cursor or "").partition("|")
+    try:
+        return (None if valor == NULO else datetime.fromisoformat(valor)), ObjectId(oid)
+    except (ValueError, InvalidId, TypeError):
+        return None
+
+
+def pagina_keyset(queryset, campo, cursor=None, tamano=TAMANO_PAGINA):
+    """
+    Página de ``queryset`` ordenada por ``campo`` y ``_id`` descendentes.
+    Devuelve (registros, cursor_siguiente); el cursor es None en la última página.
+    """
+    campo_db = queryset._document._fields[campo].db_field
+    posicion = decodificar_cursor(cursor)
+    if posicion is not None:
+        valor, oid = posicion
+        if valor is None:
+            condiciones = [{campo_db: None, "_id": {"$lt": oid}}]
+        else:
+            condiciones = [
+                {campo_db: {"$lt": valor}},
+                {campo_db: valor, "_id": {"$lt": oid}},
+                {campo_db: None},
+            ]
+        queryset = queryset.filter(__raw__={"$or": condiciones})
+    registros = list(queryset.order_by(f"-{campo}", "-id").limit(tamano + 1).select_related())
+    siguiente = None
+    if len(registros) > tamano:
+        registros = registros[:tamano]
+        ultimo = registros[-1]
+        siguiente = codificar_cursor(getattr(ultimo, campo), ultimo.id)
+    return registros, siguiente
@@ -0,0 +1,130 @@
+# system/periodos.py
+"""
+Resolución del periodo de inventario activo con caché.
+
+- ``obtener_periodo_activo()`` es el único punto para obtener el periodo vigente (capturas, listas e inicios).
+- El resultado se guarda en la caché de Django hasta el siguiente límite (``fecha_fin`` del
+  periodo actual o ``fecha_inicio`` del próximo), con un máximo de ``SIGO_PERIODO_CACHE_MAX_SEG``
+  para acotar el desfase entre workers cuando la caché es local.
+- Guardar o eliminar un ``PeriodoInventario`` incrementa la generación y descarta la entrada.
+- ``sincronizar_estados_periodos()`` (comando ``sincronizar_periodos``) aplica las transiciones
+  Pendiente → Activo → Finalizado con ``update_many``; las vistas solo leen.
+- ``fecha_fin`` es el último día del periodo (se captura como fecha y se guarda a medianoche):
+  el periodo sigue activo durante todo ese día y termina al empezar el siguiente.
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+
+CLAVE_GENERACION = "periodos:generacion"
+PREFIJO_ACTIVO = "periodos:activo:"
+SIN_PERIODO = "sin_periodo"
+
+
+def inicio_del_dia(ahora):
+    """Medianoche de ``ahora``: un periodo con ``fecha_fin`` anterior a este instante ya terminó."""
+    return ahora.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def fin_del_periodo(fecha_fin):
+    """Primer instante después del último día del periodo."""
+    return inicio_del_dia(fecha_fin.replace(tzinfo=None)) + timedelta(days=1)
+
+
+def calcular_status(fecha_inicio, fecha_fin, ahora=None):
+    """Estado que corresponde a un periodo según sus fechas."""
+    ahora = ahora or datetime.now()
+    fecha_inicio = fecha_inicio.replace(tzinfo=None)
+    if ahora < fecha_inicio:
+        return "Pendiente"
+    if ahora.date() <= fecha_fin.date():
+        return "Activo"
+    return "Finalizado"
+
+
+def _generacion():
+    generacion = cache.get(CLAVE_GENERACION)
+    if generacion is None:
+        cache.add(CLAVE_GENERACION, 1, timeout=None)
+        generacion = cache.get(CLAVE_GENERACION, 1)
+    return generacion
+
+
+def invalidar_periodo_activo():
+    """Descarta el periodo activo cacheado (se llama al guardar o eliminar periodos)."""
+    try:
+        cache.incr(CLAVE_GENERACION)
+    except ValueError:
+        cache.set(CLAVE_GENERACION, 1, timeout=None)
+
+
+def consultar_periodo_activo(ahora=None):
+    """Consulta sin caché: el periodo cuyo rango contiene ``ahora``, activo y con status 'Activo'."""
+    from system.models import PeriodoInventario
+
+    ahora = ahora or datetime.now()
+    return PeriodoInventario.objects(
+        fecha_inicio__lte=ahora,
+        fecha_fin__gte=inicio_del_dia(ahora),
+        status="Activo",
+        activo=True
+    ).order_by('-fecha_inicio').first()
+
+
+def siguiente_limite(ahora, periodo=None):
+    """Próximo instante en que puede cambiar el periodo activo (fin del actual o inicio del siguiente)."""
+    from system.models import PeriodoInventario
+
+    limites = []
+    if periodo is not None:
+        limites.append(fin_del_periodo(periodo.fecha_fin))
+    siguiente = PeriodoInventario.objects(fecha_inicio__gt=ahora).only('fecha_inicio').order_by('fecha_inicio').first()
+    if siguiente is not None:
+        limites.append(siguiente.fecha_inicio)
+    # Las fechas guardadas vuelven sin zona horaria; se comparan como hora local
+    limites = [l.replace(tzinfo=None) for l in limites]
+    return min(limites) if limites else None
+
+
+def obtener_periodo_activo():
+    """Periodo de inventario vigente (o None), cacheado hasta el siguiente límite."""
+    clave = f"{PREFIJO_ACTIVO}{_generacion()}"
+    valor = cache.get(clave)
+    if valor is not None:
+        return None if valor == SIN_PERIODO else valor
+
+    ahora = datetime.now()
+    periodo = consultar_periodo_activo(ahora)
+    maximo = int(getattr(settings, "SIGO_PERIODO_CACHE_MAX_SEG", 300))
+    limite = siguiente_limite(ahora, periodo)
+    segundos = maximo if limite is None else min(maximo, (limite - ahora).total_seconds())
+    cache.set(clave, periodo if periodo is not None else SIN_PERIODO, timeout=max(int(segundos), 1))
+    return periodo
+
+
+def sincronizar_estados_periodos(ahora=None):
+    """
+    Ajusta ``status`` y ``activo`` de los periodos cuyas fechas ya no corresponden a su estado.
+    Cada transición es un solo ``update_many`` que solo toca los documentos desfasados,
+    así el costo no crece con el número de periodos. Devuelve {status: modificados}.
+    """
+    from system.models import PeriodoInventario
+
+    ahora = ahora or datetime.now()
+    hoy = inicio_del_dia(ahora)
+    transiciones = {
+        "Pendiente": {"fecha_inicio__gt": ahora},
+        "Activo": {"fecha_inicio__lte": ahora, "fecha_fin__gte": hoy},
+        "Finalizado": {"fecha_fin__lt": hoy},
+    }
+    modificados = {}
+    for status, rango in transiciones.items():
+        activo = status == "Activo"
+        modificados[status] = PeriodoInventario.objects(
+            __raw__={"$or": [{"status": {"$ne": status}}, {"activo": {"$ne": activo}}]},
+            **rango
+        ).update(set__status=status, set__activo=activo)
+    if any(modificados.values()):
+        invalidar_periodo_activo()
+    return modificados
@@ -0,0 +1,275 @@
+# system/profiling.py
+"""
+Perfilado bajo demanda de solicitudes individuales.
+
+- Un administrador agrega ``?_perfil=muestreo`` (o ``cprofile``) a la URL, o envía
+  la cabecera ``X-Sigo-Perfil``, y la vista se ejecuta dentro del perfilador.
+- Se registra la línea de tiempo de comandos de MongoDB de la misma solicitud.
+- El resultado se guarda en ``PerfilSolicitud`` y se consulta desde el panel de administración.
+- Si ``SIGO_PERFILADOR`` no está activo, el middleware se desactiva por completo.
+"""
+import cProfile
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from pymongo import monitoring
+
+ROLES_PERFILADOR = ["admin", "admin_energia", "admin_ambiental"]
+MODOS_PERFIL = ["muestreo", "cprofile"]
+
+_local = threading.local()
+
+
+# ==================== LÍNEA DE TIEMPO DE COMANDOS MONGO ====================
+
+class RegistroComandosMongo:
+    """
+    Acumula los comandos de MongoDB ejecutados en el hilo actual mientras está activo.
+    Se usa como context manager: ``with RegistroComandosMongo() as registro: ...``
+    """
+
+    def __init__(self):
+        self.comandos = []
+        self._pendientes = {}
+        self._inicio = None
+        self._anterior = None
+
+    def __enter__(self):
+        self._inicio = time.perf_counter()
+        self._anterior = getattr(_local, "registro", None)
+        _local.registro = self
+        return self
+
+    def __exit__(self, *exc):
+        _local.registro = self._anterior
+        return False
+
+    def iniciado(self, comando, coleccion, request_id):
+        self._pendientes[request_id] = (comando, coleccion, time.perf_counter())
+
+    def terminado(self, request_id, duracion_us, error=None):
+        comando, coleccion, inicio = self._pendientes.pop(request_id, (None, None, None))
+        if comando is None:
+            return
+        self.comandos.append({
+            "comando": comando,
+            "coleccion": coleccion,
+            "inicio_ms": round((inicio - self._inicio) * 1000, 3),
+            "duracion_ms": round(duracion_us / 1000, 3),
+            "error": error,
+        })
+
+    @property
+    def total(self):
+        return len(self.comandos)
+
+    @property
+    def duracion_total_ms(self):
+        return round(sum(c["duracion_ms"] for c in self.comandos), 3)
+
+    def por_comando(self):
+        return Counter(c["comando"] for c in self.comandos)
+
+
+def registro_activo():
+    """Devuelve el ``RegistroComandosMongo`` activo en el hilo actual, o None."""
+    return getattr(_local, "registro", None)
+
+
+class EscuchaComandosMongo(monitoring.CommandListener):
+    """
+    Listener de pymongo que reenvía los eventos al ``RegistroComandosMongo`` activo del hilo.
+    Sin registro activo el costo es una sola búsqueda de atributo por comando.
+    """
+
+    def started(self, event):
+        registro = getattr(_local, "registro", None)
+        if registro is not None:
+            coleccion = event.command.get(event.command_name)
+            registro.iniciado(
+                event.command_name,
+                coleccion if isinstance(coleccion, str) else None,
+                event.request_id,
+            )
+
+    def succeeded(self, event):
+        registro = getattr(_local, "registro", None)
+        if registro is not None:
+            registro.terminado(event.request_id, event.duration_micros)
+
+    def failed(self, event):
+        registro = getattr(_local, "registro", None)
+        if registro is not None:
+            registro.terminado(event.request_id, event.duration_micros, error=str(event.failure))
+
+
+# ==================== PERFILADORES ====================
+
+class MuestreadorPila:
+    """
+    Perfilador de muestreo: un hilo auxiliar toma la pila del hilo perfilado cada
+    ``intervalo`` segundos y acumula las pilas "plegadas" (raíz;...;hoja).
+    """
+
+    def __init__(self, intervalo=0.005, profundidad_max=80):
+        self.intervalo = intervalo
+        self.profundidad_max = profundidad_max
+        self.pilas = Counter()
+        self._hilo_objetivo = None
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def __enter__(self):
+        self._hilo_objetivo = threading.get_ident()
+        self._hilo = threading.Thread(target=self._muestrear, daemon=True)
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._detener.set()
+        self._hilo.join()
+        return False
+
+    def _muestrear(self):
+        while not self._detener.wait(self.intervalo):
+            frame = sys._current_frames().get(self._hilo_objetivo)
+            pila = []
+            while frame is not None and len(pila) < self.profundidad_max:
+                codigo = frame.f_code
+                pila.append(f"{codigo.co_name} ({codigo.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                frame = frame.f_back
+            if pila:
+                self.pilas[";".join(reversed(pila))] += 1
+
+    def resultado(self):
+        return {
+            "pilas": [{"pila": pila, "muestras": n} for pila, n in self.pilas.most_common()],
+            "funciones": [],
+        }
+
+
+class PerfiladorCProfile:
+    """Perfilador determinista basado en cProfile; guarda las funciones más costosas."""
+
+    def __init__(self, limite=60):
+        self.limite = limite
+        self._perfil = cProfile.Profile()
+
+    def __enter__(self):
+        self._perfil.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self._perfil.disable()
+        return False
+
+    def resultado(self):
+        estadisticas = pstats.Stats(self._perfil)
+        funciones = []
+        for (archivo, linea, nombre), (_, llamadas, tottime, cumtime, _) in estadisticas.stats.items():
+            funciones.append({
+                "funcion": f"{nombre} ({archivo.rsplit('/', 1)[-1]}:{linea})",
+                "llamadas": llamadas,
+                "tiempo_propio_ms": round(tottime * 1000, 3),
+                "tiempo_acumulado_ms": round(cumtime * 1000, 3),
+            })
+        funciones.sort(key=lambda f: f["tiempo_acumulado_ms"], reverse=True)
+        return {"pilas": [], "funciones": funciones[:self.limite]}
+
+
+def construir_flamegraph(pilas):
+    """
+    Convierte pilas plegadas en filas de un flame graph (icicle).
+    Devuelve una lista de dicts con profundidad, inicio y ancho en porcentaje del total de muestras.
+    """
+    total = sum(p["muestras"] for p in pilas)
+    if not total:
+        return []
+
+    arbol = {"hijos": {}, "muestras": 0}
+    for p in pilas:
+        nodo = arbol
+        for marco in p["pila"].split(";"):
+            nodo = nodo["hijos"].setdefault(marco, {"hijos": {}, "muestras": 0})
+            nodo["muestras"] += p["muestras"]
+
+    filas = []
+
+    def recorrer(nodo, profundidad, inicio):
+        desplazamiento = inicio
+        for nombre, hijo in sorted(nodo["hijos"].items(), key=lambda h: -h[1]["muestras"]):
+            filas.append({
+                "nombre": nombre,
+                "profundidad": profundidad,
+                "inicio": round(desplazamiento * 100 / total, 3),
+                "ancho": round(hijo["muestras"] * 100 / total, 3),
+                "muestras": hijo["muestras"],
+            })
+            recorrer(hijo, profundidad + 1, desplazamiento)
+            desplazamiento += hijo["muestras"]
+
+    recorrer(arbol, 0, 0)
+    return filas
+
+
+# ==================== MIDDLEWARE ====================
+
+class PerfiladorMiddleware:
+    """
+    Envuelve la vista en un perfilador cuando un administrador lo solicita.
+    Se desactiva (MiddlewareNotUsed) si ``SIGO_PERFILADOR`` es falso.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SIGO_PERFILADOR", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        modo = request.GET.get("_perfil") or request.headers.get("X-Sigo-Perfil")
+        if not modo:
+            return None
+        if request.session.get("rol") not in ROLES_PERFILADOR:
+            return None
+        if modo not in MODOS_PERFIL:
+            modo = "muestreo"
+
+        perfilador = MuestreadorPila() if modo == "muestreo" else PerfiladorCProfile()
+        inicio = time.perf_counter()
+        with RegistroComandosMongo() as registro, perfilador:
+            response = view_func(request, *view_args, **view_kwargs)
+            # Las respuestas diferidas se renderizan dentro del perfilador
+            if hasattr(response, "render") and callable(response.render):
+                response = response.render()
+        duracion_ms = round((time.perf_counter() - inicio) * 1000, 3)
+
+        from system.models import PerfilSolicitud
+
+        resultado = perfilador.resultado()
+        perfil = PerfilSolicitud(
+            ruta=request.get_full_path(),
+            metodo=request.method,
+            vista=f"{view_func.__module__}.{getattr(view_func, '__name__', '')}",
+            usuario_id=request.session.get("user_id"),
+            email=request.session.get("email"),
+            modo=modo,
+            status_code=response.status_code,
+            duracion_ms=duracion_ms,
+            total_comandos=registro.total,
+            duracion_mongo_ms=registro.duracion_total_ms,
+            comandos=registro.comandos,
+            pilas=resultado["pilas"],
+            funciones=resultado["funciones"],
+        )
+        perfil.save()
+
+        response["X-Sigo-Perfil-Id"] = str(perfil.id)
+        return response
@@ -0,0 +1,248 @@
+# system/scheduler.py
+"""
+Programador de tareas periódicas de SIGO (``manage.py sigo_scheduler``).
+
+- Las tareas se registran con una expresión tipo cron (minuto hora día mes día_semana); como
+  en cron, si día y día_semana están restringidos (no empiezan con ``*``) basta con que
+  coincida uno de los dos::
+
+      from system.scheduler import tarea
+
+      @tarea("limpiar_algo", "*/10 * * * *")
+      def limpiar_algo():
+          ...
+
+- Cada ejecución toma un lease en MongoDB (``BloqueoTarea``), así solo un nodo corre cada
+  tarea por minuto programado aunque haya varios programadores activos.
+- Si una tarea larga retrasa el ciclo, los minutos que pasaron mientras corría se revisan
+  después (hasta ``MAX_MINUTOS_ATRASADOS``); el lease evita repetir los que otro nodo ya corrió.
+- Cada ejecución queda en ``EjecucionTarea`` con duración, estado y error.
+- Los módulos que registran tareas se importan desde ``SIGO_TAREAS_MODULOS``.
+"""
+import importlib
+import logging
+import os
+import socket
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+NODO = f"{socket.gethostname()}:{os.getpid()}"
+
+# El día de la semana acepta 0-7: domingo es 0 o 7, como en cron
+RANGOS_CRON = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+MAX_MINUTOS_ATRASADOS = 60
+
+
+# ==================== EXPRESIONES CRON ====================
+
+def _valores_campo(campo, minimo, maximo):
+    valores = set()
+    for parte in campo.split(","):
+        paso = 1
+        if "/" in parte:
+            parte, paso = parte.split("/")
+            paso = int(paso)
+        if parte == "*":
+            inicio, fin = minimo, maximo
+        elif "-" in parte:
+            inicio, fin = (int(v) for v in parte.split("-"))
+        else:
+            inicio = fin = int(parte)
+        if inicio < minimo or fin > maximo or inicio > fin:
+            raise ValueError(f"Valor fuera de rango en la expresión cron: {campo}")
+        valores.update(range(inicio, fin + 1, paso))
+    return valores
+
+
+def parsear_cron(expresion):
+    """
+    Convierte 'min hora día mes día_semana' en (conjuntos de valores permitidos, dia_o_semana).
+    ``dia_o_semana`` es True cuando día y día_semana están restringidos: entonces se cumple
+    con cualquiera de los dos, como en cron.
+    """
+    campos = expresion.split()
+    if len(campos) != 5:
+        raise ValueError(f"La expresión cron debe tener 5 campos: {expresion}")
+    valores = [_valores_campo(c, *r) for c, r in zip(campos, RANGOS_CRON)]
+    valores[4] = {dia % 7 for dia in valores[4]}
+    dia_o_semana = not campos[2].startswith("*") and not campos[4].startswith("*")
+    return valores, dia_o_semana
+
+
+def coincide(cron, momento):
+    """Indica si ``momento`` corresponde a la expresión ya parseada (día de la semana 0 = domingo)."""
+    (minutos, horas, dias, meses, dias_semana), dia_o_semana = cron
+    en_dia = momento.day in dias
+    en_semana = (momento.isoweekday() % 7) in dias_semana
+    return (
+        momento.minute in minutos
+        and momento.hour in horas
+        and momento.month in meses
+        and ((en_dia or en_semana) if dia_o_semana else (en_dia and en_semana))
+    )
+
+
+# ==================== REGISTRO DE TAREAS ====================
+
+@dataclass
+class Tarea:
+    nombre: str
+    cron: str
+    funcion: object
+    lease_seg: int = 600
+    descripcion: str = ""
+
+    def __post_init__(self):
+        self._cron = parsear_cron(self.cron)
+
+    def corresponde(self, momento):
+        return coincide(self._cron, momento)
+
+
+_tareas = {}
+
+
+def registrar_tarea(nombre, cron, funcion, lease_seg=600, descripcion=""):
+    """Registra (o reemplaza) una tarea periódica."""
+    _tareas[nombre] = Tarea(nombre, cron, funcion, lease_seg, descripcion or (funcion.__doc__ or "").strip())
+    return _tareas[nombre]
+
+
+def tarea(nombre, cron, lease_seg=600):
+    """Decorador equivalente a ``registrar_tarea``."""
+    def decorador(funcion):
+        registrar_tarea(nombre, cron, funcion, lease_seg)
+        return funcion
+    return decorador
+
+
+def tareas_registradas():
+    return dict(_tareas)
+
+
+def cargar_modulos_tareas():
+    """Importa los módulos que registran tareas (settings.SIGO_TAREAS_MODULOS)."""
+    for modulo in getattr(settings, "SIGO_TAREAS_MODULOS", ["system.tareas"]):
+        importlib.import_module(modulo)
+
+
+# ==================== LEASE EN MONGODB ====================
+
+def tomar_lease(tarea, minuto=None):
+    """
+    Intenta tomar el lease de la tarea para el minuto programado (``None`` en ejecuciones manuales).
+    Es atómico: el upsert falla con clave duplicada si otro nodo ya lo tiene o ya corrió ese
+    minuto o uno posterior (los minutos 'YYYY-mm-ddTHH:MM' se comparan como texto).
+    """
+    from system.models import BloqueoTarea
+
+    ahora = datetime.utcnow()
+    filtro = {"_id": tarea.nombre, "expira": {"$lt": ahora}}
+    cambios = {"propietario": NODO, "expira": ahora + timedelta(seconds=tarea.lease_seg)}
+    if minuto is not None:
+        filtro["$or"] = [
+            {"ultimo_minuto": None},
+            {"ultimo_minuto": {"$lt": minuto}},
+            {"ultimo_minuto": {"$regex": "^manual:"}},  # Leases anteriores de ejecuciones manuales
+        ]
+        cambios["ultimo_minuto"] = minuto
+    try:
+        BloqueoTarea._get_collection().find_one_and_update(filtro, {"$set": cambios}, upsert=True)
+    except DuplicateKeyError:
+        return False
+    return True
+
+
+def liberar_lease(tarea):
+    from system.models import BloqueoTarea
+
+    BloqueoTarea._get_collection().update_one(
+        {"_id": tarea.nombre, "propietario": NODO},
+        {"$set": {"expira": datetime.utcnow()}},
+    )
+
+
+# ==================== EJECUCIÓN ====================
+
+def ejecutar_tarea(tarea):
+    """Ejecuta la tarea y guarda su historial; devuelve el EjecucionTarea."""
+    from system.models import EjecucionTarea
+
+    ejecucion = EjecucionTarea(tarea=tarea.nombre, nodo=NODO, inicio=datetime.utcnow())
+    inicio = time.perf_counter()
+    try:
+        resultado = tarea.funcion()
+        ejecucion.estado = "ok"
+        ejecucion.resultado = "" if resultado is None else str(resultado)[:2000]
+    except Exception:
+        ejecucion.estado = "error"
+        ejecucion.error = traceback.format_exc()[-4000:]
+        logger.exception("Falló la tarea programada %s", tarea.nombre)
+    ejecucion.fin = datetime.utcnow()
+    ejecucion.duracion_ms = round((time.perf_counter() - inicio) * 1000, 3)
+    ejecucion.save()
+    return ejecucion
+
+
+def ejecutar_pendientes(momento=None, forzar=None):
+    """
+    Corre las tareas que corresponden al minuto ``momento`` (hora local) y cuyo lease se obtiene.
+    ``forzar`` ejecuta las tareas indicadas por nombre sin revisar la expresión cron.
+    """
+    momento = (momento or datetime.now()).replace(second=0, microsecond=0)
+    minuto = momento.strftime("%Y-%m-%dT%H:%M")
+    ejecuciones = []
+    for tarea in _tareas.values():
+        if forzar is not None:
+            if tarea.nombre not in forzar:
+                continue
+            minuto_lease = None
+        elif tarea.corresponde(momento):
+            minuto_lease = minuto
+        else:
+            continue
+        if not tomar_lease(tarea, minuto_lease):
+            continue
+        try:
+            ejecuciones.append(ejecutar_tarea(tarea))
+        finally:
+            liberar_lease(tarea)
+    return ejecuciones
+
+
+def minutos_por_revisar(ultimo, ahora):
+    """
+    Minutos programados desde el siguiente a ``ultimo`` hasta ``ahora`` (incluido). Si el atraso
+    pasa de ``MAX_MINUTOS_ATRASADOS`` solo se revisan los más recientes.
+    """
+    ahora = ahora.replace(second=0, microsecond=0)
+    if ultimo is None or ultimo >= ahora:
+        return [] if ultimo == ahora else [ahora]
+    atraso = int((ahora - ultimo).total_seconds() // 60)
+    if atraso > MAX_MINUTOS_ATRASADOS:
+        logger.warning("El programador se atrasó %s minutos; solo se revisan los últimos %s",
+                       atraso, MAX_MINUTOS_ATRASADOS)
+        atraso = MAX_MINUTOS_ATRASADOS
+    return [ahora - timedelta(minutes=n) for n in range(atraso - 1, -1, -1)]
+
+
+def ejecutar_ciclo(detener=None):
+    """Bucle del programador: revisa las tareas al inicio de cada minuto, incluidos los que se atrasaron."""
+    ultimo = None
+    while detener is None or not detener.is_set():
+        for momento in minutos_por_revisar(ultimo, datetime.now()):
+            ejecutar_pendientes(momento)
+            ultimo = momento
+        espera = 60 - datetime.now().second + 0.5
+        if detener is None:
+            time.sleep(espera)
+        else:
+            detener.wait(espera)
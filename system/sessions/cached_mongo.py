@@ -0,0 +1,67 @@
+"""
+Backend de sesiones con caché delante de MongoDB (equivalente a ``cached_db``).
+
+- Las lecturas se resuelven en la caché ``SESSION_CACHE_ALIAS`` y solo van a MongoDB si falta.
+- Las escrituras van a MongoDB y después a la caché.
+- Con varios workers la caché debe ser compartida (Redis, Memcached); con ``LocMemCache``
+  cada proceso tendría su propia copia y podría leer sesiones ya cerradas en otro worker.
+- Uso: ``SESSION_ENGINE = "system.sessions.cached_mongo"``.
+"""
+from django.conf import settings
+from django.core.cache import caches
+
+from system.sessions.mongo import SessionStore as MongoSessionStore
+
+KEY_PREFIX = "system.sessions.cached_mongo"
+
+
+class SessionStore(MongoSessionStore):
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        self._cache = caches[settings.SESSION_CACHE_ALIAS]
+        super().__init__(session_key)
+
+    @property
+    def cache_key(self):
+        return self.cache_key_prefix + self._get_or_create_session_key()
+
+    def load(self):
+        try:
+            data = self._cache.get(self.cache_key)
+        except Exception:
+            # Si la caché no responde se lee directamente de MongoDB
+            data = None
+        if data is None:
+            data = super().load()
+            if self.session_key:
+                try:
+                    self._cache.set(self.cache_key, data, self.get_expiry_age(expiry=self.get_expiry_date()))
+                except Exception:
+                    pass
+        return data
+
+    def exists(self, session_key):
+        return (
+            bool(session_key) and (self.cache_key_prefix + session_key) in self._cache
+        ) or super().exists(session_key)
+
+    def save(self, must_create=False):
+        super().save(must_create)
+        try:
+            self._cache.set(self.cache_key, self._session, self.get_expiry_age())
+        except Exception:
+            pass
+
+    def delete(self, session_key=None):
+        super().delete(session_key)
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        self._cache.delete(self.cache_key_prefix + session_key)
+
+    def flush(self):
+        self.clear()
+        self.delete(self.session_key)
+        self._session_key = None
@@ -0,0 +1,81 @@
+"""
+Backend de sesiones de Django almacenado en MongoDB.
+
+- Cada sesión es un documento de ``django_sesiones`` con índice TTL sobre ``expire_date``,
+  por lo que MongoDB elimina las sesiones vencidas sin ``clearsessions``.
+- Las escrituras son un solo ``insert_one``/``replace_one`` por petición modificada, sin el
+  bloqueo de archivo de SQLite entre workers.
+- Como el backend de base de datos de Django (``force_update``), ``replace_one`` no hace upsert:
+  si otra petición borró la sesión (logout, ``flush()``, ``cycle_key()``) se lanza
+  ``UpdateError`` y el middleware responde ``SessionInterrupted`` en lugar de revivirla.
+- Uso: ``SESSION_ENGINE = "system.sessions.mongo"``.
+"""
+from django.contrib.sessions.backends.base import CreateError, SessionBase, UpdateError
+from django.utils import timezone
+from pymongo.errors import DuplicateKeyError
+
+from system.models import SesionDjango
+
+
+class SessionStore(SessionBase):
+
+    @classmethod
+    def get_collection(cls):
+        # _get_collection() crea los índices (incluido el TTL) la primera vez
+        return SesionDjango._get_collection()
+
+    def _get_session_from_db(self):
+        return self.get_collection().find_one(
+            {"_id": self.session_key, "expire_date": {"$gt": timezone.now()}},
+            {"session_data": 1},
+        )
+
+    def load(self):
+        documento = self._get_session_from_db() if self.session_key else None
+        if documento is None:
+            self._session_key = None
+            return {}
+        return self.decode(documento["session_data"])
+
+    def exists(self, session_key):
+        return self.get_collection().find_one({"_id": session_key}, {"_id": 1}) is not None
+
+    def create(self):
+        while True:
+            self._session_key = self._get_new_session_key()
+            try:
+                self.save(must_create=True)
+            except CreateError:
+                # La clave ya existía; se genera otra
+                continue
+            self.modified = True
+            return
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        data = self._get_session(no_load=must_create)
+        documento = {
+            "session_data": self.encode(data),
+            "expire_date": self.get_expiry_date(),
+        }
+        coleccion = self.get_collection()
+        if must_create:
+            try:
+                coleccion.insert_one({"_id": self._get_or_create_session_key(), **documento})
+            except DuplicateKeyError:
+                raise CreateError
+        elif coleccion.replace_one({"_id": self.session_key}, documento).matched_count == 0:
+            raise UpdateError
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        self.get_collection().delete_one({"_id": session_key})
+
+    @classmethod
+    def clear_expired(cls):
+        # El índice TTL ya las elimina; esto cubre el desfase del monitor TTL (hasta 60 s)
+        cls.get_collection().delete_many({"expire_date": {"$lt": timezone.now()}})
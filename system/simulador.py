@@ -0,0 +1,355 @@
+# system/simulador.py
+"""
+Simulador de sustituciones ("¿qué pasa si?") sobre los inventarios de luminarias y climatización.
+
+- Una regla dice qué equipos se sustituyen y por qué: ``{"tipo": "luminarias", "origen":
+  "fluorescente", "potencia": 18, "destino": "LED"}`` cambia la potencia por lámpara de las
+  luminarias cuyo ``tipo_lampara`` contiene "FLUORESCENTE"; en vez de ``potencia`` se puede dar
+  ``factor`` (0.5 = la mitad de potencia). En climatización se sustituye ``potencia`` del equipo
+  y ``origen`` se compara con ``tipo_clima``. Cada registro toma la primera regla que le aplica.
+- El inventario del periodo se lee una vez por tipo con un cursor proyectado a columnas en
+  memoria; cada regla se evalúa sobre la columna de equipo normalizada y el consumo simulado se
+  obtiene con la misma fórmula de la captura (``system.consumo.calcular``).
+- El costo usa el precio por kWh del catálogo ``Tarifas`` (``nombre`` = GDMTH, PDBT, ...) según
+  la tarifa de las subestaciones de la UR; si la tarifa no está en el catálogo se usa el precio
+  efectivo de sus facturas (cargo de energía / consumo).
+- El resultado (ahorro por edificio y por tarifa) se guarda en la caché con la huella de las
+  reglas, el periodo y el alcance durante ``SIGO_SIMULADOR_CACHE_SEG``.
+"""
+import hashlib
+import json
+import time
+from collections import Counter, defaultdict
+from decimal import Decimal, InvalidOperation
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_POST
+
+from system.archivo import coleccion_inventario
+from system.catalogo import normalizar
+from system.consumo import FORMULAS, calcular
+from system.decorators import login_required_custom
+from system.models import (
+    Edificio, FacturaEnergeticaTriple, FacturaPdbt, InventarioClimatizacion, InventarioLuminarias,
+    PeriodoInventario, Subestacion, Tarifas, UnidadResponsable,
+)
+
+MAX_REGLAS = 20
+PREFIJO_CACHE = "simulador:"
+ROLES_ADMIN = ["admin", "admin_energia", "admin_ambiental"]
+SIN_TARIFA = "SIN TARIFA"
+
+# tipo: (modelo, campo con el tipo de equipo, campo de potencia que sustituye la regla)
+INVENTARIOS_SIMULABLES = {
+    "luminarias": (InventarioLuminarias, "tipo_lampara", "potencia_lamp"),
+    "climatizacion": (InventarioClimatizacion, "tipo_clima", "potencia"),
+}
+
+
+class SimulacionInvalida(Exception):
+    """Las reglas o el alcance de la simulación no son válidos."""
+
+
+def _decimal(valor):
+    if valor in (None, ""):
+        return None
+    try:
+        return Decimal(str(valor))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _id(valor):
+    return str(getattr(valor, "id", valor)) if valor is not None else None
+
+
+# ==================== REGLAS ====================
+
+def normalizar_reglas(reglas):
+    """Valida las reglas y las deja en una forma canónica (para aplicarlas y para la huella)."""
+    if not isinstance(reglas, list) or not reglas:
+        raise SimulacionInvalida("Indique al menos una regla de sustitución.")
+    if len(reglas) > MAX_REGLAS:
+        raise SimulacionInvalida(f"Máximo {MAX_REGLAS} reglas por simulación.")
+
+    normalizadas = []
+    for numero, regla in enumerate(reglas, start=1):
+        if not isinstance(regla, dict) or regla.get("tipo") not in INVENTARIOS_SIMULABLES:
+            raise SimulacionInvalida(f"Regla {numero}: el tipo debe ser luminarias o climatizacion.")
+        origen = normalizar(regla.get("origen"))
+        if not origen:
+            raise SimulacionInvalida(f"Regla {numero}: indique qué equipo se sustituye (origen).")
+        potencia, factor = _decimal(regla.get("potencia")), _decimal(regla.get("factor"))
+        if (potencia is None) == (factor is None):
+            raise SimulacionInvalida(f"Regla {numero}: indique potencia o factor (solo uno).")
+        if (potencia is not None and potencia < 0) or (factor is not None and factor < 0):
+            raise SimulacionInvalida(f"Regla {numero}: la potencia y el factor no pueden ser negativos.")
+        normalizadas.append({
+            "tipo": regla["tipo"],
+            "origen": origen,
+            "potencia": str(potencia) if potencia is not None else None,
+            "factor": str(factor) if factor is not None else None,
+            "destino": str(regla.get("destino") or "").strip()[:100],
+        })
+    return normalizadas
+
+
+def huella_simulacion(reglas, periodo, alcance):
+    contenido = json.dumps({"reglas": reglas, "periodo": str(periodo.id), "alcance": alcance}, sort_keys=True)
+    return hashlib.sha1(contenido.encode("utf-8")).hexdigest()
+
+
+# ==================== DATOS ====================
+
+def _cargar(tipo, periodo, unidades):
+    """Columnas del inventario vigente del periodo (una lista por campo)."""
+    modelo, campo_equipo, _ = INVENTARIOS_SIMULABLES[tipo]
+    entradas, _, _, campo_horas = FORMULAS[tipo]
+    campos = entradas + [campo_horas]
+    filtro = {"periodo": periodo.id, "activo": {"$ne": False}}
+    if unidades is not None:
+        filtro["unidad_responsable"] = {"$in": unidades}
+
+    columnas = {nombre: [] for nombre in ["edificio", "unidad_responsable", "equipo"] + campos}
+    proyeccion = dict.fromkeys(["edificio", "unidad_responsable", campo_equipo] + campos, 1)
+    for doc in coleccion_inventario(modelo, periodo).find(filtro, proyeccion).batch_size(1000):
+        columnas["edificio"].append(_id(doc.get("edificio")))
+        columnas["unidad_responsable"].append(_id(doc.get("unidad_responsable")))
+        columnas["equipo"].append(normalizar(doc.get(campo_equipo)))
+        for campo in campos:
+            columnas[campo].append(doc.get(campo))
+    return columnas
+
+
+def tarifas_por_ur(unidades=None):
+    """{ur_id: tarifa} con la tarifa más frecuente entre las subestaciones de cada UR."""
+    filtro = {"unidad_responsable__in": unidades} if unidades is not None else {}
+    conteos = defaultdict(Counter)
+    for s in Subestacion.objects(**filtro).only("unidad_responsable", "tarifa").as_pymongo():
+        if s.get("tarifa"):
+            conteos[_id(s.get("unidad_responsable"))][s["tarifa"].strip().upper()] += 1
+    return {ur: conteo.most_common(1)[0][0] for ur, conteo in conteos.items()}
+
+
+def precios_por_tarifa():
+    """
+    {tarifa: precio por kWh}. Primero el catálogo Tarifas; para las que no estén, el precio
+    efectivo de las facturas (suma de cargo de energía / suma de consumo).
+    """
+    precios = {}
+    for modelo in (FacturaEnergeticaTriple, FacturaPdbt):
+        for r in modelo._get_collection().aggregate([
+            {"$group": {
+                "_id": "$tipo_tarifa",
+                "cargo": {"$sum": {"$convert": {"input": "$cargo_energia", "to": "decimal", "onError": 0, "onNull": 0}}},
+                "consumo": {"$sum": {"$convert": {"input": "$consumo", "to": "decimal", "onError": 0, "onNull": 0}}},
+            }},
+        ]):
+            cargo, consumo = Decimal(str(r["cargo"])), Decimal(str(r["consumo"]))
+            if r["_id"] and consumo > 0:
+                precios[r["_id"].strip().upper()] = (cargo / consumo).quantize(Decimal("0.0001"))
+    for t in Tarifas.objects.only("nombre", "tarifa").as_pymongo():
+        precio = _decimal(t.get("tarifa"))
+        if t.get("nombre") and precio is not None:
+            precios[t["nombre"].strip().upper()] = precio
+    return precios
+
+
+# ==================== SIMULACIÓN ====================
+
+def _fila(columnas, campos, i, sustituir=None, valor=None):
+    fila = {campo: columnas[campo][i] for campo in campos}
+    if sustituir:
+        fila[sustituir] = valor
+    return fila
+
+
+def simular(reglas, periodo, unidades=None):
+    """
+    Aplica ``reglas`` (ya normalizadas) al inventario del periodo. ``unidades``: lista de
+    ObjectId de UR o None para todas. Devuelve totales, ahorro por edificio y por tarifa.
+    """
+    tarifas = tarifas_por_ur(unidades)
+    precios = precios_por_tarifa()
+    por_edificio = defaultdict(lambda: {"kwh_actual": Decimal(0), "kwh_simulado": Decimal(0), "registros": 0})
+    afectados_por_regla = [0] * len(reglas)
+
+    for tipo, (_, _, campo_potencia) in INVENTARIOS_SIMULABLES.items():
+        reglas_tipo = [(n, r) for n, r in enumerate(reglas) if r["tipo"] == tipo]
+        if not reglas_tipo:
+            continue
+        columnas = _cargar(tipo, periodo, unidades)
+        entradas, _, _, campo_horas = FORMULAS[tipo]
+        campos = entradas + [campo_horas]
+        total = len(columnas["equipo"])
+
+        # Primera regla que aplica a cada registro (None si ninguna), una pasada por columna
+        asignada = [None] * total
+        for numero, regla in reglas_tipo:
+            origen = regla["origen"]
+            asignada = [n if n is not None or origen not in equipo else numero
+                        for n, equipo in zip(asignada, columnas["equipo"])]
+
+        for i in range(total):
+            numero = asignada[i]
+            if numero is None:
+                continue
+            regla = reglas[numero]
+            actual = calcular(tipo, _fila(columnas, campos, i))
+            if actual is None:
+                continue
+            if regla["potencia"] is not None:
+                nueva = Decimal(regla["potencia"])
+            else:
+                nueva = (_decimal(columnas[campo_potencia][i]) or Decimal(0)) * Decimal(regla["factor"])
+            simulado = calcular(tipo, _fila(columnas, campos, i, campo_potencia, nueva))
+            if simulado is None:
+                continue
+            afectados_por_regla[numero] += 1
+            grupo = por_edificio[(columnas["edificio"][i], columnas["unidad_responsable"][i])]
+            grupo["kwh_actual"] += actual[1]
+            grupo["kwh_simulado"] += simulado[1]
+            grupo["registros"] += 1
+
+    nombres_edificio = {str(e["_id"]): e.get("nombre", "") for e in Edificio.objects(
+        id__in=[e for e, _ in por_edificio if e]).only("nombre").as_pymongo()}
+    nombres_ur = {str(u["_id"]): u.get("nombre", "") for u in UnidadResponsable.objects(
+        id__in=[u for _, u in por_edificio if u]).only("nombre").as_pymongo()}
+
+    edificios = []
+    por_tarifa = defaultdict(lambda: {"kwh_actual": Decimal(0), "kwh_simulado": Decimal(0), "ahorro_costo": Decimal(0)})
+    sin_precio = set()
+    for (edificio, ur), datos in por_edificio.items():
+        tarifa = tarifas.get(ur, SIN_TARIFA)
+        precio = precios.get(tarifa)
+        if precio is None:
+            sin_precio.add(tarifa)
+        ahorro_kwh = datos["kwh_actual"] - datos["kwh_simulado"]
+        ahorro_costo = (ahorro_kwh * precio).quantize(Decimal("0.01")) if precio is not None else Decimal(0)
+        edificios.append({
+            "edificio": edificio,
+            "nombre": nombres_edificio.get(edificio, ""),
+            "unidad_responsable": nombres_ur.get(ur, ""),
+            "tarifa": tarifa,
+            "precio_kwh": precio,
+            "registros": datos["registros"],
+            "kwh_actual": datos["kwh_actual"],
+            "kwh_simulado": datos["kwh_simulado"],
+            "ahorro_kwh": ahorro_kwh,
+            "ahorro_costo": ahorro_costo,
+        })
+        acumulado = por_tarifa[tarifa]
+        acumulado["kwh_actual"] += datos["kwh_actual"]
+        acumulado["kwh_simulado"] += datos["kwh_simulado"]
+        acumulado["ahorro_costo"] += ahorro_costo
+    edificios.sort(key=lambda e: e["ahorro_kwh"], reverse=True)
+
+    tarifas_resumen = [{
+        "tarifa": tarifa,
+        "precio_kwh": precios.get(tarifa),
+        "kwh_actual": datos["kwh_actual"],
+        "kwh_simulado": datos["kwh_simulado"],
+        "ahorro_kwh": datos["kwh_actual"] - datos["kwh_simulado"],
+        "ahorro_costo": datos["ahorro_costo"],
+    } for tarifa, datos in sorted(por_tarifa.items())]
+
+    kwh_actual = sum((e["kwh_actual"] for e in edificios), Decimal(0))
+    kwh_simulado = sum((e["kwh_simulado"] for e in edificios), Decimal(0))
+    return {
+        "periodo": {"id": str(periodo.id), "nombre": periodo.nombre},
+        "reglas": [{**r, "registros": afectados_por_regla[n]} for n, r in enumerate(reglas)],
+        "totales": {
+            "registros": sum(afectados_por_regla),
+            "kwh_actual": kwh_actual,
+            "kwh_simulado": kwh_simulado,
+            "ahorro_kwh": kwh_actual - kwh_simulado,
+            "ahorro_costo": sum((e["ahorro_costo"] for e in edificios), Decimal(0)),
+        },
+        "por_edificio": edificios,
+        "por_tarifa": tarifas_resumen,
+        "tarifas_sin_precio": sorted(sin_precio),
+        "generado": int(time.time()),
+    }
+
+
+def simular_cacheado(reglas, periodo, alcance, unidades):
+    """``simular`` con caché por huella de reglas + periodo + alcance."""
+    reglas = normalizar_reglas(reglas)
+    huella = huella_simulacion(reglas, periodo, alcance)
+    clave = f"{PREFIJO_CACHE}{huella}"
+    resultado = cache.get(clave)
+    if resultado is None:
+        resultado = {**simular(reglas, periodo, unidades), "huella": huella}
+        cache.set(clave, resultado, timeout=int(getattr(settings, "SIGO_SIMULADOR_CACHE_SEG", 900)))
+    return resultado
+
+
+# ==================== API ====================
+
+def _object_id(valor, mensaje):
+    try:
+        return ObjectId(str(valor))
+    except (InvalidId, TypeError):
+        raise SimulacionInvalida(mensaje)
+
+
+def _alcance(user, datos):
+    """(alcance para la huella, lista de UR o None). Los no administradores solo ven su UR."""
+    if user.rol not in ROLES_ADMIN:
+        propia = _id(user.unidad_responsable)
+        if not propia:
+            raise SimulacionInvalida("El usuario no tiene unidad responsable.")
+        return {"ur": propia}, [user.unidad_responsable.id]
+
+    if datos.get("ur"):
+        ur = UnidadResponsable.objects(id=_object_id(datos["ur"], "UR inválida.")).only("id").first()
+        if not ur:
+            raise SimulacionInvalida("UR no encontrada.")
+        return {"ur": str(ur.id)}, [ur.id]
+    if datos.get("campus"):
+        campus = _object_id(datos["campus"], "Campus inválido.")
+        unidades = list(UnidadResponsable.objects(campus=campus).scalar("id"))
+        if not unidades:
+            raise SimulacionInvalida("El campus no tiene unidades responsables.")
+        return {"campus": str(campus)}, unidades
+    return {"todo": True}, None
+
+
+@never_cache
+@login_required_custom
+@require_POST
+def simulador_api(request):
+    """
+    POST JSON: ``{"reglas": [...], "periodo": id?, "ur": id?, "campus": id?}``.
+    Sin periodo se usa el activo; sin UR ni campus (solo administradores) todo el inventario.
+    """
+    from system.periodos import obtener_periodo_activo
+    from system.views import get_user
+
+    user = get_user(request)
+    if not user:
+        return JsonResponse({"error": "Acceso denegado."}, status=403)
+    try:
+        datos = json.loads(request.body or b"{}")
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({"error": "El cuerpo debe ser JSON."}, status=400)
+    if not isinstance(datos, dict):
+        return JsonResponse({"error": "El cuerpo debe ser un objeto JSON."}, status=400)
+
+    try:
+        periodo = (PeriodoInventario.objects(id=_object_id(datos["periodo"], "Periodo inválido.")).first()
+                   if datos.get("periodo") else obtener_periodo_activo())
+        if not periodo:
+            raise SimulacionInvalida("No hay periodo de inventario para simular.")
+        alcance, unidades = _alcance(user, datos)
+        resultado = simular_cacheado(datos.get("reglas"), periodo, alcance, unidades)
+    except SimulacionInvalida as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": f"Error al simular: {e}"}, status=400)
+    return JsonResponse(resultado)
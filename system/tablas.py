@@ -0,0 +1,316 @@
+# system/tablas.py
+"""
+Motor de tablas del lado del servidor (búsqueda, filtros, orden y paginación).
+
+- Cada tabla se registra con ``registrar_tabla(Tabla(...))``: modelo, alcance por usuario,
+  campos de búsqueda, columnas ordenables y la plantilla parcial que dibuja sus filas.
+- ``consultar_tabla()`` arma el QuerySet: alcance (rol/UR) + filtros + búsqueda por prefijo +
+  orden, y devuelve solo la página pedida. Los filtros sobre referencias con un id inválido se
+  ignoran en lugar de llegar a MongoDB. Si se filtra por un periodo archivado, la consulta va a
+  su colección de archivo (``inventario_de_periodo()``, system/archivo.py).
+- La búsqueda compara el término normalizado (``normalizar()``, system/catalogo.py) contra el
+  campo ``busqueda`` que el mixin ``TerminosBusqueda`` guarda en cada documento (marca, modelo,
+  tipo; periodo y tarifa en facturas; nombre del área) con un prefijo anclado y sensible a
+  mayúsculas, que MongoDB resuelve como rango sobre el índice. ``completar_busqueda()``
+  (comando ``completar_busqueda``) llena el campo en los documentos anteriores.
+- ``tabla_datos`` (``/tablas/<nombre>/``) responde JSON con el HTML de las filas de la página
+  y los totales; ``static/js/search.js`` y ``static/js/pagination.js`` lo usan cuando el
+  ``tbody`` tiene ``data-tabla-url``, en lugar de filtrar y paginar en el navegador.
+"""
+import math
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from bson import ObjectId
+from django.http import JsonResponse
+from django.template.loader import render_to_string
+from django.views.decorators.cache import never_cache
+from mongoengine.fields import ObjectIdField, ReferenceField
+from mongoengine.queryset.visitor import Q
+from pymongo import UpdateOne
+
+from system.archivo import inventario_de_periodo
+from system.catalogo import normalizar, terminos_busqueda
+from system.decorators import login_required_custom
+from system.models import (
+    Area, FacturaEnergeticaTriple, FacturaPdbt, InventarioClimatizacion, InventarioLuminarias,
+    InventarioMiscelaneos, PeriodoInventario, Subestacion,
+)
+from system.views import get_user
+
+TAMANO_PAGINA = 25
+TAMANO_LOTE = 1000
+TAMANO_MAXIMO = 100
+MAX_TERMINOS = 5
+ROLES_ADMIN = ["admin", "admin_energia", "admin_ambiental"]
+
+
+@dataclass
+class Tabla:
+    nombre: str
+    modelo: type
+    plantilla_filas: str
+    alcance: object                       # función(usuario) -> dict de filtros, o None si no tiene acceso
+    ordenables: dict = field(default_factory=dict)   # clave GET -> campo del modelo
+    orden_defecto: str = "-fecha_registro"
+    filtros: list = field(default_factory=list)      # parámetros GET aplicados como igualdad
+    filtros_especiales: dict = field(default_factory=dict)  # parámetro GET -> función(valor) -> dict o None
+    busca_area: bool = True
+    profundidad: int = 1                  # max_depth de select_related para las filas
+
+
+_tablas = {}
+
+
+def registrar_tabla(tabla):
+    _tablas[tabla.nombre] = tabla
+    return tabla
+
+
+def obtener_tabla(nombre):
+    return _tablas.get(nombre)
+
+
+# ==================== CONSULTA ====================
+
+def _entero(valor, defecto, minimo, maximo):
+    try:
+        return min(max(int(valor), minimo), maximo)
+    except (TypeError, ValueError):
+        return defecto
+
+
+def _es_object_id(valor):
+    return ObjectId.is_valid(valor)
+
+
+def _valor_filtro(modelo, filtro, valor):
+    """Valor del filtro o None si apunta a una referencia con un id que no es ObjectId."""
+    campo = modelo._fields.get(filtro.split("__")[0])
+    if isinstance(campo, (ReferenceField, ObjectIdField)) and not _es_object_id(valor):
+        return None
+    return valor
+
+
+def _busqueda(tabla, texto):
+    """
+    Q con un término por palabra (AND); cada término es un prefijo anclado de ``busqueda``
+    (y del nombre del área). ``startswith`` sin ``i`` deja que MongoDB use el índice.
+    """
+    condicion = Q()
+    for termino in [normalizar(t) for t in texto.split()[:MAX_TERMINOS]]:
+        if not termino:
+            continue
+        opciones = Q(busqueda__startswith=termino)
+        if tabla.busca_area:
+            areas = Area.objects(busqueda__startswith=termino).scalar('id')
+            opciones |= Q(area__in=list(areas[:200]))
+        condicion &= opciones
+    return condicion
+
+
+def _periodo_archivado(tabla, parametros):
+    """PeriodoInventario archivado pedido en el filtro ``periodo`` de la tabla, o None."""
+    valor = parametros.get("periodo")
+    if "periodo" not in tabla.filtros or not _es_object_id(valor):
+        return None
+    return PeriodoInventario.objects(id=valor, archivado=True).first()
+
+
+def consultar_tabla(tabla, usuario, parametros):
+    """
+    Devuelve la página pedida o None si el usuario no tiene acceso a la tabla.
+    Parámetros: q, orden (clave o -clave), pagina, tamano y los filtros declarados en la tabla.
+    """
+    alcance = tabla.alcance(usuario)
+    if alcance is None:
+        return None
+
+    archivado = _periodo_archivado(tabla, parametros)
+    if archivado is not None:
+        queryset = inventario_de_periodo(tabla.modelo, archivado, **alcance)
+    else:
+        queryset = tabla.modelo.objects(**alcance)
+    for filtro in tabla.filtros:
+        if archivado is not None and filtro == "periodo":
+            continue
+        valor = _valor_filtro(tabla.modelo, filtro, parametros.get(filtro))
+        if valor:
+            queryset = queryset.filter(**{filtro: valor})
+    for parametro, funcion in tabla.filtros_especiales.items():
+        condicion = funcion(parametros.get(parametro)) if parametros.get(parametro) else None
+        if condicion:
+            queryset = queryset.filter(**condicion)
+
+    texto = (parametros.get("q") or "").strip()
+    if texto:
+        queryset = queryset.filter(_busqueda(tabla, texto))
+
+    orden = parametros.get("orden") or ""
+    campo = tabla.ordenables.get(orden.lstrip("-"))
+    if campo:
+        queryset = queryset.order_by(f"-{campo}" if orden.startswith("-") else campo, "-id")
+    else:
+        queryset = queryset.order_by(tabla.orden_defecto, "-id")
+
+    tamano = _entero(parametros.get("tamano"), TAMANO_PAGINA, 1, TAMANO_MAXIMO)
+    total = queryset.count()
+    paginas = max(math.ceil(total / tamano), 1)
+    pagina = _entero(parametros.get("pagina"), 1, 1, paginas)
+    registros = queryset.skip((pagina - 1) * tamano).limit(tamano).select_related(max_depth=tabla.profundidad)
+
+    return {
+        "registros": registros,
+        "total": total,
+        "pagina": pagina,
+        "paginas": paginas,
+        "tamano": tamano,
+        "orden": orden if campo else "",
+        "q": texto,
+    }
+
+
+@never_cache
+@login_required_custom
+def tabla_datos(request, nombre):
+    """JSON con las filas (HTML) de una página de la tabla y los datos para paginar."""
+    tabla = obtener_tabla(nombre)
+    if tabla is None:
+        return JsonResponse({"error": "Tabla no encontrada."}, status=404)
+
+    try:
+        pagina = consultar_tabla(tabla, get_user(request), request.GET)
+    except Exception as e:
+        return JsonResponse({"error": f"Error al consultar: {e}"}, status=400)
+    if pagina is None:
+        return JsonResponse({"error": "Acceso denegado."}, status=403)
+
+    html = render_to_string(tabla.plantilla_filas, {"registros": pagina["registros"]}, request=request)
+    return JsonResponse({
+        "html": html,
+        "total": pagina["total"],
+        "pagina": pagina["pagina"],
+        "paginas": pagina["paginas"],
+        "tamano": pagina["tamano"],
+    })
+
+
+# ==================== TABLAS DE INVENTARIO ====================
+
+def _admin_activos(usuario):
+    if not usuario or usuario.rol not in ROLES_ADMIN:
+        return None
+    return {"activo__ne": False}
+
+
+FILTROS_INVENTARIO = ["unidad_responsable", "edificio", "area", "periodo", "nivel"]
+# Los DecimalField se guardan como texto (force_string), por eso no se ordena por potencia o consumo
+ORDEN_INVENTARIO = {
+    "fecha": "fecha_registro",
+    "nivel": "nivel",
+    "marca": "marca",
+    "modelo": "modelo",
+}
+
+registrar_tabla(Tabla(
+    nombre="inventario_climatizacion_admin",
+    modelo=InventarioClimatizacion,
+    plantilla_filas="systemsigo/Inventarios/Climatizacion/filas_climatizacion.html",
+    alcance=_admin_activos,
+    ordenables={**ORDEN_INVENTARIO, "tipo": "tipo_clima"},
+    filtros=FILTROS_INVENTARIO,
+))
+
+registrar_tabla(Tabla(
+    nombre="inventario_luminarias_admin",
+    modelo=InventarioLuminarias,
+    plantilla_filas="systemsigo/Inventarios/Luminarias/filas_luminarias.html",
+    alcance=_admin_activos,
+    ordenables={"fecha": "fecha_registro", "nivel": "nivel", "tipo": "tipo_lampara"},
+    filtros=FILTROS_INVENTARIO,
+))
+
+registrar_tabla(Tabla(
+    nombre="inventario_miscelaneos_admin",
+    modelo=InventarioMiscelaneos,
+    plantilla_filas="systemsigo/Inventarios/Miscelaneos/filas_miscelaneos.html",
+    alcance=_admin_activos,
+    ordenables={**ORDEN_INVENTARIO, "tipo": "miscelaneos"},
+    filtros=FILTROS_INVENTARIO,
+))
+
+
+# ==================== TABLAS DE FACTURAS ====================
+
+def _admin(usuario):
+    if not usuario or usuario.rol not in ROLES_ADMIN:
+        return None
+    return {}
+
+
+def _facturas_de_ur(valor):
+    if not _es_object_id(valor):
+        return None
+    return {"subestacion__in": list(Subestacion.objects(unidad_responsable=valor).scalar('id'))}
+
+
+def _facturas_del_anio(valor):
+    try:
+        anio = int(valor)
+    except (TypeError, ValueError):
+        return None
+    return {"fecha_registro__gte": datetime(anio, 1, 1), "fecha_registro__lt": datetime(anio + 1, 1, 1)}
+
+
+FILTROS_ESPECIALES_FACTURAS = {"ur": _facturas_de_ur, "anio": _facturas_del_anio}
+ORDEN_FACTURAS = {"fecha": "fecha_registro", "mes": "mes", "tipo": "tipo_tarifa", "status": "status"}
+
+registrar_tabla(Tabla(
+    nombre="facturas_triple_admin",
+    modelo=FacturaEnergeticaTriple,
+    plantilla_filas="systemsigo/Facturas/Factura_Triple/filas_triple.html",
+    alcance=_admin,
+    ordenables=ORDEN_FACTURAS,
+    filtros=["subestacion", "tipo_tarifa"],
+    filtros_especiales=FILTROS_ESPECIALES_FACTURAS,
+    busca_area=False,
+    profundidad=2,
+))
+
+registrar_tabla(Tabla(
+    nombre="facturas_pdbt_admin",
+    modelo=FacturaPdbt,
+    plantilla_filas="systemsigo/Facturas/Factura_PDBT/filas_pdbt.html",
+    alcance=_admin,
+    ordenables=ORDEN_FACTURAS,
+    filtros=["subestacion", "tipo_tarifa"],
+    filtros_especiales=FILTROS_ESPECIALES_FACTURAS,
+    busca_area=False,
+    profundidad=2,
+))
+
+
+# ==================== TÉRMINOS DE BÚSQUEDA ====================
+
+MODELOS_BUSQUEDA = [Area, InventarioClimatizacion, InventarioLuminarias, InventarioMiscelaneos,
+                    FacturaEnergeticaTriple, FacturaPdbt]
+
+
+def completar_busqueda(tamano_lote=TAMANO_LOTE):
+    """Llena ``busqueda`` en los documentos guardados antes de que existiera. Devuelve {colección: n}."""
+    resultado = {}
+    for modelo in MODELOS_BUSQUEDA:
+        coleccion = modelo._get_collection()
+        campos = [modelo._fields[c].db_field for c in modelo.campos_texto]
+        total = 0
+        operaciones = []
+        for doc in coleccion.find({"busqueda": {"$exists": False}}, dict.fromkeys(campos, 1)).batch_size(tamano_lote):
+            terminos = terminos_busqueda(*(doc.get(c) for c in campos))
+            operaciones.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"busqueda": terminos}}))
+            if len(operaciones) >= tamano_lote:
+                total += coleccion.bulk_write(operaciones, ordered=False).modified_count
+                operaciones = []
+        if operaciones:
+            total += coleccion.bulk_write(operaciones, ordered=False).modified_count
+        resultado[coleccion.name] = total
+    return resultado
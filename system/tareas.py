@@ -0,0 +1,72 @@
+# system/tareas.py
+"""
+Tareas periódicas de SIGO registradas en el programador (system/scheduler.py).
+Otros módulos pueden registrar las suyas con ``@tarea`` y agregarse a ``SIGO_TAREAS_MODULOS``.
+"""
+from datetime import datetime
+
+from system.scheduler import tarea
+
+
+@tarea("sincronizar_periodos", "*/15 * * * *")
+def sincronizar_periodos():
+    """Transiciones Pendiente/Activo/Finalizado de los periodos de inventario."""
+    from system.periodos import sincronizar_estados_periodos
+    return sincronizar_estados_periodos()
+
+
+@tarea("desbloquear_cuentas", "*/10 * * * *")
+def desbloquear_cuentas():
+    """Limpia los bloqueos de inicio de sesión ya vencidos."""
+    from system.models import Usuario
+    return Usuario.objects(bloqueado_hasta__lte=datetime.now()).update(
+        set__intentos_fallidos=0, unset__bloqueado_hasta=True
+    )
+
+
+@tarea("limpiar_sesiones", "30 3 * * *")
+def limpiar_sesiones():
+    """Elimina las sesiones vencidas que el monitor TTL aún no ha borrado."""
+    from importlib import import_module
+    from django.conf import settings
+    import_module(settings.SESSION_ENGINE).SessionStore.clear_expired()
+
+
+@tarea("captcha_pool", "*/10 * * * *")
+def rellenar_captcha_pool():
+    """Purga captchas vencidos y mantiene el pool con el mínimo configurado (si SIGO_CAPTCHA_POOL)."""
+    from django.conf import settings
+    from system.captcha_pool import generar_pool, purgar_expirados, tamano_pool
+    if not getattr(settings, "SIGO_CAPTCHA_POOL", False):
+        return 0
+    purgar_expirados()
+    faltantes = getattr(settings, "SIGO_CAPTCHA_POOL_MINIMO", 500) - tamano_pool()
+    return generar_pool(faltantes) if faltantes > 0 else 0
+
+
+@tarea("snapshot_periodos", "5 * * * *", lease_seg=3600)
+def snapshot_periodos():
+    """Copia a HistorialInventario los inventarios de los periodos que ya terminaron."""
+    from system.historial import generar_snapshots_pendientes
+    return generar_snapshots_pendientes()
+
+
+@tarea("archivar_periodos", "20 2 * * *", lease_seg=3600)
+def archivar_periodos():
+    """Mueve a las colecciones de archivo los inventarios de periodos finalizados."""
+    from system.archivo import archivar_periodos_finalizados
+    return archivar_periodos_finalizados()
+
+
+@tarea("catalogo_equipos", "40 2 * * *", lease_seg=3600)
+def catalogo_equipos():
+    """Reconstruye el catálogo de equipos a partir de los inventarios vigentes."""
+    from system.catalogo import reconstruir_catalogo
+    return reconstruir_catalogo()
+
+
+@tarea("detectar_duplicados", "25 * * * *", lease_seg=1800)
+def detectar_duplicados():
+    """Agrupa las capturas con la misma huella del periodo activo en la cola de revisión."""
+    from system.duplicados import detectar_duplicados_periodo_activo
+    return detectar_duplicados_periodo_activo()
@@ -1,3 +1,349 @@
-from django.test import TestCase
+"""
+Pruebas de presupuesto de comandos de MongoDB y tiempo de respuesta por vista.
 
-# Create your tests here.
+- Con ``SIGO_TEST_MONGO_URI`` se usa un mongod local (los comandos se cuentan con el
+  listener de pymongo); sin ella se usa mongomock y se cuentan las operaciones de colección.
+- Cada vista de listado, filtro o exportación tiene un máximo de comandos y de milisegundos.
+- Las pruebas de escalamiento verifican que el número de comandos no crezca con las filas
+  (sin dereferencias por registro ni recorridos completos en Python).
+- ``MesDePeriodoTests`` cubre la lectura del mes facturado (system/conciliacion.py).
+- ``CronTests`` y ``LeaseTareasTests`` cubren las expresiones cron y el lease del programador
+  (system/scheduler.py).
+"""
+import itertools
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from mongoengine import connect, disconnect
+from mongoengine.connection import DEFAULT_CONNECTION_NAME
+
+from system.benchmarks import sembrar_datos
+from system.conciliacion import mes_de_periodo
+from system.models import (
+    InventarioClimatizacion, InventarioLuminarias, InventarioMiscelaneos,
+    PeriodoInventario, UnidadResponsable, Usuario,
+)
+from system.mongo import ALIAS_LECTURAS
+from system.profiling import RegistroComandosMongo, registro_activo
+from system.scheduler import (
+    MAX_MINUTOS_ATRASADOS, Tarea, _valores_campo, coincide, minutos_por_revisar, parsear_cron, tomar_lease,
+)
+
+MONGO_TEST_URI = os.getenv("SIGO_TEST_MONGO_URI")
+MONGO_TEST_DB = "sigo_test_presupuestos"
+
+# Comandos que no dependen de la vista (lotes adicionales del cursor, sesiones)
+COMANDOS_IGNORADOS = {"getMore", "endSessions", "killCursors"}
+
+# vista: (máximo de comandos, máximo de milisegundos)
+PRESUPUESTOS = {
+    "listar_climatizacion_encargado": (12, 1500),
+    "listar_luminarias_encargado": (12, 1500),
+    "listar_miscelaneos_encargado": (12, 1500),
+    "inventarios_filtro_triple": (14, 1500),
+    "exportar_excel_inventario": (12, 3000),
+    "listar_facturas_admin": (16, 2000),
+    "listar_facturas_triple_admin": (12, 2000),
+    "listar_facturas_pdbt_admin": (12, 2000),
+    "exportar_facturas_triple_admin": (12, 3000),
+    "exportar_facturas_pdbt_admin": (12, 3000),
+}
+
+OPERACIONES_MONGOMOCK = [
+    "find", "find_one", "aggregate", "count_documents", "estimated_document_count", "distinct",
+    "insert_one", "insert_many", "update_one", "update_many", "replace_one",
+    "delete_one", "delete_many", "find_one_and_update", "find_one_and_delete", "bulk_write",
+]
+
+_local = threading.local()
+_ids = itertools.count()
+
+
+def _contar_operacion(nombre, original):
+    """Envuelve una operación de mongomock para registrarla como comando (sin contar llamadas anidadas)."""
+    def envoltura(self, *args, **kwargs):
+        registro = registro_activo()
+        if registro is None or getattr(_local, "dentro", False):
+            return original(self, *args, **kwargs)
+        request_id = next(_ids)
+        registro.iniciado(nombre, self.name, request_id)
+        inicio = time.perf_counter()
+        _local.dentro = True
+        try:
+            return original(self, *args, **kwargs)
+        finally:
+            _local.dentro = False
+            registro.terminado(request_id, (time.perf_counter() - inicio) * 1_000_000)
+    return envoltura
+
+
+class PresupuestoVistasMixin:
+    """Conecta la base de pruebas, siembra datos y mide comandos y tiempo por petición."""
+
+    registros_por_periodo = 60
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._parches = []
+        try:
+            cls._preparar_datos()
+        except Exception:
+            # tearDownClass no se ejecuta si setUpClass falla: no dejar los parches activos
+            cls._detener_parches()
+            disconnect(DEFAULT_CONNECTION_NAME)
+            super().tearDownClass()
+            raise
+
+    @classmethod
+    def _detener_parches(cls):
+        for parche in cls._parches:
+            parche.stop()
+        cls._parches = []
+
+    @classmethod
+    def _preparar_datos(cls):
+        disconnect(ALIAS_LECTURAS)
+        disconnect(DEFAULT_CONNECTION_NAME)
+        if MONGO_TEST_URI:
+            connect(db=MONGO_TEST_DB, host=MONGO_TEST_URI, alias=DEFAULT_CONNECTION_NAME)
+        else:
+            import mongomock
+            import mongomock.gridfs
+
+            mongomock.gridfs.enable_gridfs_integration()
+            connect(db=MONGO_TEST_DB, host="mongodb://localhost", alias=DEFAULT_CONNECTION_NAME,
+                    mongo_client_class=mongomock.MongoClient)
+            for nombre in OPERACIONES_MONGOMOCK:
+                original = getattr(mongomock.collection.Collection, nombre)
+                parche = mock.patch.object(mongomock.collection.Collection, nombre,
+                                           _contar_operacion(nombre, original))
+                parche.start()
+                cls._parches.append(parche)
+
+        cls.ids = sembrar_datos(campus=1, urs=2, edificios_por_ur=3, areas_por_edificio=3,
+                                subestaciones_por_ur=2, anios=1,
+                                registros_por_periodo=cls.registros_por_periodo,
+                                bitacoras=5, salida=lambda *a: None)
+        cls.ur = UnidadResponsable.objects.order_by("nombre").first()
+        cls.periodo = PeriodoInventario.objects.order_by("-fecha_inicio").first()
+        cls.admin = Usuario.objects(rol="admin").first()
+        cls.encargado = Usuario.objects(rol="encargado_ur", unidad_responsable=cls.ur).first()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._detener_parches()
+        from mongoengine.connection import get_connection
+
+        get_connection().drop_database(MONGO_TEST_DB)
+        disconnect(DEFAULT_CONNECTION_NAME)
+        super().tearDownClass()
+
+    def iniciar_sesion(self, usuario):
+        session = self.client.session
+        session["user_id"] = str(usuario.id)
+        session["rol"] = usuario.rol
+        session["email"] = usuario.email
+        session["unidad_responsable_id"] = str(usuario.unidad_responsable.id) if usuario.unidad_responsable else None
+        session.save()
+
+    def medir(self, nombre_url, params=None):
+        with RegistroComandosMongo() as registro:
+            inicio = time.perf_counter()
+            respuesta = self.client.get(reverse(nombre_url), params or {})
+            duracion_ms = (time.perf_counter() - inicio) * 1000
+        comandos = [c for c in registro.comandos if c["comando"] not in COMANDOS_IGNORADOS]
+        return respuesta, len(comandos), duracion_ms
+
+    def assertDentroDePresupuesto(self, nombre_url, params=None):
+        max_comandos, max_ms = PRESUPUESTOS[nombre_url]
+        respuesta, comandos, duracion_ms = self.medir(nombre_url, params)
+        self.assertEqual(respuesta.status_code, 200, nombre_url)
+        self.assertLessEqual(comandos, max_comandos, f"{nombre_url}: {comandos} comandos de MongoDB")
+        self.assertLessEqual(duracion_ms, max_ms, f"{nombre_url}: {duracion_ms:.0f} ms")
+        return comandos
+
+    def agregar_registros(self, n):
+        """Duplica registros existentes del periodo para aumentar el volumen sin cambiar catálogos."""
+        for modelo in (InventarioClimatizacion, InventarioLuminarias, InventarioMiscelaneos):
+            coleccion = modelo._get_collection()
+            base = list(coleccion.find({"unidad_responsable": self.ur.id, "periodo": self.periodo.id}).limit(n))
+            for doc in base:
+                doc.pop("_id")
+            if base:
+                coleccion.insert_many(base)
+
+
+class PresupuestoListasInventarioTests(PresupuestoVistasMixin, TestCase):
+
+    def setUp(self):
+        self.iniciar_sesion(self.encargado)
+
+    def test_listas_encargado_dentro_de_presupuesto(self):
+        for nombre in ("listar_climatizacion_encargado", "listar_luminarias_encargado",
+                       "listar_miscelaneos_encargado"):
+            with self.subTest(vista=nombre):
+                self.assertDentroDePresupuesto(nombre, {"periodo": str(self.periodo.id)})
+
+    def test_listar_climatizacion_encargado_no_escala_con_filas(self):
+        params = {"periodo": str(self.periodo.id)}
+        _, antes, _ = self.medir("listar_climatizacion_encargado", params)
+        self.agregar_registros(self.registros_por_periodo)
+        _, despues, _ = self.medir("listar_climatizacion_encargado", params)
+        self.assertEqual(antes, despues)
+
+
+class PresupuestoFiltroInventarioTests(PresupuestoVistasMixin, TestCase):
+
+    def setUp(self):
+        self.iniciar_sesion(self.admin)
+
+    def params(self, tipo):
+        return {"unidad": str(self.ur.id), "periodo": str(self.periodo.id), "tipo": tipo}
+
+    def test_filtro_y_exportacion_dentro_de_presupuesto(self):
+        for tipo in ("Climatización", "Luminarias", "Misceláneos"):
+            with self.subTest(tipo=tipo):
+                self.assertDentroDePresupuesto("inventarios_filtro_triple", self.params(tipo))
+                self.assertDentroDePresupuesto("exportar_excel_inventario", self.params(tipo))
+
+    def test_filtro_no_escala_con_filas(self):
+        params = self.params("Luminarias")
+        _, antes, _ = self.medir("inventarios_filtro_triple", params)
+        _, antes_export, _ = self.medir("exportar_excel_inventario", params)
+        self.agregar_registros(self.registros_por_periodo)
+        _, despues, _ = self.medir("inventarios_filtro_triple", params)
+        _, despues_export, _ = self.medir("exportar_excel_inventario", params)
+        self.assertEqual(antes, despues)
+        self.assertEqual(antes_export, despues_export)
+
+
+class PresupuestoFacturasTests(PresupuestoVistasMixin, TestCase):
+
+    def setUp(self):
+        self.iniciar_sesion(self.admin)
+
+    def test_listas_y_exportaciones_dentro_de_presupuesto(self):
+        anio = str(self.periodo.fecha_inicio.year)
+        for nombre in ("listar_facturas_admin", "listar_facturas_triple_admin", "listar_facturas_pdbt_admin",
+                       "exportar_facturas_triple_admin", "exportar_facturas_pdbt_admin"):
+            for params in ({}, {"ur": str(self.ur.id)}, {"anio": anio}):
+                with self.subTest(vista=nombre, params=params):
+                    self.assertDentroDePresupuesto(nombre, params)
+
+
+class MesDePeriodoTests(SimpleTestCase):
+
+    def test_formatos_reconocidos(self):
+        casos = {
+            "ENE-2025": datetime(2025, 1, 1),
+            "01/2025": datetime(2025, 1, 1),
+            "2025-03": datetime(2025, 3, 1),
+            "ENE-FEB 2025": datetime(2025, 2, 1),
+            "31 DIC 24 - 31 ENE 25": datetime(2025, 1, 1),
+            "15 dic 2024 - 14 feb 2025": datetime(2025, 2, 1),
+            "Diciembre 2024 - Enero 2025": datetime(2025, 1, 1),
+        }
+        for texto, esperado in casos.items():
+            with self.subTest(texto=texto):
+                self.assertEqual(mes_de_periodo(texto), esperado)
+
+    def test_dias_de_dos_digitos_con_anio_completo(self):
+        self.assertEqual(mes_de_periodo("ENE 15 - FEB 14 2025"), datetime(2025, 2, 1))
+        self.assertEqual(mes_de_periodo("DIC 15 - ENE 14 2025"), datetime(2025, 1, 1))
+
+    def test_no_reconocidos(self):
+        for texto in (None, "", "SIN PERIODO", "13/2025", "ENE 1999"):
+            with self.subTest(texto=texto):
+                self.assertIsNone(mes_de_periodo(texto))
+
+
+class CronTests(SimpleTestCase):
+
+    def test_valores_campo(self):
+        self.assertEqual(_valores_campo("*/15", 0, 59), {0, 15, 30, 45})
+        self.assertEqual(_valores_campo("1-5,10", 0, 23), {1, 2, 3, 4, 5, 10})
+        self.assertEqual(_valores_campo("10-20/5", 0, 59), {10, 15, 20})
+        for campo in ("60", "5-2", "0"):
+            with self.subTest(campo=campo):
+                with self.assertRaises(ValueError):
+                    _valores_campo(campo, 1, 59)
+
+    def test_domingo_como_siete(self):
+        domingo = datetime(2025, 6, 1, 3, 0)
+        for expresion in ("0 3 * * 7", "0 3 * * 0", "0 3 * * 5-7"):
+            with self.subTest(expresion=expresion):
+                self.assertTrue(coincide(parsear_cron(expresion), domingo))
+        self.assertFalse(coincide(parsear_cron("0 3 * * 7"), domingo + timedelta(days=1)))
+
+    def test_dia_o_semana(self):
+        # Día 1 o lunes: el lunes 2 de junio de 2025 y el domingo 1 de junio coinciden
+        cron = parsear_cron("0 0 1 * 1")
+        self.assertTrue(coincide(cron, datetime(2025, 6, 1)))
+        self.assertTrue(coincide(cron, datetime(2025, 6, 2)))
+        self.assertFalse(coincide(cron, datetime(2025, 6, 3)))
+        # Con día de la semana sin restringir solo cuenta el día del mes
+        self.assertFalse(coincide(parsear_cron("0 0 1 * *"), datetime(2025, 6, 2)))
+
+    def test_minutos_por_revisar(self):
+        ahora = datetime(2025, 6, 1, 10, 5, 30)
+        self.assertEqual(minutos_por_revisar(None, ahora), [datetime(2025, 6, 1, 10, 5)])
+        self.assertEqual(minutos_por_revisar(datetime(2025, 6, 1, 10, 5), ahora), [])
+        self.assertEqual(minutos_por_revisar(datetime(2025, 6, 1, 10, 2), ahora),
+                         [datetime(2025, 6, 1, 10, m) for m in (3, 4, 5)])
+        with self.assertLogs("system.scheduler", "WARNING"):
+            atrasados = minutos_por_revisar(datetime(2025, 6, 1, 6, 0), ahora)
+        self.assertEqual(len(atrasados), MAX_MINUTOS_ATRASADOS)
+        self.assertEqual(atrasados[-1], datetime(2025, 6, 1, 10, 5))
+
+
+class LeaseTareasTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        import mongomock
+
+        disconnect(DEFAULT_CONNECTION_NAME)
+        connect(db="sigo_test_scheduler", host="mongodb://localhost", alias=DEFAULT_CONNECTION_NAME,
+                mongo_client_class=mongomock.MongoClient)
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect(DEFAULT_CONNECTION_NAME)
+        super().tearDownClass()
+
+    def setUp(self):
+        from system.models import BloqueoTarea
+
+        BloqueoTarea.drop_collection()
+        self.tarea = Tarea("prueba_lease", "* * * * *", lambda: None, lease_seg=600)
+
+    def liberar(self):
+        from system.models import BloqueoTarea
+
+        BloqueoTarea._get_collection().update_one(
+            {"_id": self.tarea.nombre}, {"$set": {"expira": datetime.utcnow() - timedelta(seconds=1)}})
+
+    def test_un_solo_nodo_por_minuto(self):
+        self.assertTrue(tomar_lease(self.tarea, "2025-06-01T10:05"))
+        self.assertFalse(tomar_lease(self.tarea, "2025-06-01T10:05"))
+        self.liberar()
+        self.assertFalse(tomar_lease(self.tarea, "2025-06-01T10:05"))
+
+    def test_minutos_atrasados_no_se_repiten(self):
+        self.assertTrue(tomar_lease(self.tarea, "2025-06-01T10:05"))
+        self.liberar()
+        self.assertFalse(tomar_lease(self.tarea, "2025-06-01T10:03"))
+        self.assertTrue(tomar_lease(self.tarea, "2025-06-01T10:06"))
+
+    def test_ejecucion_manual_no_bloquea_el_minuto(self):
+        self.assertTrue(tomar_lease(self.tarea))
+        self.assertFalse(tomar_lease(self.tarea, "2025-06-01T10:05"))
+        self.liberar()
+        self.assertTrue(tomar_lease(self.tarea, "2025-06-01T10:05"))
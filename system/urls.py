@@ -39,6 +39,16 @@ from .gestion_energetica.views_admin.historial_lum import (historial_luminarias_
 
 from .gestion_energetica.views_admin.historial_misc import (historial_miscelaneos_admin, dar_baja_miscelaneo_admin, 
                                                             restaurar_miscelaneo_admin)
+from .gestion_energetica.views_admin.inventario_masivo import baja_masiva_inventario, restaurar_masivo_inventario
+from .gestion_energetica.views_admin.registros_baja import registros_baja_admin
+from .gestion_energetica.views_admin.conciliacion import conciliacion_energia_admin
+from .gestion_energetica.views_admin.duplicados import (duplicados_inventario_admin, descartar_duplicado_admin,
+                                                        resolver_duplicado_admin)
+from .tablas import tabla_datos
+from .busqueda import busqueda_global
+from .jerarquia import jerarquia_api
+from .catalogo import catalogo_equipos_api
+from .simulador import simulador_api
 
 from .gestion_energetica.views_admin.periodos_inventarios import (
     crear_periodo_inventario, listar_periodos, editar_periodo_inventario,
@@ -47,6 +57,7 @@ from .gestion_energetica.views_admin.area_edificio import (
     ajax_edificios_por_ur_admin, ajax_areas_por_ur_admin)
 from .gestion_energetica.views_admin.medidores import (medidores_lista_admin,
     medidores_eliminar_admin, medidores_crear_admin, medidores_editar_admin)
+from .gestion_energetica.views_admin.perfiles import listar_perfiles_solicitud, ver_perfil_solicitud
 
 # ==================== Vistas de Encargado de Unidad Responsable ====================
 from .gestion_energetica.views_encargado_ur.index import Inicio_encargado
@@ -67,6 +78,8 @@ from .gestion_energetica.views_encargado_ur.factura_pdbt import (
 from .gestion_energetica.views_encargado_ur.inventario_listas import (
     listar_climatizacion_encargado, listar_luminarias_encargado,
     listar_miscelaneos_encargado)
+from .gestion_energetica.views_encargado_ur.inventario_periodos import (
+    arrastrar_inventario_encargado, diferencias_inventario_encargado)
 # ==================== Vistas del Rector ====================
 from .gestion_energetica.views_rector.index import Inicio_rector
 # ==================== Vistas del Director ====================
@@ -195,6 +208,28 @@ urlpatterns = [
     path('historiales/inventarios/miscelaneos/admin/', historial_miscelaneos_admin, name='historial_miscelaneos_admin'),
     path('inventario/miscelaneos/dar_baja/admin/<str:id>/', dar_baja_miscelaneo_admin, name='dar_baja_miscelaneo_admin'),
     path('inventario/miscelaneos/restaurar/<str:id>/', restaurar_miscelaneo_admin, name='restaurar_miscelaneo_admin'),
+    path('historiales/inventarios/<str:tipo>/bajas/', registros_baja_admin, name='registros_baja_admin'),
+        # Links de la cola de posibles capturas duplicadas (system/duplicados.py)
+    path('inventario/duplicados/', duplicados_inventario_admin, name='duplicados_inventario_admin'),
+    path('inventario/duplicados/<str:id>/descartar/', descartar_duplicado_admin, name='descartar_duplicado_admin'),
+    path('inventario/duplicados/<str:id>/resolver/', resolver_duplicado_admin, name='resolver_duplicado_admin'),
+    # Datos paginados de las tablas del servidor (system/tablas.py)
+    path('tablas/<str:nombre>/', tabla_datos, name='tabla_datos'),
+    # Búsqueda global por rol (system/busqueda.py)
+    path('buscar/', busqueda_global, name='busqueda_global'),
+    # Jerarquía campus → UR → edificio → área → subestación con ETag (system/jerarquia.py)
+    path('api/jerarquia/', jerarquia_api, name='jerarquia_api'),
+    path('api/jerarquia/<str:ur_id>/', jerarquia_api, name='jerarquia_ur'),
+    # Autocompletado de marca/modelo desde el catálogo de equipos (system/catalogo.py)
+    path('api/catalogo/equipos/', catalogo_equipos_api, name='catalogo_equipos_api'),
+    # Simulación de sustituciones de luminarias/climatización (system/simulador.py)
+    path('api/simulador/', simulador_api, name='simulador_api'),
+    # Conciliación de consumo facturado vs. inventario (system/conciliacion.py)
+    path('energia/conciliacion/', conciliacion_energia_admin, name='conciliacion_energia_admin'),
+        # Links de bajas y restauraciones masivas (tipo: climatizacion, luminarias, miscelaneos)
+    # (prefijo propio: 'inventario/<tipo>/restaurar/<id>/' capturaría 'masivo' como id)
+    path('inventario/masivo/<str:tipo>/dar_baja/', baja_masiva_inventario, name='baja_masiva_inventario'),
+    path('inventario/masivo/<str:tipo>/restaurar/', restaurar_masivo_inventario, name='restaurar_masivo_inventario'),
     # Crear periodos de inventarios
     path('periodos/crear/', crear_periodo_inventario, name="crear_periodo_inventario"),
     path("periodos/", listar_periodos, name="listar_periodos"),
@@ -205,6 +240,9 @@ urlpatterns = [
     path('medidores/crear/', medidores_crear_admin, name='medidores_crear_admin'),
     path('medidores/editar/<str:id>/', medidores_editar_admin, name='medidores_editar_admin'),
     path('medidores/eliminar/<str:id>/', medidores_eliminar_admin, name='medidores_eliminar_admin'),
+    # Links de perfiles de solicitudes (diagnóstico de rendimiento)
+    path('diagnostico/perfiles/', listar_perfiles_solicitud, name='listar_perfiles_solicitud'),
+    path('diagnostico/perfiles/<str:perfil_id>/', ver_perfil_solicitud, name='ver_perfil_solicitud'),
     # ==================== Paths de Admin de Energias ====================
     path('admin_energia/inicio/', inicio_energia, name='admin_energia_inicio'),
     # ==================== Paths de Rector ====================
@@ -256,6 +294,8 @@ urlpatterns = [
     path("encargado/inventario/climatizacion/", listar_climatizacion_encargado, name="listar_climatizacion_encargado"),
     path("encargado/inventario/luminarias/", listar_luminarias_encargado, name="listar_luminarias_encargado"),
     path("encargado/inventario/miscelaneos/", listar_miscelaneos_encargado, name="listar_miscelaneos_encargado"),
+    path("encargado/inventario/diferencias/", diferencias_inventario_encargado, name="diferencias_inventario_encargado"),
+    path("encargado/inventario/arrastrar/", arrastrar_inventario_encargado, name="arrastrar_inventario_encargado"),
 
 
     # ==================== Paths de Capturista de datos ====================
@@ -12,6 +12,7 @@ from django.views.decorators.cache import never_cache
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 from django.views.decorators.http import require_POST
+from .hashing import BcryptSaturado, necesita_rehash
 
 # ================================================ VISTAS DE FUNCIONES LOGIN =====================================================
 # Vista principal de inicio de sesión
@@ -22,7 +23,24 @@ def Login(request):
 
         usuario = Usuario.objects(email=email).first()
 
-        if usuario and usuario.is_active and usuario.check_password(password):
+        if usuario and usuario.esta_bloqueado():
+            return render(request, 'systemsigo/login.html', {
+                'error': 'Tu cuenta está suspendida temporalmente por intentos fallidos. Intenta más tarde.'
+            })
+
+        try:
+            password_valido = bool(usuario and usuario.is_active and usuario.check_password(password))
+        except BcryptSaturado:
+            return render(request, 'systemsigo/login.html', {
+                'error': 'El servidor está ocupado, intenta de nuevo en unos segundos.'
+            })
+
+        if password_valido:
+            usuario.resetear_intentos()
+            # Rehash transparente si cambió el costo configurado de bcrypt
+            if settings.SIGO_BCRYPT_REHASH and necesita_rehash(usuario.password):
+                Usuario.objects(id=usuario.id).update_one(set__password=Usuario.hash_password(password))
+
             # Crear sesión
             request.session['user_id'] = str(usuario.id)
             request.session['rol'] = usuario.rol
@@ -55,6 +73,8 @@ def Login(request):
             })
 
         # Si no coincide correo o contraseña
+        if usuario and usuario.is_active:
+            usuario.registrar_fallo_login()
         return render(request, 'systemsigo/login.html', {
             'error': 'Correo o contraseña incorrectos.'
         })
@@ -140,27 +160,20 @@ def ConfirmarCambioPassword(request):
 
         usuario = Usuario.objects(id=request.session.get('user_id')).first()
 
-        codigo_db = PasswordResetCode.objects(
-            usuario=usuario,
-            codigo=codigo_ingresado,
-            usado=False,
-            expiracion__gte=datetime.utcnow()
-        ).first()
+        # Se valida antes de consumir el código para no invalidarlo por un error de captura
+        if nueva != confirmar:
+            messages.error(request, 'Las contraseñas no coinciden.')
+            return redirect('confirmar_cambio_password')
+
+        codigo_db = PasswordResetCode.consumir(usuario, codigo_ingresado)
 
         if not codigo_db:
             messages.error(request, 'Código inválido o expirado.')
             return redirect('confirmar_cambio_password')
 
-        if nueva != confirmar:
-            messages.error(request, 'Las contraseñas no coinciden.')
-            return redirect('confirmar_cambio_password')
-
         usuario.password = Usuario.hash_password(nueva)
         usuario.save()
 
-        codigo_db.usado = True
-        codigo_db.save()
-
         messages.success(request, 'Contraseña actualizada con éxito.')
         return redirect('cambiar_password')  # Redirige donde prefieras
 
@@ -182,7 +195,7 @@ def SolicitarRecuperacionPassword(request):
 
         # Generar código de 6 dígitos
         codigo = str(secrets.randbelow(1000000)).zfill(6)
-        expiracion = datetime.now() + timedelta(minutes=10)
+        expiracion = datetime.utcnow() + timedelta(minutes=10)
 
         reset_code = PasswordResetCode(
             usuario=usuario,
@@ -220,21 +233,13 @@ def VerificarCodigoResetPassword(request):
             messages.error(request, 'Usuario no válido.')
             return redirect('solicitar_recuperacion')
 
-        codigo_valido = PasswordResetCode.objects(
-            usuario=usuario,
-            codigo=codigo,
-            expiracion__gte=datetime.now(),
-            usado=False
-        ).first()
+        # Busca y marca como usado en una sola operación atómica
+        codigo_valido = PasswordResetCode.consumir(usuario, codigo)
 
         if not codigo_valido:
             messages.error(request, 'Código inválido o expirado.')
             return redirect('verificar_codigo')
 
-        # Marcar como usado
-        codigo_valido.usado = True
-        codigo_valido.save()
-
         request.session['codigo_verificado'] = True  # bandera para el siguiente paso
         return redirect('cambiar_password')
 